@@ -3,6 +3,7 @@ from __future__ import annotations
 import os
 from dataclasses import dataclass
 from pathlib import Path
+from typing import Tuple
 
 from dotenv import load_dotenv
 
@@ -15,6 +16,44 @@ class Settings:
     bot_token: str
     database_url: str
     timezone: str
+    # History of objects completed this many months ago moves to archive tables; 0 disables
+    archive_after_months: int = 6
+    # Soft-deleted objects are removed for good after this many days; 0 disables
+    purge_deleted_after_days: int = 30
+    # Compiled SQL cache entries per engine (SQLAlchemy query_cache_size)
+    query_cache_size: int = 500
+    # Group-commit concurrent writes into one transaction per window
+    write_batching: bool = False
+    write_batch_window_ms: int = 5
+    # Update scheduler: updates processed at once, and handler limits by kind
+    max_in_flight_updates: int = 32
+    max_concurrent_readers: int = 16
+    max_concurrent_writers: int = 4
+    # Repeated taps on the same button within this window are answered from cache
+    callback_dedup_seconds: float = 5.0
+    # Root log level, per-logger overrides and sampling of high-volume DEBUG events
+    log_level: str = "INFO"
+    log_levels: Tuple[Tuple[str, str], ...] = ()
+    log_debug_sample_every: int = 1
+    # Telegram ids allowed to use admin commands (/diag)
+    admin_ids: Tuple[int, ...] = ()
+    # Sampling profiler (/profile): output directory and sampling interval
+    profile_dir: str = "profiles"
+    profile_interval_ms: int = 5
+    # Online SQLite backups: how often (0 disables), where, how many to keep,
+    # and pages copied per step with a pause between steps for the bot's writes
+    backup_interval_hours: float = 24
+    backup_dir: str = "backups"
+    backup_keep: int = 7
+    backup_step_pages: int = 256
+    backup_step_pause_ms: int = 10
+    # ANALYZE / PRAGMA optimize / incremental vacuum / WAL checkpoint: how often
+    # (0 disables) and how long updates must be quiet before it starts
+    maintenance_interval_hours: float = 24
+    maintenance_idle_seconds: float = 300
+    # Opt-in recording of anonymized updates for replay; the key seeds the pseudonyms
+    record_updates_path: str = ""
+    record_updates_key: str = ""
 
 
 def _default_database_url() -> str:
@@ -24,11 +63,45 @@ def _default_database_url() -> str:
     return f"sqlite+aiosqlite:///{db_path}"
 
 
+def _parse_log_levels(value: str) -> Tuple[Tuple[str, str], ...]:
+    """'aiogram=WARNING,app.handlers=DEBUG' -> (logger name, level) pairs"""
+    pairs = []
+    for item in value.split(","):
+        name, sep, level = item.partition("=")
+        if sep and name.strip() and level.strip():
+            pairs.append((name.strip(), level.strip().upper()))
+    return tuple(pairs)
+
+
 def get_settings() -> Settings:
     return Settings(
         bot_token=os.getenv("BOT_TOKEN", ""),
         database_url=os.getenv("DATABASE_URL", _default_database_url()),
         timezone=os.getenv("TZ", "Europe/Moscow"),
+        archive_after_months=int(os.getenv("ARCHIVE_AFTER_MONTHS", "6")),
+        purge_deleted_after_days=int(os.getenv("PURGE_DELETED_AFTER_DAYS", "30")),
+        query_cache_size=int(os.getenv("QUERY_CACHE_SIZE", "500")),
+        write_batching=os.getenv("WRITE_BATCHING", "").lower() in ("1", "true", "yes"),
+        write_batch_window_ms=int(os.getenv("WRITE_BATCH_WINDOW_MS", "5")),
+        max_in_flight_updates=int(os.getenv("MAX_IN_FLIGHT_UPDATES", "32")),
+        max_concurrent_readers=int(os.getenv("MAX_CONCURRENT_READERS", "16")),
+        max_concurrent_writers=int(os.getenv("MAX_CONCURRENT_WRITERS", "4")),
+        callback_dedup_seconds=float(os.getenv("CALLBACK_DEDUP_SECONDS", "5")),
+        log_level=os.getenv("LOG_LEVEL", "INFO").upper(),
+        log_levels=_parse_log_levels(os.getenv("LOG_LEVELS", "")),
+        log_debug_sample_every=int(os.getenv("LOG_DEBUG_SAMPLE_EVERY", "1")),
+        profile_dir=os.getenv("PROFILE_DIR", "profiles"),
+        profile_interval_ms=int(os.getenv("PROFILE_INTERVAL_MS", "5")),
+        backup_interval_hours=float(os.getenv("BACKUP_INTERVAL_HOURS", "24")),
+        backup_dir=os.getenv("BACKUP_DIR", "backups"),
+        backup_keep=int(os.getenv("BACKUP_KEEP", "7")),
+        backup_step_pages=int(os.getenv("BACKUP_STEP_PAGES", "256")),
+        backup_step_pause_ms=int(os.getenv("BACKUP_STEP_PAUSE_MS", "10")),
+        maintenance_interval_hours=float(os.getenv("MAINTENANCE_INTERVAL_HOURS", "24")),
+        maintenance_idle_seconds=float(os.getenv("MAINTENANCE_IDLE_SECONDS", "300")),
+        record_updates_path=os.getenv("RECORD_UPDATES", ""),
+        record_updates_key=os.getenv("RECORD_UPDATES_KEY", ""),
+        admin_ids=tuple(int(item) for item in os.getenv("ADMIN_IDS", "").replace(" ", "").split(",") if item),
     )
 
 
@@ -1,3 +1,3 @@
-from app.db.session import Base, AsyncSessionLocal, db_session
+from app.db.session import Base, AsyncSessionLocal, db_session, dispose_engine, get_engine
 
-__all__ = ["Base", "AsyncSessionLocal", "db_session"]
+__all__ = ["Base", "AsyncSessionLocal", "db_session", "dispose_engine", "get_engine"]
@@ -0,0 +1,461 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Sequence, Union
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from app.db.session import Base
+from app.models.search import SEARCH_INDEX_DDL
+
+logger = logging.getLogger(__name__)
+
+
+SCHEMA_VERSION_DDL = (
+    "CREATE TABLE IF NOT EXISTS schema_version ("
+    "version INTEGER PRIMARY KEY, "
+    "description TEXT NOT NULL, "
+    "applied_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP)"
+)
+
+
+@dataclass(frozen=True)
+class Execute:
+    """Plain DDL statement; must be idempotent (IF NOT EXISTS etc.)"""
+    sql: str
+
+    def describe(self) -> str:
+        return self.sql
+
+
+@dataclass(frozen=True)
+class AddColumn:
+    """ALTER TABLE ... ADD COLUMN, skipped when the column already exists"""
+    table: str
+    column: str
+    definition: str
+
+    def describe(self) -> str:
+        return f"ALTER TABLE {self.table} ADD COLUMN {self.column} {self.definition}"
+
+
+@dataclass(frozen=True)
+class Backfill:
+    """
+    Data backfill run in small committed batches.
+    `sql` must touch at most :batch_size rows that still need processing,
+    so re-running it after an interruption resumes where it stopped.
+    """
+    name: str
+    sql: str
+
+    def describe(self) -> str:
+        return f"-- backfill {self.name} in batches\n{self.sql}"
+
+
+@dataclass(frozen=True)
+class RowBackfill:
+    """
+    Backfill for values SQLite cannot compute (e.g. Unicode case folding):
+    `select_sql` returns up to :batch_size rows still needing processing,
+    `transform` turns each row into parameters for `update_sql`.
+    """
+    name: str
+    select_sql: str
+    update_sql: str
+    transform: Callable[[Any], Dict[str, Any]]
+
+    def describe(self) -> str:
+        return f"-- backfill {self.name} in batches (computed in Python)\n{self.update_sql}"
+
+
+Step = Union[Execute, AddColumn, Backfill, RowBackfill]
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    description: str
+    steps: Sequence[Step]
+
+
+# Ordered list of schema migrations. Append only: never renumber or edit
+# a migration that may already be applied to a live database.
+MIGRATIONS: List[Migration] = [
+    Migration(
+        version=1,
+        description="Integer minutes for time entries",
+        steps=(
+            AddColumn("time_entries", "minutes", "INTEGER"),
+            Backfill(
+                "time_entries.minutes",
+                "UPDATE time_entries "
+                "SET minutes = MAX(0, CAST(ROUND((julianday(end_time) - julianday(start_time)) * 1440) AS INTEGER)) "
+                "WHERE id IN ("
+                "SELECT id FROM time_entries WHERE minutes IS NULL ORDER BY id LIMIT :batch_size)",
+            ),
+        ),
+    ),
+    Migration(
+        version=2,
+        description="Object picker pagination and name prefix search",
+        steps=(
+            AddColumn("work_objects", "last_activity_at", "DATETIME"),
+            AddColumn("work_objects", "name_key", "VARCHAR(255)"),
+            Backfill(
+                "work_objects.last_activity_at",
+                "UPDATE work_objects SET last_activity_at = MAX("
+                "created_at, "
+                "COALESCE((SELECT MAX(created_at) FROM time_entries WHERE work_object_id = work_objects.id), created_at), "
+                "COALESCE((SELECT MAX(created_at) FROM payments WHERE work_object_id = work_objects.id), created_at)) "
+                "WHERE id IN ("
+                "SELECT id FROM work_objects WHERE last_activity_at IS NULL ORDER BY id LIMIT :batch_size)",
+            ),
+            RowBackfill(
+                "work_objects.name_key",
+                select_sql="SELECT id, name FROM work_objects WHERE name_key IS NULL ORDER BY id LIMIT :batch_size",
+                update_sql="UPDATE work_objects SET name_key = :name_key WHERE id = :id",
+                transform=lambda row: {"id": row.id, "name_key": row.name.casefold()},
+            ),
+            Execute(
+                "CREATE INDEX IF NOT EXISTS ix_work_objects_user_activity "
+                "ON work_objects (user_id, is_deleted, last_activity_at, id)"
+            ),
+            Execute(
+                "CREATE INDEX IF NOT EXISTS ix_work_objects_user_name_key "
+                "ON work_objects (user_id, name_key)"
+            ),
+        ),
+    ),
+    Migration(
+        version=3,
+        description="Full-text search over object names and entry comments",
+        steps=(
+            *(Execute(statement) for statement in SEARCH_INDEX_DDL),
+            Backfill(
+                "search_index (objects)",
+                "INSERT INTO search_index (rowid, body, owner) "
+                "SELECT wo.id * 2, wo.name, 'u' || wo.user_id FROM work_objects wo "
+                "WHERE NOT EXISTS (SELECT 1 FROM search_index WHERE rowid = wo.id * 2) "
+                "ORDER BY wo.id LIMIT :batch_size",
+            ),
+            Backfill(
+                "search_index (entry comments)",
+                "INSERT INTO search_index (rowid, body, owner) "
+                "SELECT te.id * 2 + 1, te.comment, 'u' || wo.user_id "
+                "FROM time_entries te JOIN work_objects wo ON wo.id = te.work_object_id "
+                "WHERE te.comment IS NOT NULL AND te.comment != '' "
+                "AND NOT EXISTS (SELECT 1 FROM search_index WHERE rowid = te.id * 2 + 1) "
+                "ORDER BY te.id LIMIT :batch_size",
+            ),
+        ),
+    ),
+    Migration(
+        version=4,
+        description="Archive history of long-completed objects",
+        steps=(
+            # Archive tables themselves are new and come from create_all
+            AddColumn("work_objects", "completed_at", "DATETIME"),
+            AddColumn("work_objects", "is_archived", "BOOLEAN NOT NULL DEFAULT 0"),
+            Backfill(
+                "work_objects.completed_at",
+                "UPDATE work_objects SET completed_at = COALESCE(updated_at, created_at) "
+                "WHERE id IN ("
+                "SELECT id FROM work_objects WHERE status = 'completed' AND completed_at IS NULL "
+                "ORDER BY id LIMIT :batch_size)",
+            ),
+        ),
+    ),
+    Migration(
+        version=5,
+        description="Purge of soft-deleted objects",
+        steps=(
+            AddColumn("work_objects", "deleted_at", "DATETIME"),
+            Backfill(
+                "work_objects.deleted_at",
+                "UPDATE work_objects SET deleted_at = COALESCE(updated_at, created_at) "
+                "WHERE id IN ("
+                "SELECT id FROM work_objects WHERE is_deleted = 1 AND deleted_at IS NULL "
+                "ORDER BY id LIMIT :batch_size)",
+            ),
+            Execute(
+                "CREATE INDEX IF NOT EXISTS ix_time_entries_object_date "
+                "ON time_entries (work_object_id, date)"
+            ),
+            Execute(
+                "CREATE INDEX IF NOT EXISTS ix_payments_object_date "
+                "ON payments (work_object_id, date)"
+            ),
+        ),
+    ),
+    Migration(
+        version=6,
+        description="Per-user time entry intervals for overlap checks",
+        steps=(
+            AddColumn("time_entries", "user_id", "BIGINT"),
+            AddColumn("time_entries_archive", "user_id", "BIGINT"),
+            Backfill(
+                "time_entries.user_id",
+                "UPDATE time_entries SET user_id = ("
+                "SELECT user_id FROM work_objects WHERE id = time_entries.work_object_id) "
+                "WHERE id IN ("
+                "SELECT id FROM time_entries WHERE user_id IS NULL "
+                "AND EXISTS (SELECT 1 FROM work_objects wo WHERE wo.id = time_entries.work_object_id) "
+                "ORDER BY id LIMIT :batch_size)",
+            ),
+            Backfill(
+                "time_entries_archive.user_id",
+                "UPDATE time_entries_archive SET user_id = ("
+                "SELECT user_id FROM work_objects WHERE id = time_entries_archive.work_object_id) "
+                "WHERE id IN ("
+                "SELECT id FROM time_entries_archive WHERE user_id IS NULL "
+                "AND EXISTS (SELECT 1 FROM work_objects wo WHERE wo.id = time_entries_archive.work_object_id) "
+                "ORDER BY id LIMIT :batch_size)",
+            ),
+            Execute(
+                "CREATE INDEX IF NOT EXISTS ix_time_entries_user_interval "
+                "ON time_entries (user_id, date, start_time, end_time)"
+            ),
+        ),
+    ),
+    Migration(
+        version=7,
+        description="Daily rollups for period reports",
+        steps=(
+            # Object by object: only objects with history and no rollup rows yet
+            Backfill(
+                "daily_rollups",
+                "INSERT INTO daily_rollups "
+                "(user_id, day, work_object_id, minutes, amount, entry_count, payment_count) "
+                "SELECT wo.user_id, h.day, h.work_object_id, "
+                "SUM(h.minutes), SUM(h.amount), SUM(h.entry_count), SUM(h.payment_count) FROM ("
+                "SELECT work_object_id, date(date) AS day, "
+                "COALESCE(minutes, CAST(ROUND(hours * 60) AS INTEGER)) AS minutes, "
+                "0 AS amount, 1 AS entry_count, 0 AS payment_count FROM time_entries "
+                "UNION ALL SELECT work_object_id, date(date), "
+                "COALESCE(minutes, CAST(ROUND(hours * 60) AS INTEGER)), 0, 1, 0 FROM time_entries_archive "
+                "UNION ALL SELECT work_object_id, date(date), 0, amount, 0, 1 FROM payments "
+                "UNION ALL SELECT work_object_id, date(date), 0, amount, 0, 1 FROM payments_archive"
+                ") h JOIN work_objects wo ON wo.id = h.work_object_id "
+                "WHERE wo.id IN ("
+                "SELECT o.id FROM work_objects o "
+                "WHERE NOT EXISTS (SELECT 1 FROM daily_rollups r WHERE r.work_object_id = o.id) AND ("
+                "EXISTS (SELECT 1 FROM time_entries t WHERE t.work_object_id = o.id) "
+                "OR EXISTS (SELECT 1 FROM time_entries_archive t WHERE t.work_object_id = o.id) "
+                "OR EXISTS (SELECT 1 FROM payments p WHERE p.work_object_id = o.id) "
+                "OR EXISTS (SELECT 1 FROM payments_archive p WHERE p.work_object_id = o.id)) "
+                "ORDER BY o.id LIMIT :batch_size) "
+                "GROUP BY wo.user_id, h.day, h.work_object_id",
+            ),
+        ),
+    ),
+    Migration(
+        version=8,
+        description="Local day numbers and per-user timezones",
+        steps=(
+            # Stored dates are local wall time, so the day number is their date
+            AddColumn("time_entries", "local_day", "INTEGER"),
+            AddColumn("payments", "local_day", "INTEGER"),
+            AddColumn("time_entries_archive", "local_day", "INTEGER"),
+            AddColumn("payments_archive", "local_day", "INTEGER"),
+            AddColumn("users", "timezone", "VARCHAR(64)"),
+            Backfill(
+                "time_entries.local_day",
+                "UPDATE time_entries SET local_day = CAST(julianday(date(date)) - 2440587.5 AS INTEGER) "
+                "WHERE id IN (SELECT id FROM time_entries WHERE local_day IS NULL ORDER BY id LIMIT :batch_size)",
+            ),
+            Backfill(
+                "payments.local_day",
+                "UPDATE payments SET local_day = CAST(julianday(date(date)) - 2440587.5 AS INTEGER) "
+                "WHERE id IN (SELECT id FROM payments WHERE local_day IS NULL ORDER BY id LIMIT :batch_size)",
+            ),
+            Backfill(
+                "time_entries_archive.local_day",
+                "UPDATE time_entries_archive SET local_day = CAST(julianday(date(date)) - 2440587.5 AS INTEGER) "
+                "WHERE id IN (SELECT id FROM time_entries_archive WHERE local_day IS NULL ORDER BY id LIMIT :batch_size)",
+            ),
+            Backfill(
+                "payments_archive.local_day",
+                "UPDATE payments_archive SET local_day = CAST(julianday(date(date)) - 2440587.5 AS INTEGER) "
+                "WHERE id IN (SELECT id FROM payments_archive WHERE local_day IS NULL ORDER BY id LIMIT :batch_size)",
+            ),
+            Execute(
+                "CREATE INDEX IF NOT EXISTS ix_time_entries_object_day "
+                "ON time_entries (work_object_id, local_day)"
+            ),
+            Execute(
+                "CREATE INDEX IF NOT EXISTS ix_payments_object_day "
+                "ON payments (work_object_id, local_day)"
+            ),
+            Execute(
+                "CREATE INDEX IF NOT EXISTS ix_time_entries_archive_object_day "
+                "ON time_entries_archive (work_object_id, local_day)"
+            ),
+            Execute(
+                "CREATE INDEX IF NOT EXISTS ix_payments_archive_object_day "
+                "ON payments_archive (work_object_id, local_day)"
+            ),
+        ),
+    ),
+]
+
+
+def latest_version() -> int:
+    return MIGRATIONS[-1].version if MIGRATIONS else 0
+
+
+async def _table_exists(conn: AsyncConnection, table: str) -> bool:
+    result = await conn.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+        {"name": table},
+    )
+    return result.first() is not None
+
+
+async def _column_exists(conn: AsyncConnection, table: str, column: str) -> bool:
+    result = await conn.execute(text(f"PRAGMA table_info({table})"))
+    return column in {row[1] for row in result}
+
+
+async def get_current_version(engine: AsyncEngine) -> int:
+    async with engine.connect() as conn:
+        if not await _table_exists(conn, "schema_version"):
+            return 0
+        result = await conn.execute(text("SELECT COALESCE(MAX(version), 0) FROM schema_version"))
+        return int(result.scalar_one())
+
+
+async def _is_fresh_database(engine: AsyncEngine) -> bool:
+    async with engine.connect() as conn:
+        return not await _table_exists(conn, "users")
+
+
+async def run_backfill(
+    engine: AsyncEngine,
+    backfill: Backfill,
+    batch_size: int = 500,
+    pause: float = 0.05,
+) -> int:
+    """Run a backfill batch by batch, committing each one so writers are never blocked for long"""
+    total = 0
+    while True:
+        async with engine.begin() as conn:
+            result = await conn.execute(text(backfill.sql), {"batch_size": batch_size})
+        if result.rowcount <= 0:
+            break
+        total += result.rowcount
+        logger.info("Backfill %s: %d rows in batch, %d total", backfill.name, result.rowcount, total)
+        # Give the bot a chance to take the write lock between batches
+        await asyncio.sleep(pause)
+    return total
+
+
+async def run_row_backfill(
+    engine: AsyncEngine,
+    backfill: RowBackfill,
+    batch_size: int = 500,
+    pause: float = 0.05,
+) -> int:
+    """Same as run_backfill, for values computed in Python row by row"""
+    total = 0
+    while True:
+        async with engine.begin() as conn:
+            rows = (await conn.execute(text(backfill.select_sql), {"batch_size": batch_size})).all()
+            if rows:
+                await conn.execute(text(backfill.update_sql), [backfill.transform(row) for row in rows])
+        if not rows:
+            break
+        total += len(rows)
+        logger.info("Backfill %s: %d rows in batch, %d total", backfill.name, len(rows), total)
+        await asyncio.sleep(pause)
+    return total
+
+
+async def _apply_step(engine: AsyncEngine, step: Step, batch_size: int, pause: float) -> None:
+    if isinstance(step, Backfill):
+        await run_backfill(engine, step, batch_size, pause)
+        return
+    if isinstance(step, RowBackfill):
+        await run_row_backfill(engine, step, batch_size, pause)
+        return
+
+    async with engine.begin() as conn:
+        if isinstance(step, AddColumn) and await _column_exists(conn, step.table, step.column):
+            logger.info("Column %s.%s already exists, skipping", step.table, step.column)
+            return
+        await conn.execute(text(step.describe()))
+
+
+async def _stamp(engine: AsyncEngine, migration: Migration) -> None:
+    async with engine.begin() as conn:
+        await conn.execute(
+            text("INSERT OR REPLACE INTO schema_version (version, description) VALUES (:version, :description)"),
+            {"version": migration.version, "description": migration.description},
+        )
+
+
+def _create_all_ddl(engine: AsyncEngine) -> List[str]:
+    statements = []
+    for table in Base.metadata.sorted_tables:
+        statements.append(str(CreateTable(table).compile(dialect=engine.dialect)).strip())
+        for index in table.indexes:
+            statements.append(str(CreateIndex(index).compile(dialect=engine.dialect)).strip())
+    return statements
+
+
+async def plan_migrations(engine: AsyncEngine) -> List[str]:
+    """Describe the DDL that run_migrations would execute, without changing anything"""
+    if await _is_fresh_database(engine):
+        return [SCHEMA_VERSION_DDL, *_create_all_ddl(engine)]
+
+    current = await get_current_version(engine)
+    planned = [] if current else [SCHEMA_VERSION_DDL]
+    async with engine.connect() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not await _table_exists(conn, table.name):
+                planned.append(str(CreateTable(table).compile(dialect=engine.dialect)).strip())
+    for migration in MIGRATIONS:
+        if migration.version <= current:
+            continue
+        planned.append(f"-- migration {migration.version}: {migration.description}")
+        planned.extend(step.describe() for step in migration.steps)
+    return planned
+
+
+async def run_migrations(engine: AsyncEngine, batch_size: int = 500, pause: float = 0.05) -> int:
+    """
+    Bring the database schema up to date and return the resulting version.
+    A fresh database is created from the models and stamped with the latest version;
+    an existing one gets every pending migration applied in order.
+    """
+    fresh = await _is_fresh_database(engine)
+
+    async with engine.begin() as conn:
+        if fresh and engine.dialect.name == "sqlite":
+            # Only takes effect before the first table; lets maintenance return free pages
+            await conn.exec_driver_sql("PRAGMA auto_vacuum = INCREMENTAL")
+        await conn.execute(text(SCHEMA_VERSION_DDL))
+        # Creates missing tables only; existing tables are changed by migrations
+        logger.info("Creating database tables...")
+        await conn.run_sync(Base.metadata.create_all)
+
+    if fresh:
+        for migration in MIGRATIONS:
+            await _stamp(engine, migration)
+        return latest_version()
+
+    current = await get_current_version(engine)
+    for migration in MIGRATIONS:
+        if migration.version <= current:
+            continue
+        logger.info("Applying migration %d: %s", migration.version, migration.description)
+        for step in migration.steps:
+            await _apply_step(engine, step, batch_size, pause)
+        await _stamp(engine, migration)
+        current = migration.version
+
+    return current
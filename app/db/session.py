@@ -1,9 +1,9 @@
 from __future__ import annotations
 
 from contextlib import asynccontextmanager
-from typing import AsyncIterator
+from typing import AsyncIterator, Optional
 
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase
 
 from app.config import get_settings
@@ -13,8 +13,45 @@ class Base(DeclarativeBase):
     pass
 
 
-_engine = create_async_engine(get_settings().database_url, future=True, echo=False)
-AsyncSessionLocal = async_sessionmaker(_engine, expire_on_commit=False, class_=AsyncSession)
+# Built on first use, so importing models or handlers never touches the database
+_engine: Optional[AsyncEngine] = None
+_sessionmaker: Optional[async_sessionmaker[AsyncSession]] = None
+
+
+def get_engine() -> AsyncEngine:
+    """Shared engine, created from settings on first call"""
+    global _engine
+    if _engine is None:
+        settings = get_settings()
+        _engine = create_async_engine(
+            settings.database_url,
+            future=True,
+            echo=False,
+            # Repositories use lambda statements, so hot queries hit this cache
+            query_cache_size=settings.query_cache_size,
+        )
+    return _engine
+
+
+def get_sessionmaker() -> async_sessionmaker[AsyncSession]:
+    global _sessionmaker
+    if _sessionmaker is None:
+        _sessionmaker = async_sessionmaker(get_engine(), expire_on_commit=False, class_=AsyncSession)
+    return _sessionmaker
+
+
+def AsyncSessionLocal() -> AsyncSession:
+    """New session from the shared sessionmaker"""
+    return get_sessionmaker()()
+
+
+async def dispose_engine() -> None:
+    """Close pooled connections; the next get_engine() call builds a new engine"""
+    global _engine, _sessionmaker
+    if _engine is not None:
+        await _engine.dispose()
+    _engine = None
+    _sessionmaker = None
 
 
 @asynccontextmanager
@@ -28,6 +65,3 @@ async def db_session() -> AsyncIterator[AsyncSession]:
         raise
     finally:
         await session.close()
-
-
-
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, List, Optional, Tuple, TypeVar
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.db.session import AsyncSessionLocal, db_session
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+WriteOperation = Callable[[AsyncSession], Awaitable[T]]
+
+
+class WriteCoalescer:
+    """
+    Group commit for SQLite: write operations submitted by concurrent handlers
+    within a short window run in one transaction, each inside its own SAVEPOINT,
+    so a batch costs a single journal sync. Every caller gets its own result
+    or its own exception; a failed commit fails the whole batch.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession] = AsyncSessionLocal,
+        window: float = 0.005,
+        max_batch: int = 200,
+    ):
+        self.session_factory = session_factory
+        self.window = window
+        self.max_batch = max_batch
+        self._pending: List[Tuple[WriteOperation[Any], asyncio.Future]] = []
+        self._worker: Optional[asyncio.Task] = None
+        self.batches = 0
+        self.operations = 0
+
+    async def submit(self, operation: WriteOperation[T]) -> T:
+        """Queue an operation for the next batch and wait for its committed result"""
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((operation, future))
+        if self._worker is None:
+            self._worker = asyncio.create_task(self._run())
+        return await future
+
+    async def _run(self) -> None:
+        try:
+            while self._pending:
+                # Let concurrent writers join the batch
+                await asyncio.sleep(self.window)
+                batch = self._pending[: self.max_batch]
+                del self._pending[: self.max_batch]
+                await self._commit_batch(batch)
+        finally:
+            self._worker = None
+
+    async def _commit_batch(self, batch: List[Tuple[WriteOperation[Any], asyncio.Future]]) -> None:
+        outcomes: List[Tuple[asyncio.Future, Any, bool]] = []
+        session = self.session_factory()
+        try:
+            # pysqlite opens a transaction only before DML, so without an explicit
+            # BEGIN the RELEASE of each outermost SAVEPOINT would commit on its own
+            await session.execute(text("BEGIN"))
+            for operation, future in batch:
+                if future.done():  # caller was cancelled while waiting
+                    continue
+                try:
+                    async with session.begin_nested():
+                        result = await operation(session)
+                except Exception as exc:
+                    outcomes.append((future, exc, False))
+                else:
+                    outcomes.append((future, result, True))
+            await session.commit()
+        except Exception as exc:
+            await session.rollback()
+            logger.exception("Write batch of %d operations failed to commit", len(batch))
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        finally:
+            await session.close()
+
+        self.batches += 1
+        self.operations += len(outcomes)
+        for future, value, ok in outcomes:
+            if future.done():
+                continue
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
+
+
+_coalescer: Optional[WriteCoalescer] = None
+
+
+def get_write_coalescer() -> WriteCoalescer:
+    global _coalescer
+    if _coalescer is None:
+        settings = get_settings()
+        _coalescer = WriteCoalescer(window=settings.write_batch_window_ms / 1000)
+    return _coalescer
+
+
+async def run_write(operation: WriteOperation[T]) -> T:
+    """Run a write operation, group-committed when WRITE_BATCHING is enabled"""
+    if get_settings().write_batching:
+        return await get_write_coalescer().submit(operation)
+    async with db_session() as session:
+        return await operation(session)
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+from typing import Iterable, Sequence
+
+from aiogram import BaseMiddleware, Dispatcher, Router
+from aiogram.fsm.storage.memory import MemoryStorage
+
+from app.config import Settings
+from app.middlewares.idempotency import CallbackIdempotencyMiddleware
+from app.middlewares.profiling import ProfilingMiddleware
+from app.middlewares.scheduler import HandlerConcurrencyMiddleware, UserSchedulerMiddleware
+from app.services.profiler import SamplingProfiler
+
+
+def build_dispatcher(
+    settings: Settings,
+    routers: Iterable[Router],
+    outer_middlewares: Sequence[BaseMiddleware] = (),
+) -> Dispatcher:
+    """
+    Dispatcher with the bot's middleware stack and routers; shared by polling
+    and the traffic replayer. `outer_middlewares` run before all the others.
+    """
+    # admin_ids is passed to filters and handlers as workflow data
+    dp = Dispatcher(storage=MemoryStorage(), admin_ids=frozenset(settings.admin_ids))
+    for middleware in outer_middlewares:
+        dp.update.outer_middleware(middleware)
+    # Per-user ordering and global bound on concurrently processed updates
+    dp.update.outer_middleware(UserSchedulerMiddleware(settings.max_in_flight_updates))
+    concurrency = HandlerConcurrencyMiddleware(
+        settings.max_concurrent_readers, settings.max_concurrent_writers
+    )
+    dp.message.middleware(concurrency)
+    dp.callback_query.middleware(concurrency)
+    dp.inline_query.middleware(concurrency)
+    # Double taps on the same button run the handler once
+    idempotency = CallbackIdempotencyMiddleware(settings.callback_dedup_seconds)
+    dp.callback_query.outer_middleware(idempotency)
+    dp["callback_idempotency"] = idempotency
+    # Idle until an admin starts a /profile session
+    sampling_profiler = SamplingProfiler(settings.profile_dir, settings.profile_interval_ms / 1000)
+    dp.update.outer_middleware(ProfilingMiddleware(sampling_profiler))
+    dp["profiler"] = sampling_profiler
+
+    for router in routers:
+        dp.include_router(router)
+    return dp
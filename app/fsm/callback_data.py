@@ -1,6 +1,13 @@
-from sys import prefix
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+
 from aiogram.filters.callback_data import CallbackData
 
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
 
 # Новый класс CallbackData
 class ObjectCallback(CallbackData, prefix="objects"):
@@ -10,3 +17,35 @@ class ObjectCallback(CallbackData, prefix="objects"):
 
 class AddPaymentCallback(CallbackData, prefix="add_payment"):
     object_id: int | None = None
+
+
+class ObjectPageCallback(CallbackData, prefix="objpage"):
+    """Листание списка объектов; курсор (last_activity_at, id) последнего показанного объекта"""
+    scope: str  # "pick" — выбор объекта в /add и /payment, "list" — список /objects
+    include_completed: bool = False
+    activity_us: int = 0
+    after_id: int = 0
+
+    @classmethod
+    def for_cursor(
+        cls,
+        scope: str,
+        cursor: Optional[Tuple[datetime, int]],
+        include_completed: bool = False,
+    ) -> "ObjectPageCallback":
+        if cursor is None:
+            return cls(scope=scope, include_completed=include_completed)
+        activity, object_id = cursor
+        activity_us = (activity.replace(tzinfo=None) - _EPOCH) // _MICROSECOND
+        return cls(
+            scope=scope,
+            include_completed=include_completed,
+            activity_us=activity_us,
+            after_id=object_id,
+        )
+
+    @property
+    def cursor(self) -> Optional[Tuple[datetime, int]]:
+        if not self.after_id:
+            return None
+        return _EPOCH + self.activity_us * _MICROSECOND, self.after_id
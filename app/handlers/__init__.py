@@ -1 +1,15 @@
 # Handlers package
+
+# Handler modules in router registration order (first match wins)
+ROUTER_MODULES = (
+    "diag",
+    "start",
+    "help",
+    "objects",
+    "add_time",
+    "add_payment",
+    "edit",
+    "report",
+    "search",
+    "duplicates",
+)
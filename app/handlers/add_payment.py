@@ -1,4 +1,5 @@
 from __future__ import annotations
+import logging
 from datetime import timedelta
 
 from aiogram import F, Router, types
@@ -10,17 +11,22 @@ from aiogram.types import CallbackQuery
 from app.db.session import db_session
 from app.fsm.callback_data import AddPaymentCallback, ObjectCallback
 from app.handlers.utils.db_utilits import (
-    get_user_and_objects,
+    get_user_and_object_keyboard,
+    get_user_timezone,
     process_payment_transaction,
+    search_object_picker,
 )
 from app.handlers.utils.time_entry import prompt_object_selection
-from app.keyboards.common import Texts, get_cancel_keyboard, get_date_selection_keyboard
+from app.keyboards.common import MAIN_MENU_TEXTS, Texts, get_cancel_keyboard, get_date_selection_keyboard
+from app.middlewares.scheduler import DB_WRITE
 from app.repositories.object_repo import WorkObjectRepository
 from app.repositories.payment_repo import PaymentRepository
 from app.repositories.user_repo import UserRepository
 from app.utils.dateparse import get_today_in_timezone, parse_date, parse_russian_date
 from app.utils.formatting import format_currency
 
+logger = logging.getLogger(__name__)
+
 router = Router()
 
 
@@ -36,7 +42,7 @@ class AddPaymentStates(StatesGroup):
 @router.message(Command("payment"))
 async def cmd_payment(message: types.Message, state: FSMContext):
     """Handle /payment command - start adding payment"""
-    print("/payment command received")
+    logger.debug("Payment flow started", extra={"user_id": message.from_user.id if message.from_user else None})
     await state.clear()
     await state.set_state(AddPaymentStates.waiting_for_amount)
 
@@ -107,7 +113,7 @@ async def process_amount(message: types.Message, state: FSMContext):
         await state.update_data(amount_kopecks=amount_kopecks)
         await state.set_state(AddPaymentStates.waiting_for_date)
 
-        today = get_today_in_timezone()
+        today = get_today_in_timezone(await get_user_timezone(message.from_user.id))
         today_str = today.strftime("%d.%m.%y")
 
         await message.answer(
@@ -142,9 +148,9 @@ async def handle_payment_date_selection(
     current_state = await state.get_state()
 
     if data == "date_today":
-        current_date = get_today_in_timezone()
+        current_date = get_today_in_timezone(await get_user_timezone(callback.from_user.id))
     elif data == "date_yesterday":
-        current_date = get_today_in_timezone() - timedelta(days=1)
+        current_date = get_today_in_timezone(await get_user_timezone(callback.from_user.id)) - timedelta(days=1)
     elif data == "date_manual":
         # Переводим в состояние ручного ввода
         if current_state == AddPaymentStates.waiting_for_date:
@@ -167,7 +173,7 @@ async def handle_payment_date_selection(
         await callback.answer(f"Объект уже выбран.{object_id}")
         return
 
-    user, active_objects = await get_user_and_objects(callback.from_user.id)
+    user, objects_keyboard = await get_user_and_object_keyboard(callback.from_user.id)
     if not user:
         await state.clear()
         await callback.answer(
@@ -176,11 +182,11 @@ async def handle_payment_date_selection(
         return
 
     await state.set_state(AddPaymentStates.waiting_for_selection_object)
-    await prompt_object_selection(callback.message, active_objects)
+    await prompt_object_selection(callback.message, objects_keyboard)
 
 
 # 📦 Хендлер: обработка ручного ввода названия объекта
-@router.message(StateFilter(AddPaymentStates.waiting_for_object))
+@router.message(StateFilter(AddPaymentStates.waiting_for_object), flags={DB_WRITE: True})
 async def process_payment_object(message: types.Message, state: FSMContext):
     """Получает название объекта от пользователя и сохраняет оплату"""
     if not message.text or not message.from_user:
@@ -228,10 +234,36 @@ async def process_payment_object(message: types.Message, state: FSMContext):
     await state.clear()
 
 
+# 🔎 Хендлер: текст при выборе объекта — фильтр по началу названия (команды и кнопки меню — мимо)
+@router.message(
+    StateFilter(AddPaymentStates.waiting_for_selection_object),
+    F.text,
+    ~F.text.startswith("/"),
+    ~F.text.in_(MAIN_MENU_TEXTS),
+    flags={DB_WRITE: True},
+)
+async def process_payment_object_search(message: types.Message, state: FSMContext):
+    """Фильтрует объекты по началу названия; без совпадений текст считается новым объектом"""
+    if not message.text or not message.from_user:
+        await message.answer("❌ Название объекта не может быть пустым.")
+        return
+
+    objects_keyboard = await search_object_picker(message.from_user.id, message.text)
+    if objects_keyboard is None:
+        await process_payment_object(message, state)
+        return
+
+    await message.answer(
+        f"🔎 Объекты на «{message.text.strip()}»:",
+        reply_markup=objects_keyboard,
+    )
+
+
 # 🧱 Хендлер: выбор объекта из списка
 @router.callback_query(
     StateFilter(AddPaymentStates.waiting_for_selection_object),
     ObjectCallback.filter(F.action == "select"),
+    flags={DB_WRITE: True},
 )
 async def handle_object_select(
     callback: types.CallbackQuery,
@@ -281,7 +313,7 @@ async def handle_object_select(
 )
 async def handle_manual_object_input(callback: types.CallbackQuery, state: FSMContext):
     """Переводит пользователя в состояние ввода названия объекта"""
-    print("кнопка ручного ввода названия объекта")
+    logger.debug("Manual object input", extra={"user_id": callback.from_user.id})
     await state.set_state(AddPaymentStates.waiting_for_object)
 
     if isinstance(callback.message, types.Message):
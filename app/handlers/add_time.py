@@ -1,4 +1,5 @@
 from __future__ import annotations
+import html
 from typing import Optional
 
 from aiogram import Router, types, F
@@ -7,23 +8,31 @@ from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
 
 from app.fsm.callback_data import ObjectCallback
-from app.handlers.utils.db_utilits import get_user_and_objects, save_time_entry
+from app.handlers.utils.db_utilits import (
+    find_time_overlaps,
+    get_user_and_object_keyboard,
+    get_user_timezone,
+    save_time_entry,
+    search_object_picker,
+)
 from app.handlers.utils.time_entry import (
     prompt_for_comment,
     prompt_object_selection,
     validate_end_time,
 )
 from app.keyboards.common import (
+    MAIN_MENU_TEXTS,
     get_cancel_keyboard,
     get_date_selection_keyboard,
+    get_overlap_keyboard,
 )
+from app.middlewares.scheduler import DB_WRITE
 from app.utils.dateparse import (
     get_today_in_timezone,
     parse_date,
     parse_time,
-    calculate_hours,
+    calculate_minutes,
 )
-from app.utils.formatting import format_hours
 
 router = Router()
 
@@ -32,6 +41,7 @@ class AddTimeStates(StatesGroup):
     waiting_for_date = State()
     waiting_for_start_time = State()
     waiting_for_end_time = State()
+    confirming_overlap = State()
     waiting_for_select_object = State()
     waiting_for_object = State()
     waiting_for_comment = State()
@@ -54,7 +64,7 @@ async def cmd_add(message: types.Message, state: FSMContext):
 async def process_date(message: types.Message, state: FSMContext):
     """Process date input"""
     if message.text and message.text.lower() in ["сегодня", "today", "сейчас", "now"]:
-        date = get_today_in_timezone()
+        date = get_today_in_timezone(await get_user_timezone(message.from_user.id))
     else:
         if not message.text:
             await message.answer("❌ Пожалуйста, введите дату.")
@@ -131,15 +141,38 @@ async def process_end_time(message: types.Message, state: FSMContext):
     if not await validate_end_time(end_time, start_time, message):
         return
 
-    hours = calculate_hours(start_time, end_time)
-    await state.update_data(end_time=end_time, hours=hours)
+    minutes = calculate_minutes(start_time, end_time)
+    await state.update_data(end_time=end_time, minutes=minutes)
+
+    overlaps = await find_time_overlaps(message.from_user.id, date, start_time, end_time)
+    if overlaps:
+        await state.set_state(AddTimeStates.confirming_overlap)
+        lines = [
+            f"• {entry.start_time.strftime('%H:%M')}–{entry.end_time.strftime('%H:%M')} "
+            f"{html.escape(object_name)}"
+            for entry, object_name in overlaps
+        ]
+        await message.answer(
+            "⚠️ <b>Этот интервал пересекается с уже добавленными часами:</b>\n"
+            + "\n".join(lines)
+            + "\n\nВсё равно добавить запись?",
+            reply_markup=get_overlap_keyboard(),
+            parse_mode="HTML",
+        )
+        return
 
+    await continue_after_interval(message, state, message.from_user.id)
+
+
+async def continue_after_interval(message: types.Message, state: FSMContext, telegram_id: int):
+    """Ask for the comment or the object once the interval is accepted"""
+    data = await state.get_data()
     if data.get("object_id"):
         await state.set_state(AddTimeStates.waiting_for_comment)
         await prompt_for_comment(message)
         return
 
-    user, active_objects = await get_user_and_objects(message.from_user.id)
+    user, objects_keyboard = await get_user_and_object_keyboard(telegram_id)
     if not user:
         await state.clear()
         await message.answer(
@@ -148,7 +181,25 @@ async def process_end_time(message: types.Message, state: FSMContext):
         return
 
     await state.set_state(AddTimeStates.waiting_for_select_object)
-    await prompt_object_selection(message, active_objects)
+    await prompt_object_selection(message, objects_keyboard)
+
+
+@router.callback_query(StateFilter(AddTimeStates.confirming_overlap), F.data == "overlap_confirm")
+async def confirm_overlap(callback: types.CallbackQuery, state: FSMContext):
+    """Keep the overlapping interval and continue adding the entry"""
+    if isinstance(callback.message, types.Message):
+        await callback.message.edit_reply_markup(reply_markup=None)
+        await continue_after_interval(callback.message, state, callback.from_user.id)
+    await callback.answer()
+
+
+@router.callback_query(StateFilter(AddTimeStates.confirming_overlap), F.data == "overlap_skip")
+async def skip_overlap(callback: types.CallbackQuery, state: FSMContext):
+    """Drop the overlapping interval"""
+    await state.clear()
+    if isinstance(callback.message, types.Message):
+        await callback.message.edit_text("⏭ Запись не добавлена.")
+    await callback.answer()
 
 
 @router.message(StateFilter(AddTimeStates.waiting_for_object))
@@ -177,7 +228,31 @@ async def process_object(message: types.Message, state: FSMContext):
     )
 
 
-@router.message(StateFilter(AddTimeStates.waiting_for_comment))
+# Commands and menu buttons fall through to their own routers
+@router.message(
+    StateFilter(AddTimeStates.waiting_for_select_object),
+    F.text,
+    ~F.text.startswith("/"),
+    ~F.text.in_(MAIN_MENU_TEXTS),
+)
+async def process_object_search(message: types.Message, state: FSMContext):
+    """Текст при выборе объекта: фильтр по началу названия, без совпадений — новый объект"""
+    if not message.text or not message.from_user:
+        await message.answer("❌ Название объекта не может быть пустым.")
+        return
+
+    objects_keyboard = await search_object_picker(message.from_user.id, message.text)
+    if objects_keyboard is None:
+        await process_object(message, state)
+        return
+
+    await message.answer(
+        f"🔎 Объекты на «{message.text.strip()}»:",
+        reply_markup=objects_keyboard,
+    )
+
+
+@router.message(StateFilter(AddTimeStates.waiting_for_comment), flags={DB_WRITE: True})
 async def process_comment(message: types.Message, state: FSMContext):
     """Обработка комментария и сохранение записи времени"""
     if isinstance(message, types.Message) and not message.from_user:
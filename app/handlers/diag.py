@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+import html
+from typing import TYPE_CHECKING, FrozenSet, Optional
+
+from aiogram import Bot, Dispatcher, Router, types
+from aiogram.filters import BaseFilter, Command, CommandObject
+from aiogram.fsm.storage.base import BaseStorage
+
+if TYPE_CHECKING:
+    from app.middlewares.idempotency import CallbackIdempotencyMiddleware
+    from app.services.profiler import ProfileResult, SamplingProfiler
+
+# Admin-only: diagnostics (tracemalloc, gc walks), backup stats and profiler
+# helpers are imported inside the handlers, so startup does not load them
+router = Router()
+
+# /profile without arguments
+DEFAULT_PROFILE_UPDATES = 100
+# Upper bound for an update-count session on a quiet bot
+MAX_PROFILE_SECONDS = 600
+
+
+class AdminFilter(BaseFilter):
+    """Passes messages from telegram ids listed in ADMIN_IDS (dispatcher's admin_ids)"""
+
+    async def __call__(self, message: types.Message, admin_ids: FrozenSet[int] = frozenset()) -> bool:
+        return message.from_user is not None and message.from_user.id in admin_ids
+
+
+def _mb(size: int) -> str:
+    return f"{size / (1024 * 1024):.1f} МБ"
+
+
+def build_overview(
+    fsm_storage: Optional[BaseStorage],
+    callback_idempotency: Optional[CallbackIdempotencyMiddleware] = None,
+) -> str:
+    """Text of the /diag overview"""
+    from app.db.session import get_engine
+    from app.keyboards.cache import object_keyboard_cache
+    from app.middlewares.scheduler import scheduler_stats
+    from app.services.backup import backup_stats
+    from app.services.diagnostics import (
+        engine_stats,
+        fsm_storage_stats,
+        identity_map_stats,
+        memory_snapshots,
+        rss_bytes,
+    )
+
+    lines = ["🩺 <b>Диагностика</b>", "", f"RSS: {_mb(rss_bytes())}"]
+
+    fsm = fsm_storage_stats(fsm_storage) if fsm_storage is not None else None
+    if fsm is not None:
+        lines.append(
+            f"FSM: {fsm.entries} записей ({fsm.with_state} с состоянием, "
+            f"{fsm.empty} пустых), ~{_mb(fsm.approx_bytes)}"
+        )
+
+    sessions = identity_map_stats()
+    lines.append(f"Сессии БД: {sessions['sessions']}, объектов в identity map: {sessions['identity_map']}")
+    engine = engine_stats(get_engine())
+    lines.append(f"Пул: {html.escape(engine['pool'])}")
+    lines.append(f"Кэш SQL: {engine['compiled_cache']}")
+    lines.append(f"Кэш клавиатур: {len(object_keyboard_cache)} из {object_keyboard_cache.max_users}")
+    if callback_idempotency is not None:
+        lines.append(f"Кэш нажатий: {callback_idempotency.cached}, повторов: {callback_idempotency.duplicates}")
+
+    scheduler = scheduler_stats.snapshot()
+    lines.append(
+        f"Планировщик: в работе {scheduler['in_flight']}, пользователей в очереди {scheduler['queued_users']}, "
+        f"ожидание p95 {scheduler['updates']['p95_ms']:.1f} мс"
+    )
+    backup = backup_stats.snapshot()
+    if backup["last_at"] is not None:
+        lines.append(
+            f"Бэкап: {backup['last_at']}, {backup['last_seconds']} с, {_mb(backup['last_size'])} "
+            f"(сжато {_mb(backup['last_compressed_size'])}), ошибок {backup['failures']}"
+        )
+    elif backup["failures"]:
+        lines.append(f"Бэкап: ошибок {backup['failures']}, успешных ещё не было")
+    if memory_snapshots.tracing:
+        lines.append(f"tracemalloc: включён, {_mb(memory_snapshots.traced_bytes())}")
+    else:
+        lines.append("tracemalloc: выключен (/diag snapshot включает)")
+    return "\n".join(lines)
+
+
+def build_snapshot_report() -> str:
+    """Take a tracemalloc snapshot and describe growth since the previous one"""
+    from app.services.diagnostics import memory_snapshots
+
+    diff = memory_snapshots.take()
+    if diff is None:
+        return (
+            "📸 tracemalloc включён, базовый снимок сохранён.\n"
+            "Повторите /diag snapshot позже, чтобы увидеть рост памяти."
+        )
+    if not diff:
+        return "📸 С прошлого снимка новых выделений памяти нет."
+
+    lines = ["📸 <b>Рост памяти с прошлого снимка:</b>", ""]
+    for stat in diff:
+        frame = stat.traceback[0]
+        lines.append(
+            f"{stat.size_diff / 1024:+.1f} КБ ({stat.count_diff:+d}) "
+            f"<code>{html.escape(frame.filename)}:{frame.lineno}</code>"
+        )
+    return "\n".join(lines)
+
+
+@router.message(Command("diag"), AdminFilter())
+async def cmd_diag(
+    message: types.Message,
+    command: CommandObject,
+    fsm_storage: Optional[BaseStorage] = None,
+    callback_idempotency: Optional[CallbackIdempotencyMiddleware] = None,
+):
+    """Handle /diag [snapshot|stop] - admin memory and state diagnostics"""
+    action = (command.args or "").strip().lower()
+    if action == "snapshot":
+        text = build_snapshot_report()
+    elif action == "stop":
+        from app.services.diagnostics import memory_snapshots
+
+        memory_snapshots.stop()
+        text = "⏹ tracemalloc выключен, снимки удалены."
+    else:
+        text = build_overview(fsm_storage, callback_idempotency)
+    await message.answer(text, parse_mode="HTML")
+
+
+def parse_profile_args(args: str):
+    """'' / '50' -> (updates, seconds cap); '30s' -> (None, 30); None when unparsable"""
+    args = args.strip().lower()
+    if not args:
+        return DEFAULT_PROFILE_UPDATES, MAX_PROFILE_SECONDS
+    if args.endswith("s") and args[:-1].isdigit() and int(args[:-1]) > 0:
+        return None, min(int(args[:-1]), MAX_PROFILE_SECONDS)
+    if args.isdigit() and int(args) > 0:
+        return int(args), MAX_PROFILE_SECONDS
+    return None
+
+
+def format_profile_result(result: ProfileResult) -> str:
+    """Chat summary of a finished profiling session"""
+    from app.services.profiler import OUTSIDE_HANDLERS
+
+    lines = [
+        "⏱ <b>Профиль готов</b>",
+        f"{result.updates} апдейтов за {result.seconds:.1f} с, {result.samples} сэмплов "
+        f"по {result.interval * 1000:.0f} мс",
+    ]
+    if result.path is not None:
+        lines.append(f"Файл: <code>{html.escape(str(result.path))}</code>")
+
+    lines += ["", "<b>Время в event loop по обработчикам:</b>"]
+    for name, count in result.per_handler:
+        label = "вне обработчиков (ожидание, I/O)" if name == OUTSIDE_HANDLERS else name
+        lines.append(f"• {html.escape(label)}: {count * result.interval * 1000:.0f} мс")
+
+    if result.top_functions:
+        lines += ["", "<b>Топ функций (собственное время):</b>"]
+        for name, count in result.top_functions:
+            lines.append(f"• <code>{html.escape(name)}</code>: {count}")
+    return "\n".join(lines)
+
+
+@router.message(Command("profile"), AdminFilter())
+async def cmd_profile(
+    message: types.Message,
+    command: CommandObject,
+    bot: Bot,
+    dispatcher: Optional[Dispatcher] = None,
+    profiler: Optional[SamplingProfiler] = None,
+):
+    """Handle /profile [N | Ts | stop] - sample handlers for the next N updates or T seconds"""
+    if profiler is None or dispatcher is None:
+        await message.answer("❌ Профилировщик не подключён.")
+        return
+
+    args = (command.args or "").strip().lower()
+    if args == "stop":
+        if profiler.stop() is None:
+            await message.answer("ℹ️ Профилирование не запущено.")
+        return
+    if profiler.running:
+        await message.answer("ℹ️ Профилирование уже идёт. Остановить: /profile stop")
+        return
+
+    limits = parse_profile_args(args)
+    if limits is None:
+        await message.answer("❌ Используйте: /profile [число апдейтов | секунды, например 30s | stop]")
+        return
+    updates, seconds = limits
+    chat_id = message.chat.id
+
+    from app.services.profiler import handler_names
+
+    async def report(result: ProfileResult) -> None:
+        await bot.send_message(chat_id, format_profile_result(result), parse_mode="HTML")
+
+    profiler.start(handler_names(dispatcher), updates=updates, seconds=seconds, on_finish=report)
+    scope = f"следующие {updates} апдейтов" if updates else f"{seconds} с"
+    await message.answer(f"⏱ Профилирование запущено: {scope}. Остановить: /profile stop")
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import html
+
+from aiogram import Router, types
+from aiogram.filters import Command
+from aiogram.fsm.context import FSMContext
+
+from app.db.session import db_session
+from app.repositories.time_repo import EntryInterval, TimeEntryRepository
+from app.repositories.user_repo import UserRepository
+from app.services.overlaps import find_overlaps, is_duplicate
+
+router = Router()
+
+# Keeps the answer well under Telegram's 4096 characters
+MAX_PAIRS_SHOWN = 20
+
+
+def _format_interval(interval: EntryInterval) -> str:
+    return (
+        f"{interval.start_time.strftime('%d.%m.%y %H:%M')}–{interval.end_time.strftime('%H:%M')} "
+        f"{html.escape(interval.object_name)} /edit_time_{interval.id}"
+    )
+
+
+@router.message(Command("duplicates"))
+async def cmd_duplicates(message: types.Message, state: FSMContext):
+    """Handle /duplicates command - find overlapping and duplicate time entries"""
+    await state.clear()
+
+    async with db_session() as session:
+        user = await UserRepository(session).get_by_telegram_id(message.from_user.id)
+        if not user:
+            await message.answer("❌ Пользователь не найден. Используйте /start для регистрации.")
+            return
+        intervals = await TimeEntryRepository(session).get_intervals(user.id)
+
+    pairs = find_overlaps(intervals)
+    if not pairs:
+        await message.answer("✅ Пересекающихся записей не найдено.")
+        return
+
+    lines = [f"⚠️ <b>Пересекающиеся записи: {len(pairs)}</b>", ""]
+    for first, second in pairs[:MAX_PAIRS_SHOWN]:
+        kind = "🔁 Дубликат" if is_duplicate(first, second) else "↔️ Пересечение"
+        lines.append(f"{kind}\n• {_format_interval(first)}\n• {_format_interval(second)}")
+    if len(pairs) > MAX_PAIRS_SHOWN:
+        lines.append(f"…и ещё {len(pairs) - MAX_PAIRS_SHOWN}")
+
+    await message.answer("\n".join(lines), parse_mode="HTML")
@@ -7,12 +7,14 @@ from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
 
 from app.db.session import db_session
+from app.handlers.utils.db_utilits import get_user_timezone
 from app.keyboards.common import get_cancel_keyboard
+from app.middlewares.scheduler import DB_WRITE
 from app.repositories.payment_repo import PaymentRepository
 from app.repositories.time_repo import TimeEntryRepository
 from app.repositories.user_repo import UserRepository
 from app.utils.dateparse import parse_russian_date
-from app.utils.formatting import format_currency, format_hours
+from app.utils.formatting import format_currency, format_minutes
 
 router = Router()
 
@@ -63,7 +65,7 @@ async def cmd_edit_time(message: types.Message, state: FSMContext):
         
         # Show current entry info
         date_str = entry.date.strftime("%d.%m.%y")
-        hours_str = format_hours(entry.hours)
+        hours_str = format_minutes(entry.duration_minutes)
         comment_str = f"\n💬 Комментарий: {entry.comment}" if entry.comment else ""
         
         await message.answer(
@@ -134,7 +136,7 @@ async def process_edit_hours(message: types.Message, state: FSMContext):
         if hours <= 0:
             raise ValueError("Hours must be positive")
         
-        await state.update_data(hours=hours)
+        await state.update_data(minutes=hours * 60)
         await state.set_state(EditTimeStates.waiting_for_date)
         
         await message.answer(
@@ -152,7 +154,7 @@ async def process_edit_hours(message: types.Message, state: FSMContext):
 @router.message(StateFilter(EditTimeStates.waiting_for_date))
 async def process_edit_date(message: types.Message, state: FSMContext):
     """Process new date input"""
-    date = parse_russian_date(message.text)
+    date = parse_russian_date(message.text, await get_user_timezone(message.from_user.id))
     if not date:
         await message.answer(
             "❌ Неверный формат даты. Используйте формат ДД.ММ.ГГ",
@@ -169,7 +171,7 @@ async def process_edit_date(message: types.Message, state: FSMContext):
     )
 
 
-@router.message(StateFilter(EditTimeStates.waiting_for_comment))
+@router.message(StateFilter(EditTimeStates.waiting_for_comment), flags={DB_WRITE: True})
 async def process_edit_comment(message: types.Message, state: FSMContext):
     """Process new comment input and save changes"""
     data = await state.get_data()
@@ -179,35 +181,37 @@ async def process_edit_comment(message: types.Message, state: FSMContext):
     if message.text.lower() not in ["нет", "no", "удалить", "delete", ""]:
         comment = message.text.strip()
     
-    # Update entry
+    # Update entry: one UPDATE ... RETURNING, ownership checked in its WHERE clause
     async with db_session() as session:
-        time_repo = TimeEntryRepository(session)
-        
-        entry = await time_repo.update_entry(
-            entry_id=data["entry_id"],
-            hours=data["hours"],
-            date=data["date"],
-            comment=comment
-        )
+        user = await UserRepository(session).get_by_telegram_id(message.from_user.id)
+        entry = None
+        if user:
+            entry = await TimeEntryRepository(session).update_entry(
+                entry_id=data["entry_id"],
+                user_id=user.id,
+                minutes=data["minutes"],
+                date=data["date"],
+                comment=comment
+            )
         
         if not entry:
             await message.answer("❌ Ошибка при обновлении записи.")
             await state.clear()
             return
     
-    # Format success message
-    date_str = data["date"].strftime("%d.%m.%y")
-    hours_str = format_hours(data["hours"])
+    # Format success message from the values written
+    date_str = entry.date.strftime("%d.%m.%y")
+    hours_str = format_minutes(entry.duration_minutes)
     
     success_text = (
         f"✅ <b>Запись обновлена!</b>\n\n"
         f"📅 Дата: {date_str}\n"
         f"⏰ Часы: {hours_str}\n"
-        f"🏗️ Объект: {entry.work_object.name}"
+        f"🏗️ Объект: {entry.object_name}"
     )
     
-    if comment:
-        success_text += f"\n💬 Комментарий: {comment}"
+    if entry.comment:
+        success_text += f"\n💬 Комментарий: {entry.comment}"
     
     await message.answer(success_text, parse_mode="HTML")
     await state.clear()
@@ -240,12 +244,12 @@ async def process_edit_amount(message: types.Message, state: FSMContext):
         )
 
 
-@router.message(StateFilter(EditPaymentStates.waiting_for_date))
+@router.message(StateFilter(EditPaymentStates.waiting_for_date), flags={DB_WRITE: True})
 async def process_edit_payment_date(message: types.Message, state: FSMContext):
     """Process new payment date input and save changes"""
     data = await state.get_data()
     
-    date = parse_russian_date(message.text)
+    date = parse_russian_date(message.text, await get_user_timezone(message.from_user.id))
     if not date:
         await message.answer(
             "❌ Неверный формат даты. Используйте формат ДД.ММ.ГГ",
@@ -253,30 +257,32 @@ async def process_edit_payment_date(message: types.Message, state: FSMContext):
         )
         return
     
-    # Update payment
+    # Update payment: one UPDATE ... RETURNING, ownership checked in its WHERE clause
     async with db_session() as session:
-        payment_repo = PaymentRepository(session)
-        
-        payment = await payment_repo.update_payment(
-            payment_id=data["payment_id"],
-            amount_kopecks=data["amount_kopecks"],
-            date=date
-        )
+        user = await UserRepository(session).get_by_telegram_id(message.from_user.id)
+        payment = None
+        if user:
+            payment = await PaymentRepository(session).update_payment(
+                payment_id=data["payment_id"],
+                user_id=user.id,
+                amount_kopecks=data["amount_kopecks"],
+                date=date
+            )
         
         if not payment:
             await message.answer("❌ Ошибка при обновлении записи оплаты.")
             await state.clear()
             return
     
-    # Format success message
-    date_str = date.strftime("%d.%m.%y")
-    amount_str = format_currency(data["amount_kopecks"])
+    # Format success message from the values written
+    date_str = payment.date.strftime("%d.%m.%y")
+    amount_str = format_currency(payment.amount)
     
     success_text = (
         f"✅ <b>Запись оплаты обновлена!</b>\n\n"
         f"📅 Дата: {date_str}\n"
         f"💰 Сумма: {amount_str}\n"
-        f"🏗️ Объект: {payment.work_object.name}"
+        f"🏗️ Объект: {payment.object_name}"
     )
     
     await message.answer(success_text, parse_mode="HTML")
@@ -1,4 +1,5 @@
 from __future__ import annotations
+import logging
 from operator import call
 
 from aiogram import Router, types, F
@@ -9,19 +10,23 @@ from aiogram.fsm.state import State, StatesGroup
 
 
 from app.db.session import db_session
-from app.fsm.callback_data import ObjectCallback
-from app.keyboards.common import Texts
+from app.fsm.callback_data import ObjectCallback, ObjectPageCallback
+from app.handlers.utils.db_utilits import get_object_picker_page
+from app.keyboards.common import MAIN_MENU_TEXTS, OBJECTS_PAGE_SIZE, Texts
 from app.keyboards.objects import (
     get_confirm_delete_keyboard,
     get_object_actions_keyboard,
     get_objects_list_keyboard,
 )
+from app.middlewares.scheduler import DB_WRITE
 from app.models.work_object import ObjectStatus
 from app.repositories.object_repo import WorkObjectRepository
 from app.repositories.payment_repo import PaymentRepository
 from app.repositories.time_repo import TimeEntryRepository
 from app.repositories.user_repo import UserRepository
-from app.utils.formatting import format_currency, format_hours
+from app.services.reporting import ReportingService
+
+logger = logging.getLogger(__name__)
 
 router = Router()
 
@@ -38,9 +43,8 @@ async def cmd_select_object(
     query: types.CallbackQuery, callback_data: ObjectCallback, state: FSMContext
 ):
     """Handle object selection"""
-    print("cmd_select_object")
     await state.clear()
-    print(f"cmd_select_object {callback_data.object_id}")
+    logger.debug("Object selected", extra={"user_id": query.from_user.id, "object_id": callback_data.object_id})
     object_id = callback_data.object_id  # теперь берём ID из callback_data
     if not object_id:
         await query.answer("❌ Некорректный идентификатор объекта")
@@ -64,53 +68,25 @@ async def cmd_select_object(
             await query.answer("❌ Объект не найден")
             return
 
-        # Получаем данные по объекту
-        time_entries = await time_repo.get_by_object_id(object_id)
-        payments = await payment_repo.get_by_object_id(object_id)
+        # Получаем данные по объекту: только нужные столбцы, без ORM-сущностей
+        archived = work_object.is_archived
+        time_entries = await time_repo.get_rows(object_id, include_archive=archived)
+        payments = await payment_repo.get_rows(object_id, include_archive=archived)
 
-        total_hours = int(sum(entry.hours for entry in time_entries))
+        # Все строки уже загружены — итоги считаются без отдельных запросов
+        total_minutes = sum(entry.duration_minutes for entry in time_entries)
         total_payments = sum(payment.amount for payment in payments)
 
-        # Формируем текст
-        status_emoji = "🔵" if work_object.status == ObjectStatus.ACTIVE else "🟢"
-        status_text = (
-            "Активен" if work_object.status == ObjectStatus.ACTIVE else "Завершён"
-        )
-
-        info_text = (
-            f"🏗️ <b>{work_object.name}</b>\n"
-            f"Статус: {status_emoji} {status_text}\n"
-            f"Всего часов: {format_hours(total_hours)}\n"
-            f"Всего оплат: {format_currency(total_payments)}\n"
-            f"Дата создания: {work_object.created_at.strftime('%d.%m.%y')}"
+        info_text = ReportingService.generate_object_card(
+            work_object, time_entries, payments, total_minutes, total_payments
         )
 
-        if time_entries:
-            first_date = min(entry.date for entry in time_entries).strftime("%d.%m.%y")
-            info_text += f"\nНачало работ: {first_date}"
-
-        if work_object.status == ObjectStatus.COMPLETED and time_entries:
-            last_date = max(entry.date for entry in time_entries).strftime("%d.%m.%y")
-            info_text += f"\nЗавершение: {last_date}"
-
-        # Добавляем список работ
-        if time_entries:
-            info_text += "\n\n🕒 <b>Записи работ:</b>"
-            for entry in sorted(time_entries, key=lambda x: x.date):
-                info_text += f"\n• {entry.date.strftime('%d.%m.%y')} — {format_hours(entry.hours)}"
-
-        # Добавляем список оплат
-        if payments:
-            info_text += "\n\n💰 <b>Записи оплат:</b>"
-            for payment in sorted(payments, key=lambda x: x.date):
-                info_text += f"\n• {payment.date.strftime('%d.%m.%y')} — {format_currency(payment.amount)}"
-
         if isinstance(query.message, Message):
             # Редактируем сообщение с информацией
             await query.message.edit_text(
                 info_text,
                 reply_markup=get_object_actions_keyboard(
-                    work_object, total_hours, total_payments
+                    work_object, total_minutes, total_payments
                 ),
                 parse_mode="HTML",
             )
@@ -123,6 +99,7 @@ async def cmd_select_object(
 async def cmd_objects(message: types.Message, state: FSMContext):
     """Handle /objects command"""
     await state.clear()
+    await state.set_state(ObjectStates.waiting_for_object)
     await show_objects_list(message, include_completed=True)
 
 
@@ -130,6 +107,7 @@ async def cmd_objects(message: types.Message, state: FSMContext):
 async def objects_button(message: types.Message, state: FSMContext):
     """Handle objects button press"""
     await state.clear()
+    await state.set_state(ObjectStates.waiting_for_object)
     await show_objects_list(message, include_completed=True)
 
 
@@ -146,9 +124,9 @@ async def show_objects_list(message: types.Message, include_completed: bool = Tr
             )
             return
 
-        objects = await object_repo.get_all_for_user(user.id, include_completed)
+        page = await object_repo.get_page(user.id, include_completed, limit=OBJECTS_PAGE_SIZE)
 
-        if not objects:
+        if not page.objects:
             await message.answer(
                 "📝 У вас пока нет объектов.\n\n"
                 "Создайте первый объект, добавив часы работы или оплату.",
@@ -159,9 +137,78 @@ async def show_objects_list(message: types.Message, include_completed: bool = Tr
         status_text = "всех" if include_completed else "активных"
         await message.answer(
             f"🏗️ Ваши объекты ({status_text}):",
-            reply_markup=get_objects_list_keyboard(objects, include_completed),
+            reply_markup=get_objects_list_keyboard(page.objects, include_completed, page.next_cursor),
+        )
+
+
+@router.message(
+    StateFilter(ObjectStates.waiting_for_object),
+    F.text,
+    ~F.text.startswith("/"),
+    ~F.text.in_(MAIN_MENU_TEXTS),
+)
+async def search_objects(message: types.Message, state: FSMContext):
+    """Filter objects list by name prefix typed by the user"""
+    if not message.text or not message.from_user:
+        return
+
+    async with db_session() as session:
+        user_repo = UserRepository(session)
+        object_repo = WorkObjectRepository(session)
+
+        user = await user_repo.get_by_telegram_id(message.from_user.id)
+        if not user:
+            await message.answer(
+                "❌ Пользователь не найден. Используйте /start для регистрации."
+            )
+            return
+
+        objects = await object_repo.search_by_prefix(user.id, message.text, limit=OBJECTS_PAGE_SIZE)
+
+    if not objects:
+        await message.answer(f"🔎 Объекты на «{message.text.strip()}» не найдены.")
+        return
+
+    await message.answer(
+        f"🔎 Объекты на «{message.text.strip()}»:",
+        reply_markup=get_objects_list_keyboard(objects, include_completed=True, paged=True),
+    )
+
+
+@router.callback_query(ObjectPageCallback.filter())
+async def object_page_callback(
+    callback: types.CallbackQuery, callback_data: ObjectPageCallback, state: FSMContext
+):
+    """Show another page of an object picker or objects list"""
+    if callback_data.scope == "pick":
+        markup = await get_object_picker_page(callback.from_user.id, callback_data.cursor)
+    else:
+        async with db_session() as session:
+            user_repo = UserRepository(session)
+            object_repo = WorkObjectRepository(session)
+
+            user = await user_repo.get_by_telegram_id(callback.from_user.id)
+            if not user:
+                await callback.answer("❌ Пользователь не найден")
+                return
+
+            page = await object_repo.get_page(
+                user.id,
+                callback_data.include_completed,
+                limit=OBJECTS_PAGE_SIZE,
+                after=callback_data.cursor,
+            )
+        markup = get_objects_list_keyboard(
+            page.objects,
+            callback_data.include_completed,
+            page.next_cursor,
+            paged=callback_data.cursor is not None,
         )
 
+    if markup is not None and isinstance(callback.message, Message):
+        await callback.message.edit_reply_markup(reply_markup=markup)
+    await callback.answer()
+
 
 @router.callback_query(lambda c: c.data == "objects_list")
 async def objects_list_callback(callback: types.CallbackQuery, state: FSMContext):
@@ -189,7 +236,7 @@ async def objects_all_callback(callback: types.CallbackQuery, state: FSMContext)
     await callback.answer()
 
 
-@router.callback_query(lambda c: c.data.startswith("complete_"))
+@router.callback_query(lambda c: c.data.startswith("complete_"), flags={DB_WRITE: True})
 async def complete_object_callback(callback: types.CallbackQuery, state: FSMContext):
     """Handle complete object callback"""
     object_id = int(callback.data.split("_")[1])
@@ -203,18 +250,18 @@ async def complete_object_callback(callback: types.CallbackQuery, state: FSMCont
             await callback.answer("❌ Пользователь не найден")
             return
 
-        work_object = await object_repo.update_status(
+        name = await object_repo.update_status(
             object_id, user.id, ObjectStatus.COMPLETED
         )
-        if work_object:
-            await callback.answer("✅ Объект завершён")
+        if name:
+            await callback.answer(f"✅ Объект «{name}» завершён")
             # Refresh object details
             await object_details_callback(callback, state)
         else:
             await callback.answer("❌ Ошибка при завершении объекта")
 
 
-@router.callback_query(lambda c: c.data.startswith("reopen_"))
+@router.callback_query(lambda c: c.data.startswith("reopen_"), flags={DB_WRITE: True})
 async def reopen_object_callback(callback: types.CallbackQuery, state: FSMContext):
     """Handle reopen object callback"""
     object_id = int(callback.data.split("_")[1])
@@ -228,11 +275,11 @@ async def reopen_object_callback(callback: types.CallbackQuery, state: FSMContex
             await callback.answer("❌ Пользователь не найден")
             return
 
-        work_object = await object_repo.update_status(
+        name = await object_repo.update_status(
             object_id, user.id, ObjectStatus.ACTIVE
         )
-        if work_object:
-            await callback.answer("🔄 Объект открыт заново")
+        if name:
+            await callback.answer(f"🔄 Объект «{name}» открыт заново")
             # Refresh object details
             await object_details_callback(callback, state)
         else:
@@ -269,7 +316,7 @@ async def delete_object_callback(callback: types.CallbackQuery, state: FSMContex
     await callback.answer()
 
 
-@router.callback_query(lambda c: c.data.startswith("confirm_delete_"))
+@router.callback_query(lambda c: c.data.startswith("confirm_delete_"), flags={DB_WRITE: True})
 async def confirm_delete_callback(callback: types.CallbackQuery, state: FSMContext):
     """Handle confirm delete callback"""
     object_id = int(callback.data.split("_")[2])
@@ -283,9 +330,9 @@ async def confirm_delete_callback(callback: types.CallbackQuery, state: FSMConte
             await callback.answer("❌ Пользователь не найден")
             return
 
-        success = await object_repo.delete_object(object_id, user.id)
-        if success:
-            await callback.answer("🗑️ Объект удалён")
+        name = await object_repo.delete_object(object_id, user.id)
+        if name:
+            await callback.answer(f"🗑️ Объект «{name}» удалён")
             await show_objects_list(callback.message, include_completed=True)
         else:
             await callback.answer("❌ Ошибка при удалении объекта")
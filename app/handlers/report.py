@@ -8,12 +8,11 @@ from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 
 from app.db.session import db_session
+from app.handlers.utils.db_utilits import get_user_timezone
 from app.keyboards.common import Texts, get_cancel_keyboard
 from app.repositories.object_repo import WorkObjectRepository
-from app.repositories.payment_repo import PaymentRepository
-from app.repositories.time_repo import TimeEntryRepository
+from app.repositories.rollup_repo import RollupRepository
 from app.repositories.user_repo import UserRepository
-from app.services.reporting import ReportingService
 from app.utils.dateparse import parse_russian_date
 
 router = Router()
@@ -32,6 +31,8 @@ async def cmd_report(message: types.Message, state: FSMContext):
     builder = InlineKeyboardBuilder()
     builder.add(InlineKeyboardButton(text=Texts.LAST_MONTH, callback_data="report_last_month"))
     builder.add(InlineKeyboardButton(text=Texts.CUSTOM_PERIOD, callback_data="report_custom"))
+    builder.add(InlineKeyboardButton(text=Texts.MONTHLY_REPORT, callback_data="report_months"))
+    builder.add(InlineKeyboardButton(text=Texts.YEAR_TO_DATE, callback_data="report_ytd"))
     builder.add(InlineKeyboardButton(text="⬅️ Назад", callback_data="back"))
     builder.adjust(1)
     
@@ -54,12 +55,48 @@ async def report_last_month_callback(callback: types.CallbackQuery, state: FSMCo
     """Handle last month report callback"""
     await state.clear()
     
-    start_date, end_date = ReportingService.get_last_month_period()
+    from app.services.reporting import ReportingService
+
+    start_date, end_date = ReportingService.get_last_month_period(
+        timezone_name=await get_user_timezone(callback.from_user.id)
+    )
     if isinstance(callback.message, types.Message):
         await generate_period_report(callback.message, callback.from_user.id, start_date, end_date)
         await callback.answer()
 
 
+@router.callback_query(lambda c: c.data == "report_months")
+async def report_months_callback(callback: types.CallbackQuery, state: FSMContext):
+    """Handle month-by-month report callback"""
+    await state.clear()
+
+    from app.services.reporting import ReportingService
+
+    start_date, end_date = ReportingService.get_recent_months_period(
+        timezone_name=await get_user_timezone(callback.from_user.id)
+    )
+    if isinstance(callback.message, types.Message):
+        await generate_monthly_report(callback.message, callback.from_user.id, start_date, end_date)
+        await callback.answer()
+
+
+@router.callback_query(lambda c: c.data == "report_ytd")
+async def report_ytd_callback(callback: types.CallbackQuery, state: FSMContext):
+    """Handle year-to-date report callback"""
+    await state.clear()
+
+    from app.services.reporting import ReportingService
+
+    start_date, end_date = ReportingService.get_year_to_date_period(
+        timezone_name=await get_user_timezone(callback.from_user.id)
+    )
+    if isinstance(callback.message, types.Message):
+        await generate_monthly_report(
+            callback.message, callback.from_user.id, start_date, end_date, year_to_date=True
+        )
+        await callback.answer()
+
+
 @router.callback_query(lambda c: c.data == "report_custom")
 async def report_custom_callback(callback: types.CallbackQuery, state: FSMContext):
     """Handle custom period report callback"""
@@ -80,7 +117,7 @@ async def process_start_date(message: types.Message, state: FSMContext):
     if isinstance(message, types.Message):
         await message.answer("❌ Ошибка: сообщение не от пользователя.")
         return
-    start_date = parse_russian_date(message.text)
+    start_date = parse_russian_date(message.text, await get_user_timezone(message.from_user.id))
     if not start_date:
         await message.answer(
             "❌ Неверный формат даты. Используйте формат ДД.ММ.ГГ\n"
@@ -107,7 +144,7 @@ async def process_end_date(message: types.Message, state: FSMContext):
     data = await state.get_data()
     start_date = data["start_date"]
     
-    end_date = parse_russian_date(message.text)
+    end_date = parse_russian_date(message.text, await get_user_timezone(message.from_user.id))
     if not end_date:
         await message.answer(
             "❌ Неверный формат даты. Используйте формат ДД.ММ.ГГ\n"
@@ -132,8 +169,7 @@ async def generate_period_report(message: types.Message, user_id: int, start_dat
     async with db_session() as session:
         user_repo = UserRepository(session)
         object_repo = WorkObjectRepository(session)
-        time_repo = TimeEntryRepository(session)
-        payment_repo = PaymentRepository(session)
+        rollup_repo = RollupRepository(session)
         
         # Get user
         user = await user_repo.get_by_telegram_id(user_id)
@@ -141,39 +177,15 @@ async def generate_period_report(message: types.Message, user_id: int, start_dat
             await message.answer("❌ Пользователь не найден. Используйте /start для регистрации.")
             return
         
-        print(f'{user.id}, {user.telegram_id}, {user.first_name}')
-        
         # Get all objects for user
         objects = await object_repo.get_all_for_user(user.id, include_completed=True)
         
-        # Get time entries and payments for period
-        all_time_entries = []
-        all_payments = []
+        # Per-object totals for the period from daily rollups, archived history included
+        totals = await rollup_repo.get_period_totals(user.id, start_date, end_date)
         
-
-
-        for obj in objects:
-            entries = await time_repo.get_entries_in_period(obj.id, start_date, end_date)
-            payments = await payment_repo.get_payments_in_period(obj.id, start_date, end_date)
-
-            print(f"\n🔍 Объект: {obj.name} (ID: {obj.id})")
-
-            for entry in entries:
-                print(f"⏱️ TimeEntry: {entry.id}, date: {entry.date}, duration: {entry.end_time} - {entry.start_time}")
-
-            for payment in payments:
-                print(f"💰 Payment: {payment.id}, date: {payment.date}, amount: {payment.amount}")
-
-            all_time_entries.extend(entries)
-            all_payments.extend(payments)
-        
-        print(f"Объекты: {[obj.name for obj in objects]}")
-        print(f"Записей времени: {len(all_time_entries)}")
-        print(f"Платежей: {len(all_payments)}")
         # Generate report
-        report = ReportingService.generate_period_report(
-            objects, all_time_entries, all_payments, start_date, end_date
-        )
+        from app.services.reporting import ReportingService
+        report = ReportingService.generate_period_report(objects, totals, start_date, end_date)
         
         # Format date range for header
         from app.utils.formatting import format_date_range
@@ -184,6 +196,29 @@ async def generate_period_report(message: types.Message, user_id: int, start_dat
         await message.answer(report_text, parse_mode="HTML")
 
 
+async def generate_monthly_report(
+    message: types.Message, user_id: int, start_date, end_date, year_to_date: bool = False
+):
+    """Generate and send month-by-month (or year-to-date) report"""
+    async with db_session() as session:
+        user = await UserRepository(session).get_by_telegram_id(user_id)
+        if not user:
+            await message.answer("❌ Пользователь не найден. Используйте /start для регистрации.")
+            return
+
+        months = await RollupRepository(session).get_monthly_totals(user.id, start_date, end_date)
+
+    from app.services.reporting import ReportingService
+    from app.utils.formatting import format_date_range
+
+    report = ReportingService.generate_monthly_report(months, year_to_date=year_to_date)
+    title = "С начала года" if year_to_date else "По месяцам"
+    await message.answer(
+        f"📈 <b>{title}: {format_date_range(start_date, end_date)}</b>\n\n{report}",
+        parse_mode="HTML",
+    )
+
+
 @router.callback_query(lambda c: c.data == "cancel")
 async def cancel_report(callback: types.CallbackQuery, state: FSMContext):
     """Cancel report generation"""
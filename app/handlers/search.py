@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import html
+
+from aiogram import F, Router, types
+from aiogram.filters import Command, CommandObject, StateFilter
+from aiogram.fsm.context import FSMContext
+from aiogram.fsm.state import State, StatesGroup
+from aiogram.types import (
+    InlineKeyboardButton,
+    InlineQueryResultArticle,
+    InputTextMessageContent,
+)
+from aiogram.utils.keyboard import InlineKeyboardBuilder
+
+from app.db.session import db_session
+from app.keyboards.common import Texts, get_cancel_keyboard
+from app.repositories.search_repo import (
+    HIGHLIGHT_END,
+    HIGHLIGHT_START,
+    SearchHit,
+    SearchRepository,
+)
+from app.repositories.user_repo import UserRepository
+from app.utils.formatting import format_minutes
+
+router = Router()
+
+SEARCH_PAGE_SIZE = 10
+INLINE_PAGE_SIZE = 20
+
+
+class SearchStates(StatesGroup):
+    waiting_for_query = State()
+    showing_results = State()
+
+
+def _highlight(snippet: str) -> str:
+    """Escape snippet for HTML and turn FTS markers into bold text"""
+    return (
+        html.escape(snippet)
+        .replace(HIGHLIGHT_START, "<b>")
+        .replace(HIGHLIGHT_END, "</b>")
+    )
+
+
+def _plain(snippet: str) -> str:
+    return snippet.replace(HIGHLIGHT_START, "").replace(HIGHLIGHT_END, "")
+
+
+def format_hit(hit: SearchHit) -> str:
+    """One search result line for chat"""
+    if hit.entry_id is None:
+        return f"🏗️ {_highlight(hit.snippet)}"
+
+    date_str = hit.entry_date.strftime("%d.%m.%y") if hit.entry_date else ""
+    hours_str = f" — {format_minutes(hit.entry_minutes)}" if hit.entry_minutes is not None else ""
+    return (
+        f"⏰ {date_str}{hours_str} — {html.escape(hit.object_name)}\n"
+        f"    💬 {_highlight(hit.snippet)}  /edit_time_{hit.entry_id}"
+    )
+
+
+async def run_search(telegram_id: int, query: str, limit: int, offset: int = 0) -> list[SearchHit] | None:
+    """Search scoped to the user; None if the user is not registered"""
+    async with db_session() as session:
+        user = await UserRepository(session).get_by_telegram_id(telegram_id)
+        if not user:
+            return None
+        return await SearchRepository(session).search(user.id, query, limit=limit, offset=offset)
+
+
+async def send_search_page(
+    message: types.Message, state: FSMContext, telegram_id: int, query: str, offset: int = 0
+):
+    hits = await run_search(telegram_id, query, limit=SEARCH_PAGE_SIZE, offset=offset)
+    if hits is None:
+        await message.answer("❌ Пользователь не найден. Используйте /start для регистрации.")
+        return
+
+    if not hits:
+        text = "🔎 Ничего не найдено." if offset == 0 else "🔎 Больше результатов нет."
+        await message.answer(text)
+        await state.clear()
+        return
+
+    lines = [f"🔎 <b>Поиск: {html.escape(query)}</b>", ""]
+    lines.extend(format_hit(hit) for hit in hits)
+
+    reply_markup = None
+    if len(hits) == SEARCH_PAGE_SIZE:
+        await state.set_state(SearchStates.showing_results)
+        await state.update_data(search_query=query, search_offset=offset + len(hits))
+        builder = InlineKeyboardBuilder()
+        builder.add(InlineKeyboardButton(text=Texts.NEXT_PAGE, callback_data="search_more"))
+        reply_markup = builder.as_markup()
+    else:
+        await state.clear()
+
+    await message.answer("\n".join(lines), reply_markup=reply_markup, parse_mode="HTML")
+
+
+@router.message(Command("search"))
+async def cmd_search(message: types.Message, command: CommandObject, state: FSMContext):
+    """Handle /search [text] command"""
+    await state.clear()
+
+    if not command.args:
+        await state.set_state(SearchStates.waiting_for_query)
+        await message.answer(
+            "🔎 Введите текст для поиска по объектам и комментариям:",
+            reply_markup=get_cancel_keyboard(),
+        )
+        return
+
+    await send_search_page(message, state, message.from_user.id, command.args)
+
+
+@router.message(StateFilter(SearchStates.waiting_for_query), F.text)
+async def process_search_query(message: types.Message, state: FSMContext):
+    """Process search text entered after /search"""
+    await send_search_page(message, state, message.from_user.id, message.text)
+
+
+@router.callback_query(StateFilter(SearchStates.showing_results), F.data == "search_more")
+async def search_more_callback(callback: types.CallbackQuery, state: FSMContext):
+    """Show next page of /search results"""
+    data = await state.get_data()
+    if isinstance(callback.message, types.Message):
+        await send_search_page(
+            callback.message,
+            state,
+            callback.from_user.id,
+            data["search_query"],
+            data["search_offset"],
+        )
+    await callback.answer()
+
+
+@router.inline_query()
+async def inline_search(inline_query: types.InlineQuery):
+    """Inline mode: @bot <text> searches user's objects and entry comments"""
+    offset = int(inline_query.offset) if inline_query.offset.isdigit() else 0
+    hits = await run_search(inline_query.from_user.id, inline_query.query, limit=INLINE_PAGE_SIZE, offset=offset)
+
+    results = []
+    for hit in hits or []:
+        if hit.entry_id is None:
+            result_id = f"o{hit.object_id}"
+            title = f"🏗️ {hit.object_name}"
+            description = "Объект"
+        else:
+            result_id = f"e{hit.entry_id}"
+            date_str = hit.entry_date.strftime("%d.%m.%y") if hit.entry_date else ""
+            title = f"⏰ {date_str} — {hit.object_name}"
+            description = _plain(hit.snippet)
+        results.append(
+            InlineQueryResultArticle(
+                id=result_id,
+                title=title,
+                description=description,
+                input_message_content=InputTextMessageContent(
+                    message_text=format_hit(hit), parse_mode="HTML"
+                ),
+            )
+        )
+
+    next_offset = str(offset + len(results)) if len(results) == INLINE_PAGE_SIZE else ""
+    await inline_query.answer(results, cache_time=5, is_personal=True, next_offset=next_offset)
@@ -1,17 +1,20 @@
 from __future__ import annotations
 
 from aiogram import Router, types
-from aiogram.filters import Command
+from aiogram.filters import Command, CommandObject
 from aiogram.fsm.context import FSMContext
 
+from app.config import get_settings
 from app.db.session import db_session
 from app.keyboards.common import Texts, get_main_keyboard
+from app.middlewares.scheduler import DB_WRITE
 from app.repositories.user_repo import UserRepository
+from app.utils.dateparse import is_valid_timezone
 
 router = Router()
 
 
-@router.message(Command("start"))
+@router.message(Command("start"), flags={DB_WRITE: True})
 async def cmd_start(message: types.Message, state: FSMContext):
     """Handle /start command - register user and show welcome"""
     await state.clear()
@@ -32,3 +35,35 @@ async def cmd_start(message: types.Message, state: FSMContext):
         Texts.WELCOME,
         reply_markup=get_main_keyboard()
     )
+
+
+@router.message(Command("timezone"), flags={DB_WRITE: True})
+async def cmd_timezone(message: types.Message, command: CommandObject, state: FSMContext):
+    """Handle /timezone [name|reset] - show or set the user's timezone"""
+    await state.clear()
+    name = (command.args or "").strip()
+
+    async with db_session() as session:
+        user_repo = UserRepository(session)
+        if not name:
+            current = await user_repo.get_timezone(message.from_user.id)
+            await message.answer(
+                f"🕰 Часовой пояс: <b>{current or get_settings().timezone}</b>"
+                f"{'' if current else ' (по умолчанию)'}\n\n"
+                "Изменить: /timezone Europe/Moscow\n"
+                "Сбросить: /timezone reset",
+                parse_mode="HTML",
+            )
+            return
+
+        if name.lower() == "reset":
+            name = None
+        elif not is_valid_timezone(name):
+            await message.answer("❌ Неизвестный часовой пояс. Пример: Europe/Moscow, Asia/Yekaterinburg")
+            return
+
+        if not await user_repo.set_timezone(message.from_user.id, name):
+            await message.answer("❌ Пользователь не найден. Используйте /start для регистрации.")
+            return
+
+    await message.answer(f"✅ Часовой пояс: {name or get_settings().timezone}")
@@ -1,22 +1,31 @@
-from typing import Optional
+from datetime import datetime
+from typing import Optional, Tuple
 from aiogram import types
 from aiogram.fsm.context import FSMContext
+from aiogram.types import InlineKeyboardMarkup
 
+from app.config import get_settings
 from app.db.session import db_session
+from app.db.write_batcher import run_write
 from app.handlers.utils.time_entry import get_user_by_telegram_id
+from app.keyboards.cache import object_keyboard_cache
+from app.keyboards.common import OBJECTS_PAGE_SIZE, get_object_selection_keyboard
 from app.models.payment import Payment
+from app.models.time_entry import TimeEntry
+from app.models.user import User
 from app.models.work_object import WorkObject
 from app.repositories.object_repo import WorkObjectRepository
 from app.repositories.payment_repo import PaymentRepository
 from app.repositories.time_repo import TimeEntryRepository
 from app.repositories.user_repo import UserRepository
+from app.utils.formatting import format_minutes
 
 def format_success_message(data: dict, object_name: str, comment: Optional[str]) -> str:
     """Форматирование сообщения об успешном добавлении"""
     date_str = data["date"].strftime("%d.%m.%y")
     start_str = data["start_time"].strftime("%H:%M")
     end_str = data["end_time"].strftime("%H:%M")
-    hours_str = format_hours(data["hours"])
+    hours_str = format_minutes(data["minutes"])
 
     message = (
         f"✅ <b>Часы работы добавлены!</b>\n\n"
@@ -47,41 +56,108 @@ async def get_active_objects_for_user(user_id: int) -> list[WorkObject]:
         return await object_repo.get_all_for_user(user_id, include_completed=False)
 
 
-async def get_user_and_objects(user_id: int):
+async def get_user_and_object_keyboard(
+    telegram_id: int,
+) -> Tuple[Optional[User], Optional[InlineKeyboardMarkup]]:
+    """Пользователь и клавиатура выбора активных объектов (None, если объектов нет).
+    Клавиатура берётся из кэша и строится заново только после изменения объектов."""
     async with db_session() as session:
-        user = await get_user_by_telegram_id(session, user_id)
+        user = await get_user_by_telegram_id(session, telegram_id)
         if not user:
             return None, None
 
-        active_objects = await get_active_objects_for_user(user.id)
-        return user, active_objects
+        if user.id in object_keyboard_cache:
+            return user, object_keyboard_cache.get(user.id)
 
+        object_repo = WorkObjectRepository(session)
+        page = await object_repo.get_page(user.id, include_completed=False, limit=OBJECTS_PAGE_SIZE)
+        markup = get_object_selection_keyboard(page.objects, page.next_cursor) if page.objects else None
+        object_keyboard_cache.set(user.id, markup)
+        return user, markup
+
+
+async def get_object_picker_page(
+    telegram_id: int, cursor: Optional[Tuple[datetime, int]]
+) -> Optional[InlineKeyboardMarkup]:
+    """Страница клавиатуры выбора активных объектов после курсора (первая — из кэша)"""
+    if cursor is None:
+        return (await get_user_and_object_keyboard(telegram_id))[1]
 
-async def save_time_entry(
-    user_id: int, data: dict, comment: Optional[str]
-) :
     async with db_session() as session:
-        user_repo = UserRepository(session)
+        user = await get_user_by_telegram_id(session, telegram_id)
+        if not user:
+            return None
         object_repo = WorkObjectRepository(session)
-        time_repo = TimeEntryRepository(session)
+        page = await object_repo.get_page(
+            user.id, include_completed=False, limit=OBJECTS_PAGE_SIZE, after=cursor
+        )
+        return get_object_selection_keyboard(page.objects, page.next_cursor, paged=True)
+
 
-        user = await user_repo.get_by_telegram_id(user_id)
+async def search_object_picker(telegram_id: int, text: str) -> Optional[InlineKeyboardMarkup]:
+    """Клавиатура выбора активных объектов, чьё название начинается с text (None — ничего не найдено)"""
+    async with db_session() as session:
+        user = await get_user_by_telegram_id(session, telegram_id)
         if not user:
-            return "❌ Пользователь не найден. Используйте /start для регистрации."
-
-        work_object = await resolve_or_create_object(object_repo, user.id, data)
-        if not work_object:
-            return "❌ Объект не найден."
-
-        await time_repo.create_entry(
-            work_object_id=work_object.id,
-            start_time=data["start_time"],
-            end_time=data["end_time"],
-            hours=data["hours"],
-            date=data["date"],
-            comment=comment,
+            return None
+        object_repo = WorkObjectRepository(session)
+        objects = await object_repo.search_by_prefix(
+            user.id, text, include_completed=False, limit=OBJECTS_PAGE_SIZE
         )
-        return format_success_message(data, work_object.name, comment)
+        return get_object_selection_keyboard(objects, paged=True) if objects else None
+
+
+async def get_user_timezone(telegram_id: int) -> str:
+    """User's timezone, falling back to the bot-wide TZ setting"""
+    async with db_session() as session:
+        timezone_name = await UserRepository(session).get_timezone(telegram_id)
+    return timezone_name or get_settings().timezone
+
+
+async def find_time_overlaps(
+    telegram_id: int, date: datetime, start_time: datetime, end_time: datetime
+) -> list[Tuple[TimeEntry, str]]:
+    """Existing entries of the user intersecting the new interval, with object names"""
+    async with db_session() as session:
+        user = await UserRepository(session).get_by_telegram_id(telegram_id)
+        if not user:
+            return []
+        return await TimeEntryRepository(session).find_overlapping(user.id, date, start_time, end_time)
+
+
+async def save_time_entry(
+    user_id: int, data: dict, comment: Optional[str]
+) :
+    """Сохраняет запись времени (групповой коммит, если включён)"""
+    return await run_write(
+        lambda session: _save_time_entry(session, user_id, data, comment)
+    )
+
+
+async def _save_time_entry(
+    session, user_id: int, data: dict, comment: Optional[str]
+) -> str:
+    user_repo = UserRepository(session)
+    object_repo = WorkObjectRepository(session)
+    time_repo = TimeEntryRepository(session)
+
+    user = await user_repo.get_by_telegram_id(user_id)
+    if not user:
+        return "❌ Пользователь не найден. Используйте /start для регистрации."
+
+    work_object = await resolve_or_create_object(object_repo, user.id, data)
+    if not work_object:
+        return "❌ Объект не найден."
+
+    await time_repo.create_entry(
+        work_object_id=work_object.id,
+        start_time=data["start_time"],
+        end_time=data["end_time"],
+        minutes=data["minutes"],
+        date=data["date"],
+        comment=comment,
+    )
+    return format_success_message(data, work_object.name, comment)
 
 
 # 💾 Обёртка: управление транзакцией и сессией
@@ -89,9 +165,10 @@ async def process_payment_transaction(
     telegram_id: int,
     data: dict,
 ) -> Optional[Payment]:
-    """Открывает сессию и сохраняет оплату"""
-    async with db_session() as session:
-        return await save_payment(session=session, telegram_id=telegram_id, data=data)
+    """Открывает сессию (или встаёт в групповой коммит) и сохраняет оплату"""
+    return await run_write(
+        lambda session: save_payment(session=session, telegram_id=telegram_id, data=data)
+    )
 
 
 # 🧠 Логика: сохранение оплаты в БД
@@ -1,6 +1,10 @@
 from datetime import datetime
+from typing import Optional
+
 from aiogram import types
-from app.keyboards.common import get_cancel_keyboard, get_object_selection_keyboard
+from aiogram.types import InlineKeyboardMarkup
+
+from app.keyboards.common import get_cancel_keyboard
 from app.repositories.user_repo import UserRepository
 
 
@@ -41,11 +45,13 @@ async def get_user_by_telegram_id(session, telegram_id: int):
     return await user_repo.get_by_telegram_id(telegram_id)
 
 
-async def prompt_object_selection(message: types.Message, active_objects: list):
-    if active_objects:
+async def prompt_object_selection(
+    message: types.Message, objects_keyboard: Optional[InlineKeyboardMarkup]
+):
+    if objects_keyboard:
         await message.answer(
             "🏗️ Выберите объект или введите новый:",
-            reply_markup=get_object_selection_keyboard(active_objects),
+            reply_markup=objects_keyboard,
         )
     else:
         await message.answer(
@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Optional
+
+from aiogram.types import InlineKeyboardMarkup
+
+
+class ObjectKeyboardCache:
+    """
+    Per-user cache of the active-objects selection keyboard.
+    Entries are dropped by WorkObjectRepository whenever a user's objects change;
+    the least recently used users are evicted once max_users is reached.
+    """
+
+    def __init__(self, max_users: int = 1024):
+        self.max_users = max_users
+        self._markups: OrderedDict[int, Optional[InlineKeyboardMarkup]] = OrderedDict()
+
+    def __contains__(self, user_id: int) -> bool:
+        return user_id in self._markups
+
+    def __len__(self) -> int:
+        return len(self._markups)
+
+    def get(self, user_id: int) -> Optional[InlineKeyboardMarkup]:
+        """Cached markup for user; None is a valid value meaning "no active objects\""""
+        markup = self._markups[user_id]
+        self._markups.move_to_end(user_id)
+        return markup
+
+    def set(self, user_id: int, markup: Optional[InlineKeyboardMarkup]) -> None:
+        self._markups[user_id] = markup
+        self._markups.move_to_end(user_id)
+        while len(self._markups) > self.max_users:
+            self._markups.popitem(last=False)
+
+    def invalidate(self, user_id: int) -> None:
+        self._markups.pop(user_id, None)
+
+    def clear(self) -> None:
+        self._markups.clear()
+
+
+object_keyboard_cache = ObjectKeyboardCache()
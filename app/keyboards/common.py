@@ -1,14 +1,19 @@
 from __future__ import annotations
-from typing import List
+from datetime import datetime
+from typing import List, Optional, Tuple
 
 from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup, KeyboardButton, ReplyKeyboardMarkup
 from aiogram.utils.keyboard import InlineKeyboardBuilder, ReplyKeyboardBuilder
 
-from app.fsm.callback_data import ObjectCallback
+from app.fsm.callback_data import ObjectCallback, ObjectPageCallback
 from app.models.work_object import WorkObject
 
 
 
+# Objects per page in object pickers and lists
+OBJECTS_PAGE_SIZE = 8
+
+
 # Common text constants
 class Texts:
     # Main menu
@@ -33,6 +38,8 @@ class Texts:
     REPORTS = "📊 Отчёты"
     LAST_MONTH = "📅 За прошлый месяц"
     CUSTOM_PERIOD = "📆 За произвольный период"
+    MONTHLY_REPORT = "📈 По месяцам"
+    YEAR_TO_DATE = "🗓 С начала года"
     
     # Object status
     STATUS_ACTIVE = "🔵 Активен"
@@ -54,6 +61,12 @@ class Texts:
     
     # Object selection
     MANUAL_OBJECT = "✏️ Ввести объект вручную"
+    NEXT_PAGE = "▶️ Ещё"
+    FIRST_PAGE = "⏮ В начало"
+    
+    # Overlapping time entries
+    OVERLAP_CONFIRM = "✅ Всё равно добавить"
+    OVERLAP_SKIP = "⏭ Пропустить"
     
     # Messages
     WELCOME = (
@@ -73,6 +86,9 @@ class Texts:
         "🔹 <b>/payment</b> - добавить оплату\n"
         "🔹 <b>/objects</b> - список объектов\n"
         "🔹 <b>/report</b> - отчёты за месяц или период\n"
+        "🔹 <b>/search</b> - поиск по объектам и комментариям\n"
+        "🔹 <b>/duplicates</b> - пересекающиеся и повторные записи часов\n"
+        "🔹 <b>/timezone</b> - часовой пояс для «сегодня» и дней записей\n"
         "🔹 <b>/help</b> - эта справка\n\n"
         "📝 <b>Редактирование:</b>\n"
         "🔹 <code>/edit_time_[id]</code> - редактировать часы\n"
@@ -80,12 +96,12 @@ class Texts:
         "💡 <b>Подсказки:</b>\n"
         "• Даты вводите в формате ДД.ММ.ГГ\n"
         "• Суммы вводите в рублях (например: 1500)\n"
+        "• Поиск работает и в любом чате: @имя_бота текст\n"
         "• Часы вводите целыми числами"
     )
 
 
-def get_main_keyboard() -> ReplyKeyboardMarkup:
-    """Main menu keyboard"""
+def _build_main_keyboard() -> ReplyKeyboardMarkup:
     builder = ReplyKeyboardBuilder()
     builder.add(KeyboardButton(text=Texts.ADD_HOURS))
     builder.add(KeyboardButton(text=Texts.ADD_PAYMENT))
@@ -96,22 +112,19 @@ def get_main_keyboard() -> ReplyKeyboardMarkup:
     return builder.as_markup(resize_keyboard=True)
 
 
-def get_back_keyboard() -> InlineKeyboardMarkup:
-    """Back button keyboard"""
+def _build_back_keyboard() -> InlineKeyboardMarkup:
     builder = InlineKeyboardBuilder()
     builder.add(InlineKeyboardButton(text=Texts.BACK, callback_data="back"))
     return builder.as_markup()
 
 
-def get_cancel_keyboard() -> InlineKeyboardMarkup:
-    """Cancel button keyboard"""
+def _build_cancel_keyboard() -> InlineKeyboardMarkup:
     builder = InlineKeyboardBuilder()
     builder.add(InlineKeyboardButton(text=Texts.CANCEL, callback_data="cancel"))
     return builder.as_markup()
 
 
-def get_date_selection_keyboard() -> InlineKeyboardMarkup:
-    """Date selection keyboard with today, yesterday, and manual input options"""
+def _build_date_selection_keyboard() -> InlineKeyboardMarkup:
     builder = InlineKeyboardBuilder()
     builder.add(InlineKeyboardButton(text=Texts.TODAY, callback_data="date_today"))
     builder.add(InlineKeyboardButton(text=Texts.YESTERDAY, callback_data="date_yesterday"))
@@ -121,30 +134,104 @@ def get_date_selection_keyboard() -> InlineKeyboardMarkup:
     return builder.as_markup()
 
 
-def get_object_selection_keyboard(objects: List[WorkObject]) -> InlineKeyboardMarkup:
-    """Генерация клавиатуры выбора объекта с кнопками для каждого объекта и опцией ручного ввода"""
+def _build_overlap_keyboard() -> InlineKeyboardMarkup:
+    builder = InlineKeyboardBuilder()
+    builder.add(InlineKeyboardButton(text=Texts.OVERLAP_CONFIRM, callback_data="overlap_confirm"))
+    builder.add(InlineKeyboardButton(text=Texts.OVERLAP_SKIP, callback_data="overlap_skip"))
+    builder.adjust(1, 1)
+    return builder.as_markup()
+
+
+# Reply keyboard texts handled by their own routers regardless of FSM state
+MAIN_MENU_TEXTS = frozenset({Texts.ADD_HOURS, Texts.ADD_PAYMENT, Texts.OBJECTS, Texts.REPORTS, Texts.HELP})
+
+
+# Static markups are built once at import time and shared by every update.
+# They are sent as-is and must never be mutated by callers.
+MAIN_KEYBOARD = _build_main_keyboard()
+BACK_KEYBOARD = _build_back_keyboard()
+CANCEL_KEYBOARD = _build_cancel_keyboard()
+DATE_SELECTION_KEYBOARD = _build_date_selection_keyboard()
+OVERLAP_KEYBOARD = _build_overlap_keyboard()
+
+
+def get_main_keyboard() -> ReplyKeyboardMarkup:
+    """Main menu keyboard"""
+    return MAIN_KEYBOARD
+
+
+def get_back_keyboard() -> InlineKeyboardMarkup:
+    """Back button keyboard"""
+    return BACK_KEYBOARD
+
+
+def get_cancel_keyboard() -> InlineKeyboardMarkup:
+    """Cancel button keyboard"""
+    return CANCEL_KEYBOARD
+
+
+def get_date_selection_keyboard() -> InlineKeyboardMarkup:
+    """Date selection keyboard with today, yesterday, and manual input options"""
+    return DATE_SELECTION_KEYBOARD
+
+
+def get_overlap_keyboard() -> InlineKeyboardMarkup:
+    """Confirm or skip a time entry overlapping existing ones"""
+    return OVERLAP_KEYBOARD
+
+
+def add_page_navigation(
+    builder: InlineKeyboardBuilder,
+    scope: str,
+    next_cursor: Optional[Tuple[datetime, int]],
+    paged: bool,
+    include_completed: bool = False,
+) -> None:
+    """Add "first page" / "next page" row for keyset-paginated object lists"""
+    buttons = []
+    if paged:
+        buttons.append(InlineKeyboardButton(
+            text=Texts.FIRST_PAGE,
+            callback_data=ObjectPageCallback.for_cursor(scope, None, include_completed).pack()
+        ))
+    if next_cursor is not None:
+        buttons.append(InlineKeyboardButton(
+            text=Texts.NEXT_PAGE,
+            callback_data=ObjectPageCallback.for_cursor(scope, next_cursor, include_completed).pack()
+        ))
+    if buttons:
+        builder.row(*buttons)
+
+
+def get_object_selection_keyboard(
+    objects: List[WorkObject],
+    next_cursor: Optional[Tuple[datetime, int]] = None,
+    paged: bool = False,
+) -> InlineKeyboardMarkup:
+    """Генерация клавиатуры выбора объекта (одна страница) с навигацией и опцией ручного ввода"""
     builder = InlineKeyboardBuilder()
 
     for obj in objects:
-        builder.add(
+        builder.row(
             InlineKeyboardButton(
                 text=f"🔵 {obj.name}",
                 callback_data=ObjectCallback(action="select", object_id=obj.id).pack()
             )
         )
 
-    builder.add(
+    add_page_navigation(builder, "pick", next_cursor, paged)
+
+    builder.row(
         InlineKeyboardButton(
             text=Texts.MANUAL_OBJECT,
             callback_data=ObjectCallback(action="manual").pack()
         )
     )
-    builder.add(
+    builder.row(
         InlineKeyboardButton(
             text=Texts.CANCEL,
             callback_data="cancel"
         )
     )
 
-    builder.adjust(1)
     return builder.as_markup()
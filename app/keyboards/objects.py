@@ -1,17 +1,28 @@
 from __future__ import annotations
 
-from typing import List
+from datetime import datetime
+from typing import TYPE_CHECKING, List, Optional, Sequence, Tuple
 
 from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 
 from app.fsm.callback_data import ObjectCallback
+from app.keyboards.common import add_page_navigation
 from app.models.work_object import ObjectStatus, WorkObject
-from app.utils.formatting import format_currency, format_hours
+from app.utils.formatting import format_currency, format_minutes, format_short_date
 
+if TYPE_CHECKING:
+    from app.repositories.payment_repo import PaymentRow
+    from app.repositories.time_repo import EntryRow
 
-def get_objects_list_keyboard(objects: List[WorkObject], include_completed: bool = True) -> InlineKeyboardMarkup:
-    """Keyboard for listing work objects"""
+
+def get_objects_list_keyboard(
+    objects: List[WorkObject],
+    include_completed: bool = True,
+    next_cursor: Optional[Tuple[datetime, int]] = None,
+    paged: bool = False,
+) -> InlineKeyboardMarkup:
+    """Keyboard for listing one page of work objects"""
     builder = InlineKeyboardBuilder()
 
     for obj in objects:
@@ -20,27 +31,25 @@ def get_objects_list_keyboard(objects: List[WorkObject], include_completed: bool
             
         status_emoji = "🔵" if obj.status == ObjectStatus.ACTIVE else "🟢"
         button_text = f"{status_emoji} {obj.name}"
-        # ✅ Изменение 1: Заменяем строковый колбэк на экземпляр CallbackData
         callback_data = ObjectCallback(action="select", object_id=obj.id)
         
-        builder.add(InlineKeyboardButton(text=button_text, callback_data=callback_data.pack()))
+        builder.row(InlineKeyboardButton(text=button_text, callback_data=callback_data.pack()))
+
+    add_page_navigation(builder, "list", next_cursor, paged, include_completed)
     
-    # ✅ Изменение 2: Заменяем строковые колбэки на экземпляры CallbackData для кнопок фильтра
     if include_completed:
-        builder.add(InlineKeyboardButton(text="🔵 Только активные", callback_data=ObjectCallback(action="active_only").pack()))
+        builder.row(InlineKeyboardButton(text="🔵 Только активные", callback_data=ObjectCallback(action="active_only").pack()))
     else:
-        builder.add(InlineKeyboardButton(text="🔵🟢 Все объекты", callback_data=ObjectCallback(action="all").pack()))
+        builder.row(InlineKeyboardButton(text="🔵🟢 Все объекты", callback_data=ObjectCallback(action="all").pack()))
     
-    # ✅ Изменение 3: Заменяем строковые колбэки на экземпляры CallbackData для остальных кнопок
-    builder.add(InlineKeyboardButton(text="➕ Добавить объект", callback_data=ObjectCallback(action="add").pack()))
-    builder.add(InlineKeyboardButton(text="⬅️ Назад", callback_data=ObjectCallback(action="back").pack()))
+    builder.row(InlineKeyboardButton(text="➕ Добавить объект", callback_data=ObjectCallback(action="add").pack()))
+    builder.row(InlineKeyboardButton(text="⬅️ Назад", callback_data=ObjectCallback(action="back").pack()))
     
-    builder.adjust(1)
     return builder.as_markup()
 
 def get_object_actions_keyboard(
     work_object: WorkObject,
-    total_hours: int = 0,
+    total_minutes: int = 0,
     total_payments: int = 0
 ) -> InlineKeyboardMarkup:
     """Keyboard for object actions"""
@@ -70,42 +79,34 @@ def get_object_actions_keyboard(
     return builder.as_markup()
 
 
+def _history_entry_text(entry: EntryRow) -> str:
+    text = f"⏰ {format_short_date(entry.date)} - {format_minutes(entry.duration_minutes)}"
+    if entry.comment:
+        text += f" ({entry.comment[:20]}...)" if len(entry.comment) > 20 else f" ({entry.comment})"
+    return text
+
+
 def get_object_history_keyboard(
     work_object: WorkObject,
-    time_entries: List,
-    payments: List
+    time_entries: Sequence[EntryRow],
+    payments: Sequence[PaymentRow]
 ) -> InlineKeyboardMarkup:
-    """Keyboard showing object history with edit buttons"""
-    builder = InlineKeyboardBuilder()
-    
-    # Time entries
-    for entry in time_entries:
-        date_str = entry.date.strftime("%d.%m.%y")
-        button_text = f"⏰ {date_str} - {format_hours(entry.hours)}"
-        if entry.comment:
-            button_text += f" ({entry.comment[:20]}...)" if len(entry.comment) > 20 else f" ({entry.comment})"
-        
-        builder.add(InlineKeyboardButton(
-            text=button_text, 
-            callback_data=f"edit_time_{entry.id}"
-        ))
-    
-    # Payments
-    for payment in payments:
-        date_str = payment.date.strftime("%d.%m.%y")
-        amount_str = format_currency(payment.amount)
-        button_text = f"💰 {date_str} - {amount_str}"
-        
-        builder.add(InlineKeyboardButton(
-            text=button_text, 
-            callback_data=f"edit_payment_{payment.id}"
-        ))
-    
+    """Keyboard showing object history with edit buttons, one button per row"""
+    # Rows are built directly: the builder re-validates and re-lays out every button
+    rows = [
+        [InlineKeyboardButton(text=_history_entry_text(entry), callback_data=f"edit_time_{entry.id}")]
+        for entry in time_entries
+    ]
+    rows += [
+        [InlineKeyboardButton(
+            text=f"💰 {format_short_date(payment.date)} - {format_currency(payment.amount)}",
+            callback_data=f"edit_payment_{payment.id}",
+        )]
+        for payment in payments
+    ]
     # Back to object actions
-    builder.add(InlineKeyboardButton(text="⬅️ К объекту", callback_data=f"object_{work_object.id}"))
-    
-    builder.adjust(1)  # One button per row
-    return builder.as_markup()
+    rows.append([InlineKeyboardButton(text="⬅️ К объекту", callback_data=f"object_{work_object.id}")])
+    return InlineKeyboardMarkup(inline_keyboard=rows)
 
 
 def get_confirm_delete_keyboard(object_id: int) -> InlineKeyboardMarkup:
@@ -0,0 +1 @@
+# Dispatcher middlewares
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from aiogram import BaseMiddleware
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware
+from aiogram.methods import AnswerCallbackQuery
+from aiogram.types import CallbackQuery, TelegramObject
+
+
+@dataclass
+class CallbackAnswer:
+    """What the handler answered to the callback query (toast text / alert)"""
+    answered: bool = False
+    text: Optional[str] = None
+    show_alert: Optional[bool] = None
+
+
+# (callback query id, answer) of the callback handled in the current task
+_capture: ContextVar[Optional[Tuple[str, CallbackAnswer]]] = ContextVar("callback_answer_capture", default=None)
+
+
+class CallbackAnswerRecorder(BaseRequestMiddleware):
+    """Bot session middleware: remembers how the current callback was answered"""
+
+    async def __call__(self, make_request, bot, method):
+        capture = _capture.get()
+        if capture is not None and isinstance(method, AnswerCallbackQuery):
+            query_id, answer = capture
+            if method.callback_query_id == query_id:
+                answer.answered = True
+                answer.text = method.text
+                answer.show_alert = method.show_alert
+        return await make_request(bot, method)
+
+
+class CallbackIdempotencyMiddleware(BaseMiddleware):
+    """
+    Outer callback_query middleware: repeated taps on the same button of the
+    same message (same user, message and callback data) run the handler once.
+    A duplicate arriving while the first is in flight waits for it; one arriving
+    within `ttl` seconds after it gets the recorded answer replayed.
+    """
+
+    def __init__(self, ttl: float = 5.0, max_entries: int = 10_000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._in_flight: Dict[Hashable, asyncio.Future] = {}
+        self._done: "OrderedDict[Hashable, Tuple[float, CallbackAnswer]]" = OrderedDict()
+        self.duplicates = 0
+
+    @property
+    def cached(self) -> int:
+        """Remembered answers plus handlers still running"""
+        return len(self._done) + len(self._in_flight)
+
+    @staticmethod
+    def _key(query: CallbackQuery) -> Hashable:
+        message_key = query.message.message_id if query.message else query.inline_message_id
+        return query.from_user.id, message_key, query.data
+
+    def _recent(self, key: Hashable) -> Optional[CallbackAnswer]:
+        now = time.monotonic()
+        while self._done:
+            oldest_key, (expires_at, _) = next(iter(self._done.items()))
+            if expires_at > now and len(self._done) <= self.max_entries:
+                break
+            del self._done[oldest_key]
+        entry = self._done.get(key)
+        return entry[1] if entry else None
+
+    async def _replay(self, query: CallbackQuery, answer: Optional[CallbackAnswer]) -> None:
+        self.duplicates += 1
+        if answer is not None and answer.answered:
+            await query.answer(text=answer.text, show_alert=answer.show_alert)
+        else:
+            # Still stop the button spinner
+            await query.answer()
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        if not isinstance(event, CallbackQuery) or event.data is None:
+            return await handler(event, data)
+
+        key = self._key(event)
+        recent = self._recent(key)
+        if recent is not None:
+            await self._replay(event, recent)
+            return None
+
+        in_flight = self._in_flight.get(key)
+        if in_flight is not None:
+            await self._replay(event, await asyncio.shield(in_flight))
+            return None
+
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        answer = CallbackAnswer()
+        token = _capture.set((event.id, answer))
+        try:
+            result = await handler(event, data)
+        except BaseException:
+            # Failed work is not cached: a retry tap runs the handler again
+            future.set_result(None)
+            raise
+        else:
+            self._done[key] = (time.monotonic() + self.ttl, answer)
+            future.set_result(answer)
+            return result
+        finally:
+            _capture.reset(token)
+            del self._in_flight[key]
@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+from typing import Any, Awaitable, Callable, Dict
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject
+
+from app.services.profiler import SamplingProfiler
+
+
+class ProfilingMiddleware(BaseMiddleware):
+    """Outer update middleware counting updates of an active profiling session"""
+
+    def __init__(self, profiler: SamplingProfiler):
+        self.profiler = profiler
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        if not self.profiler.update_started():
+            return await handler(event, data)
+        try:
+            return await handler(event, data)
+        finally:
+            self.profiler.update_finished()
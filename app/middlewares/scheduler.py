@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Deque, Dict
+
+from aiogram import BaseMiddleware
+from aiogram.dispatcher.flags import get_flag
+from aiogram.types import TelegramObject, Update
+
+logger = logging.getLogger(__name__)
+
+# Handler flag for handlers that write to the database:
+#   @router.message(..., flags={DB_WRITE: True})
+DB_WRITE = "db_write"
+
+
+@dataclass
+class WaitStats:
+    """Queue wait times of one kind of slot"""
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+    recent: Deque[float] = field(default_factory=lambda: deque(maxlen=1000))
+
+    def record(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.recent.append(seconds)
+
+    def snapshot(self) -> Dict[str, float]:
+        recent = sorted(self.recent)
+        p95 = recent[int(len(recent) * 0.95) - 1] if recent else 0.0
+        return {
+            "count": self.count,
+            "avg_ms": self.total / self.count * 1000 if self.count else 0.0,
+            "p95_ms": p95 * 1000,
+            "max_ms": self.max * 1000,
+        }
+
+
+class SchedulerStats:
+    def __init__(self):
+        self.updates = WaitStats()  # per-user lock + global slot
+        self.readers = WaitStats()
+        self.writers = WaitStats()
+        self.in_flight = 0
+        self.queued_users = 0
+        self.last_update_at = time.monotonic()  # start or end of the latest update
+
+    def idle_seconds(self) -> float:
+        """Time since the last update finished; 0 while any update is running"""
+        return 0.0 if self.in_flight else time.monotonic() - self.last_update_at
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "in_flight": self.in_flight,
+            "queued_users": self.queued_users,
+            "updates": self.updates.snapshot(),
+            "readers": self.readers.snapshot(),
+            "writers": self.writers.snapshot(),
+        }
+
+
+scheduler_stats = SchedulerStats()
+
+
+async def log_scheduler_stats(stats: SchedulerStats = scheduler_stats) -> None:
+    """Periodic job: queue wait metrics to the log"""
+    logger.info("Update scheduler: %s", stats.snapshot())
+
+
+class _UserSlot:
+    __slots__ = ("lock", "users")
+
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        self.users = 0  # updates holding or waiting for the lock
+
+
+class UserSchedulerMiddleware(BaseMiddleware):
+    """
+    Outer update middleware: updates of one user run strictly one after another,
+    and at most `max_in_flight` updates are processed at once across all users.
+    """
+
+    def __init__(self, max_in_flight: int = 32, stats: SchedulerStats = scheduler_stats):
+        self.stats = stats
+        self._global = asyncio.Semaphore(max_in_flight)
+        self._slots: Dict[int, _UserSlot] = {}
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        queued_at = time.perf_counter()
+        user = data.get("event_from_user")
+        # Inline queries are read-only and superseded by the next keystroke: no per-user order
+        if user is None or (isinstance(event, Update) and event.inline_query is not None):
+            async with self._global:
+                self.stats.updates.record(time.perf_counter() - queued_at)
+                return await self._run(handler, event, data)
+
+        slot = self._slots.get(user.id)
+        if slot is None:
+            slot = self._slots[user.id] = _UserSlot()
+        slot.users += 1
+        self.stats.queued_users = len(self._slots)
+        try:
+            async with slot.lock:
+                async with self._global:
+                    self.stats.updates.record(time.perf_counter() - queued_at)
+                    # FSM state was read before we queued; the previous update may have changed it
+                    state = data.get("state")
+                    if state is not None:
+                        data["raw_state"] = await state.get_state()
+                    return await self._run(handler, event, data)
+        finally:
+            slot.users -= 1
+            if slot.users == 0:
+                del self._slots[user.id]
+            self.stats.queued_users = len(self._slots)
+
+    async def _run(self, handler, event, data) -> Any:
+        self.stats.in_flight += 1
+        self.stats.last_update_at = time.monotonic()
+        try:
+            return await handler(event, data)
+        finally:
+            self.stats.in_flight -= 1
+            self.stats.last_update_at = time.monotonic()
+
+
+class HandlerConcurrencyMiddleware(BaseMiddleware):
+    """
+    Inner middleware: separate concurrency limits for handlers flagged
+    with DB_WRITE (SQLite has a single writer) and read-only ones.
+    """
+
+    def __init__(self, max_readers: int = 16, max_writers: int = 4, stats: SchedulerStats = scheduler_stats):
+        self.stats = stats
+        self._readers = asyncio.Semaphore(max_readers)
+        self._writers = asyncio.Semaphore(max_writers)
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        if get_flag(data, DB_WRITE):
+            semaphore, wait_stats = self._writers, self.stats.writers
+        else:
+            semaphore, wait_stats = self._readers, self.stats.readers
+
+        queued_at = time.perf_counter()
+        async with semaphore:
+            wait_stats.record(time.perf_counter() - queued_at)
+            return await handler(event, data)
@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+import logging
+from typing import Any, Awaitable, Callable, Dict
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject
+
+from app.utils.startup import StartupProfiler
+
+logger = logging.getLogger(__name__)
+
+
+class FirstUpdateMiddleware(BaseMiddleware):
+    """
+    Reports time from process start to the first fully processed update; with
+    print_report it is also printed after the startup profile
+    """
+
+    def __init__(self, profiler: StartupProfiler, print_report: bool = False):
+        self.profiler = profiler
+        self.print_report = print_report
+        self.done = False
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        if self.done:
+            return await handler(event, data)
+
+        try:
+            return await handler(event, data)
+        finally:
+            elapsed = self.profiler.mark_first_update()
+            self.done = True
+            if elapsed is not None:
+                logger.info("First update processed %.1f ms after start", elapsed * 1000)
+                if self.print_report:
+                    print(self.profiler.first_update_line(), flush=True)
@@ -1,8 +1,20 @@
 from __future__ import annotations
 
+from app.models import search as _search  # registers the FTS5 search index DDL
+from app.models.archive import ArchivedPayment, ArchivedTimeEntry
 from app.models.payment import Payment
+from app.models.rollup import DailyRollup
 from app.models.time_entry import TimeEntry
 from app.models.user import User
 from app.models.work_object import ObjectStatus, WorkObject
 
-__all__ = ["User", "WorkObject", "TimeEntry", "Payment", "ObjectStatus"]
+__all__ = [
+    "User",
+    "WorkObject",
+    "TimeEntry",
+    "Payment",
+    "ObjectStatus",
+    "ArchivedTimeEntry",
+    "ArchivedPayment",
+    "DailyRollup",
+]
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import BigInteger, DateTime, Float, Index, Integer, Text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.session import Base
+
+
+# Cold storage for history of long-completed objects. Columns mirror
+# time_entries / payments so rows can be moved back and forth by
+# INSERT ... SELECT; ids are preserved where possible.
+class ArchivedTimeEntry(Base):
+    __tablename__ = "time_entries_archive"
+    __table_args__ = (
+        Index("ix_time_entries_archive_object_day", "work_object_id", "local_day"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    work_object_id: Mapped[int] = mapped_column(BigInteger, nullable=False, index=True)
+    user_id: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    start_time: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    end_time: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    hours: Mapped[float] = mapped_column(Float, nullable=False)
+    minutes: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    date: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    local_day: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    comment: Mapped[str | None] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+    @property
+    def duration_minutes(self) -> int:
+        """Exact duration in minutes, falling back to hours for rows not yet backfilled"""
+        if self.minutes is not None:
+            return self.minutes
+        return round(self.hours * 60)
+
+    def __repr__(self) -> str:
+        return f"<ArchivedTimeEntry(id={self.id}, minutes={self.minutes}, date='{self.date}')>"
+
+
+class ArchivedPayment(Base):
+    __tablename__ = "payments_archive"
+    __table_args__ = (
+        Index("ix_payments_archive_object_day", "work_object_id", "local_day"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    work_object_id: Mapped[int] = mapped_column(BigInteger, nullable=False, index=True)
+    amount: Mapped[int] = mapped_column(Integer, nullable=False)  # Amount in kopecks
+    date: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    local_day: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<ArchivedPayment(id={self.id}, amount={self.amount}, date='{self.date}')>"
@@ -3,7 +3,7 @@ from __future__ import annotations
 from datetime import datetime, UTC
 from typing import TYPE_CHECKING
 
-from sqlalchemy import BigInteger, DateTime, ForeignKey, Integer
+from sqlalchemy import BigInteger, DateTime, ForeignKey, Index, Integer
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.session import Base
@@ -14,11 +14,18 @@ if TYPE_CHECKING:
 
 class Payment(Base):
     __tablename__ = "payments"
+    __table_args__ = (
+        # Per-object history, period queries and batched archive/purge moves
+        Index("ix_payments_object_date", "work_object_id", "date"),
+        # Period queries by local day number
+        Index("ix_payments_object_day", "work_object_id", "local_day"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     work_object_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("work_objects.id"), nullable=False)
     amount: Mapped[int] = mapped_column(Integer, nullable=False)  # Amount in kopecks (1 ruble = 100 kopecks)
     date: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    local_day: Mapped[int | None] = mapped_column(Integer, nullable=True)  # Days since 1970-01-01 of the local date
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(UTC), nullable=False)
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(UTC), onupdate=datetime.utcnow, nullable=False)
 
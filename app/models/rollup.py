@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+from datetime import date
+
+from sqlalchemy import BigInteger, Date, Index, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.session import Base
+
+
+# Per-day totals of time entries and payments, kept in step with the raw
+# (and archived) rows by the repositories and rebuildable from them.
+# Period reports read these instead of the raw history.
+class DailyRollup(Base):
+    __tablename__ = "daily_rollups"
+    __table_args__ = (
+        # Purge of an object's history
+        Index("ix_daily_rollups_object", "work_object_id"),
+    )
+
+    # Primary key order serves the (user, day range) report query
+    user_id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    work_object_id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    minutes: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    amount: Mapped[int] = mapped_column(Integer, nullable=False, default=0)  # Payments in kopecks
+    entry_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    payment_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    def __repr__(self) -> str:
+        return f"<DailyRollup(user_id={self.user_id}, work_object_id={self.work_object_id}, day='{self.day}')>"
@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+from sqlalchemy import DDL, event
+
+from app.db.session import Base
+
+# Full-text index over object names and time entry comments (SQLite FTS5).
+# rowid encodes the source row: 2 * work_objects.id for objects,
+# 2 * time_entries.id + 1 for entries, so triggers can update it by key.
+# `owner` holds "u<user_id>" so a query is scoped to one user inside FTS itself.
+SEARCH_INDEX_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5("
+    "body, owner, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')",
+
+    "CREATE TRIGGER IF NOT EXISTS search_index_object_insert AFTER INSERT ON work_objects BEGIN "
+    "INSERT INTO search_index (rowid, body, owner) VALUES (new.id * 2, new.name, 'u' || new.user_id); "
+    "END",
+
+    "CREATE TRIGGER IF NOT EXISTS search_index_object_update AFTER UPDATE OF name, user_id ON work_objects BEGIN "
+    "DELETE FROM search_index WHERE rowid = old.id * 2; "
+    "INSERT INTO search_index (rowid, body, owner) VALUES (new.id * 2, new.name, 'u' || new.user_id); "
+    "END",
+
+    "CREATE TRIGGER IF NOT EXISTS search_index_object_delete AFTER DELETE ON work_objects BEGIN "
+    "DELETE FROM search_index WHERE rowid = old.id * 2; "
+    "END",
+
+    "CREATE TRIGGER IF NOT EXISTS search_index_entry_insert AFTER INSERT ON time_entries "
+    "WHEN new.comment IS NOT NULL AND new.comment != '' BEGIN "
+    "INSERT INTO search_index (rowid, body, owner) VALUES ("
+    "new.id * 2 + 1, new.comment, "
+    "'u' || (SELECT user_id FROM work_objects WHERE id = new.work_object_id)); "
+    "END",
+
+    "CREATE TRIGGER IF NOT EXISTS search_index_entry_update AFTER UPDATE OF comment, work_object_id ON time_entries BEGIN "
+    "DELETE FROM search_index WHERE rowid = old.id * 2 + 1; "
+    "INSERT INTO search_index (rowid, body, owner) "
+    "SELECT new.id * 2 + 1, new.comment, 'u' || user_id FROM work_objects "
+    "WHERE id = new.work_object_id AND new.comment IS NOT NULL AND new.comment != ''; "
+    "END",
+
+    "CREATE TRIGGER IF NOT EXISTS search_index_entry_delete AFTER DELETE ON time_entries BEGIN "
+    "DELETE FROM search_index WHERE rowid = old.id * 2 + 1; "
+    "END",
+)
+
+for _statement in SEARCH_INDEX_DDL:
+    event.listen(Base.metadata, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
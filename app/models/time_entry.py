@@ -3,7 +3,7 @@ from __future__ import annotations
 from datetime import datetime, UTC
 from typing import TYPE_CHECKING
 
-from sqlalchemy import BigInteger, DateTime, ForeignKey, Integer, String, Text, Float
+from sqlalchemy import BigInteger, DateTime, ForeignKey, Index, Integer, String, Text, Float
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.session import Base
@@ -14,13 +14,24 @@ if TYPE_CHECKING:
 
 class TimeEntry(Base):
     __tablename__ = "time_entries"
+    __table_args__ = (
+        # Per-object history, period queries and batched archive/purge moves
+        Index("ix_time_entries_object_date", "work_object_id", "date"),
+        # Overlap checks: same user, same day, interval range
+        Index("ix_time_entries_user_interval", "user_id", "date", "start_time", "end_time"),
+        # Period queries and distinct work-day counts by local day number
+        Index("ix_time_entries_object_day", "work_object_id", "local_day"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     work_object_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("work_objects.id"), nullable=False)
+    user_id: Mapped[int | None] = mapped_column(BigInteger, nullable=True)  # Owner of the object, denormalized for per-user queries
     start_time: Mapped[datetime] = mapped_column(DateTime, nullable=False)
     end_time: Mapped[datetime] = mapped_column(DateTime, nullable=False)
-    hours: Mapped[float] = mapped_column(Float, nullable=False)  # Calculated hours with minutes
+    hours: Mapped[float] = mapped_column(Float, nullable=False)  # Deprecated: kept in sync with minutes during transition
+    minutes: Mapped[int | None] = mapped_column(Integer, nullable=True)  # Exact duration in minutes
     date: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    local_day: Mapped[int | None] = mapped_column(Integer, nullable=True)  # Days since 1970-01-01 of the local date
     comment: Mapped[str | None] = mapped_column(Text, nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(UTC), nullable=False)
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda:datetime.now(UTC), onupdate=datetime.utcnow, nullable=False)
@@ -28,5 +39,12 @@ class TimeEntry(Base):
     # Relationships
     work_object: Mapped[WorkObject] = relationship("WorkObject", back_populates="time_entries")
 
+    @property
+    def duration_minutes(self) -> int:
+        """Exact duration in minutes, falling back to hours for rows not yet backfilled"""
+        if self.minutes is not None:
+            return self.minutes
+        return round(self.hours * 60)
+
     def __repr__(self) -> str:
-        return f"<TimeEntry(id={self.id}, hours={self.hours}, date='{self.date}')>"
+        return f"<TimeEntry(id={self.id}, minutes={self.minutes}, date='{self.date}')>"
@@ -4,7 +4,7 @@ from datetime import datetime, UTC
 from enum import Enum
 from typing import TYPE_CHECKING
 
-from sqlalchemy import BigInteger, Boolean, DateTime, ForeignKey, String, Integer
+from sqlalchemy import BigInteger, Boolean, DateTime, ForeignKey, Index, String, Integer
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.session import Base
@@ -22,14 +22,25 @@ class ObjectStatus(str, Enum):
 
 class WorkObject(Base):
     __tablename__ = "work_objects"
+    __table_args__ = (
+        # Keyset pagination of pickers: most recently used first
+        Index("ix_work_objects_user_activity", "user_id", "is_deleted", "last_activity_at", "id"),
+        # Prefix search by case-folded name
+        Index("ix_work_objects_user_name_key", "user_id", "name_key"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     user_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("users.id"), nullable=False)
     name: Mapped[str] = mapped_column(String(255), nullable=False)
     status: Mapped[ObjectStatus] = mapped_column(String(20), default=ObjectStatus.ACTIVE, nullable=False)
     is_deleted: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
+    deleted_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)  # hard-deleted after the grace period
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(UTC), nullable=False)
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(UTC), onupdate=lambda: datetime.now(UTC), nullable=False)
+    last_activity_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(UTC), nullable=True)
+    name_key: Mapped[str | None] = mapped_column(String(255), nullable=True)  # name.casefold() for prefix search
+    completed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    is_archived: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)  # history moved to *_archive tables
 
     # Relationships
     user: Mapped[User] = relationship("User", back_populates="work_objects")
@@ -0,0 +1,22 @@
+# Record and replay of real update traffic for performance regression runs
+from app.replay.anonymize import Anonymizer
+from app.replay.recorder import UpdateRecorder
+from app.replay.replayer import (
+    OfflineSession,
+    compare,
+    count_queries,
+    load_recording,
+    prepare_database,
+    replay,
+)
+
+__all__ = [
+    "Anonymizer",
+    "OfflineSession",
+    "UpdateRecorder",
+    "compare",
+    "count_queries",
+    "load_recording",
+    "prepare_database",
+    "replay",
+]
@@ -0,0 +1,98 @@
+"""
+Replay a recorded update stream against a copy of the database:
+
+    python -m app.replay recordings/updates.jsonl --database worktime.db --speed 10 \\
+        --output replay-new.json --baseline replay-old.json
+
+Bot API calls are answered locally. RECORD_UPDATES_KEY must be the key the
+recording was made with, so user ids and names in the copy can be mapped.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import importlib
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+
+from app.handlers import ROUTER_MODULES
+from app.replay.replayer import MAX_GAP
+
+
+async def run(args: argparse.Namespace) -> None:
+    from app.config import get_settings
+    from app.replay.anonymize import Anonymizer
+    from app.replay.replayer import (
+        OfflineSession,
+        compare,
+        count_queries,
+        format_report,
+        load_recording,
+        prepare_database,
+        replay,
+    )
+
+    settings = get_settings()
+    if not settings.record_updates_key:
+        raise SystemExit("Set RECORD_UPDATES_KEY to the key the recording was made with")
+    records = load_recording(args.recording)
+
+    with tempfile.TemporaryDirectory() as scratch:
+        copy = Path(scratch) / "replay.db"
+        prepare_database(args.database, copy, Anonymizer(settings.record_updates_key))
+        # Handlers reach the database through the shared engine built from settings
+        os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{copy}"
+
+        from aiogram import Bot
+        from sqlalchemy.orm import configure_mappers
+
+        from app.db.session import dispose_engine, get_engine
+        from app.dispatcher import build_dispatcher
+        from app.middlewares.idempotency import CallbackAnswerRecorder
+
+        settings = get_settings()
+        # As at bot startup, so the first replayed updates do not pay for it
+        configure_mappers()
+        count_queries(get_engine())
+        bot = Bot(token="42:REPLAY")
+        offline = OfflineSession()
+        bot.session.middleware(CallbackAnswerRecorder())
+        bot.session.middleware(offline)
+        routers = [importlib.import_module(f"app.handlers.{name}").router for name in ROUTER_MODULES]
+        dp = build_dispatcher(settings, routers)
+        try:
+            result = await replay(dp, bot, records, speed=args.speed, max_gap=args.max_gap)
+        finally:
+            await bot.session.close()
+            await dispose_engine()
+
+    result["bot_calls"] = dict(offline.calls)
+    print("\n".join(format_report(result, offline.calls)))
+    if args.output:
+        args.output.write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding="utf-8")
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        print(f"\nBaseline {args.baseline}:")
+        print("\n".join(compare(baseline, result)))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay recorded updates against a copy of the database")
+    parser.add_argument("recording", type=Path, help="JSONL file written with RECORD_UPDATES")
+    parser.add_argument("--database", type=Path, required=True, help="database file or backup snapshot to copy")
+    parser.add_argument(
+        "--speed", type=float, default=1.0, help="times the original pace; 0 feeds everything at once"
+    )
+    parser.add_argument("--max-gap", type=float, default=MAX_GAP, help="longest pause kept from the recording, s")
+    parser.add_argument("--output", type=Path, help="write this run's metrics as JSON")
+    parser.add_argument("--baseline", type=Path, help="metrics JSON of a previous run to diff against")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import hashlib
+import hmac
+import re
+from typing import Any, Optional
+
+from app.keyboards.common import Texts
+
+# Letters only: digits and punctuation survive, so dates, times and amounts still parse
+_WORD = re.compile(r"[^\W\d_]+")
+_ALPHABET = "abcdefghijklmnopqrstuvwxyz"
+
+# Button labels the bot itself sends are matched by handlers and kept as is
+BOT_TEXTS = frozenset(
+    value for name, value in vars(Texts).items() if not name.startswith("_") and isinstance(value, str)
+)
+
+# Objects whose "id" is a Telegram user or chat id
+_ID_OWNERS = frozenset({"from", "from_user", "chat", "user", "sender_chat", "forward_from", "forward_from_chat"})
+_NAME_KEYS = frozenset({"first_name", "last_name", "title"})
+_TEXT_KEYS = frozenset({"text", "caption", "query"})
+# Media, contacts and places are never needed to replay a flow
+_DROP_KEYS = frozenset({
+    "username", "photo", "document", "voice", "video", "video_note", "audio", "sticker",
+    "animation", "contact", "location", "venue", "language_code",
+})
+
+
+class Anonymizer:
+    """
+    Keyed, deterministic pseudonyms: the same user id or word always maps to the
+    same value for one key, so FSM flows and a database copy prepared with the
+    same key stay consistent. Without the key the mapping cannot be reversed.
+    """
+
+    def __init__(self, key: str):
+        self._key = key.encode()
+
+    def user_id(self, value: int) -> int:
+        """Positive 40-bit pseudonym; group chats keep their negative sign"""
+        if value < 0:
+            return -self.user_id(-value)
+        digest = hmac.new(self._key, str(value).encode(), hashlib.sha256).digest()
+        return int.from_bytes(digest[:5], "big") + 1
+
+    def _word(self, match: re.Match) -> str:
+        word = match.group().casefold()
+        digest = hashlib.shake_256(self._key + b"\0" + word.encode()).digest(len(word))
+        return "".join(_ALPHABET[byte % len(_ALPHABET)] for byte in digest)
+
+    def words(self, value: Optional[str]) -> Optional[str]:
+        """Every word replaced by a lowercase pseudonym of the same length"""
+        if value is None:
+            return None
+        return _WORD.sub(self._word, value)
+
+    def text(self, value: str) -> str:
+        """Message text: bot buttons and command names kept, everything else masked"""
+        if value in BOT_TEXTS:
+            return value
+        if value.startswith("/"):
+            command, sep, args = value.partition(" ")
+            return command + sep + self.words(args)
+        return self.words(value)
+
+    def update(self, value: Any, owner: Optional[str] = None) -> Any:
+        """Anonymized copy of a serialized Update"""
+        if isinstance(value, list):
+            return [self.update(item, owner) for item in value]
+        if not isinstance(value, dict):
+            return value
+        result = {}
+        for key, item in value.items():
+            if key in _DROP_KEYS:
+                continue
+            if key == "id" and owner in _ID_OWNERS and isinstance(item, int):
+                result[key] = self.user_id(item)
+            elif key in _NAME_KEYS and isinstance(item, str):
+                result[key] = self.words(item)
+            elif key in _TEXT_KEYS and isinstance(item, str):
+                result[key] = self.text(item)
+            else:
+                result[key] = self.update(item, key)
+        return result
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import json
+import logging
+import secrets
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject, Update
+
+from app.replay.anonymize import Anonymizer
+
+logger = logging.getLogger(__name__)
+
+
+class UpdateRecorder(BaseMiddleware):
+    """
+    Outer update middleware appending every incoming update, anonymized, to a
+    JSONL file: {"at": unix time of arrival, "update": {...}}.
+    """
+
+    def __init__(self, path: Path, key: str = ""):
+        if not key:
+            # Still anonymized, but a database copy cannot be mapped to the recording
+            logger.warning("RECORD_UPDATES_KEY is not set, using a random key for this run")
+            key = secrets.token_hex(16)
+        self.anonymizer = Anonymizer(key)
+        self.path = path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Line buffered: a crash loses at most the update being written
+        self._file = open(path, "a", encoding="utf-8", buffering=1)
+        self.recorded = 0
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        if isinstance(event, Update):
+            self.record(event)
+        return await handler(event, data)
+
+    def record(self, update: Update) -> None:
+        try:
+            raw = update.model_dump(mode="json", exclude_none=True)
+            line = json.dumps({"at": round(time.time(), 3), "update": self.anonymizer.update(raw)}, ensure_ascii=False)
+            self._file.write(line + "\n")
+            self.recorded += 1
+        except Exception:
+            # Recording must never break update handling
+            logger.exception("Failed to record update %s", update.update_id)
+
+    def close(self) -> None:
+        self._file.close()
@@ -0,0 +1,246 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import re
+import sqlite3
+import time
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from aiogram import Bot, Dispatcher
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware
+from aiogram.types import Chat, Message
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.replay.anonymize import BOT_TEXTS, Anonymizer
+from app.services.backup import restore_backup
+
+logger = logging.getLogger(__name__)
+
+# Longer pauses in a recording (nights, bot restarts) are shortened to this
+MAX_GAP = 60.0  # seconds
+
+
+@dataclass
+class RecordedUpdate:
+    at: float
+    update: Dict[str, Any]
+
+
+def load_recording(path: Path) -> List[RecordedUpdate]:
+    records = []
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            if line.strip():
+                item = json.loads(line)
+                records.append(RecordedUpdate(item["at"], item["update"]))
+    records.sort(key=lambda record: record.at)
+    return records
+
+
+def update_kind(update: Dict[str, Any]) -> str:
+    """Grouping key for the report: command, menu button, message or callback pattern"""
+    message = update.get("message") or update.get("edited_message")
+    if message is not None:
+        text = message.get("text") or ""
+        if text.startswith("/"):
+            return text.split()[0].split("@")[0]
+        return text if text in BOT_TEXTS else "message"
+    query = update.get("callback_query")
+    if query is not None:
+        return "callback " + re.sub(r"\d+", "*", query.get("data") or "")
+    return next((key for key in update if key != "update_id"), "unknown")
+
+
+def prepare_database(source: Path, target: Path, anonymizer: Anonymizer) -> None:
+    """
+    Copy a database (or a backup snapshot) to `target` and apply the recorder's
+    pseudonyms, so recorded user ids and typed object names match the copy.
+    """
+    restore_backup(source, target)
+    conn = sqlite3.connect(target)
+    try:
+        conn.create_function("replay_id", 1, anonymizer.user_id, deterministic=True)
+        conn.create_function("replay_words", 1, anonymizer.words, deterministic=True)
+        with conn:
+            conn.execute(
+                "UPDATE users SET telegram_id = replay_id(telegram_id), username = NULL, "
+                "first_name = replay_words(first_name), last_name = replay_words(last_name)"
+            )
+            # Pseudonyms are lowercase already, so they are their own name_key
+            conn.execute("UPDATE work_objects SET name = replay_words(name), name_key = replay_words(name)")
+            for table in ("time_entries", "time_entries_archive"):
+                conn.execute(f"UPDATE {table} SET comment = replay_words(comment) WHERE comment IS NOT NULL")
+    finally:
+        conn.close()
+
+
+class OfflineSession(BaseRequestMiddleware):
+    """Bot session middleware answering every API call locally; counts calls per method"""
+
+    def __init__(self):
+        self.calls: Counter = Counter()
+        self._message_id = 0
+
+    async def __call__(self, make_request, bot, method):
+        self.calls[type(method).__name__] += 1
+        if method.__returning__ is not Message:
+            return True
+        self._message_id += 1
+        chat_id = getattr(method, "chat_id", None)
+        return Message(
+            message_id=self._message_id,
+            date=datetime.now(),
+            chat=Chat(id=chat_id if isinstance(chat_id, int) else 0, type="private"),
+            text=getattr(method, "text", None),
+        ).as_(bot)
+
+
+@dataclass
+class UpdateCost:
+    queries: int = 0
+    db_seconds: float = 0.0
+
+
+# Cost of the update handled in the current task
+_current_cost: ContextVar[Optional[UpdateCost]] = ContextVar("replay_update_cost", default=None)
+
+
+def count_queries(engine: AsyncEngine) -> None:
+    """Attribute every statement on `engine` and its time to the update being replayed"""
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("replay_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["replay_started"].pop()
+        cost = _current_cost.get()
+        if cost is not None:
+            cost.queries += 1
+            cost.db_seconds += time.perf_counter() - started
+
+
+@dataclass
+class KindStats:
+    latencies: List[float] = field(default_factory=list)
+    queries: int = 0
+    db_seconds: float = 0.0
+    errors: int = 0
+
+    def record(self, seconds: float, cost: UpdateCost, failed: bool) -> None:
+        self.latencies.append(seconds)
+        self.queries += cost.queries
+        self.db_seconds += cost.db_seconds
+        self.errors += failed
+
+    def snapshot(self) -> Dict[str, float]:
+        latencies = sorted(self.latencies)
+        count = len(latencies)
+        return {
+            "count": count,
+            "p50_ms": latencies[count // 2] * 1000,
+            "p95_ms": latencies[max(int(count * 0.95) - 1, 0)] * 1000,
+            "max_ms": latencies[-1] * 1000,
+            "queries": self.queries / count,
+            "db_ms": self.db_seconds / count * 1000,
+            "errors": self.errors,
+        }
+
+
+async def replay(
+    dp: Dispatcher,
+    bot: Bot,
+    records: Iterable[RecordedUpdate],
+    speed: float = 1.0,
+    max_gap: float = MAX_GAP,
+) -> Dict[str, Any]:
+    """
+    Feed recorded updates through the dispatcher, each in its own task as polling
+    does, at `speed` times the original pace (0: all at once). Returns per-kind
+    latency and database cost; count_queries() must be installed for the latter.
+    """
+    stats: Dict[str, KindStats] = {}
+    total = KindStats()
+
+    async def run(record: RecordedUpdate) -> None:
+        cost = UpdateCost()
+        _current_cost.set(cost)
+        failed = False
+        started = time.perf_counter()
+        try:
+            await dp.feed_raw_update(bot, record.update)
+        except Exception:
+            failed = True
+            logger.exception("Replayed update %s failed", record.update.get("update_id"))
+        elapsed = time.perf_counter() - started
+        stats.setdefault(update_kind(record.update), KindStats()).record(elapsed, cost, failed)
+        total.record(elapsed, cost, failed)
+
+    tasks = []
+    started = time.perf_counter()
+    offset = 0.0
+    previous: Optional[float] = None
+    for record in records:
+        if previous is not None:
+            offset += min(record.at - previous, max_gap)
+        previous = record.at
+        if speed > 0:
+            delay = started + offset / speed - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(run(record)))
+    await asyncio.gather(*tasks)
+
+    return {
+        "seconds": time.perf_counter() - started,
+        "total": total.snapshot() if total.latencies else None,
+        "kinds": {kind: item.snapshot() for kind, item in sorted(stats.items())},
+    }
+
+
+def _change(before: float, after: float) -> str:
+    if not before:
+        return ""
+    return f" ({(after - before) / before:+.0%})"
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any]) -> List[str]:
+    """Report lines: p95 latency and queries per update, baseline -> current"""
+    lines = []
+    rows = [("total", baseline.get("total"), current.get("total"))]
+    for kind in sorted(set(baseline["kinds"]) | set(current["kinds"])):
+        rows.append((kind, baseline["kinds"].get(kind), current["kinds"].get(kind)))
+    for kind, before, after in rows:
+        if before is None or after is None:
+            lines.append(f"{kind:<32} {'new' if before is None else 'gone'}")
+            continue
+        lines.append(
+            f"{kind:<32} p95 {before['p95_ms']:7.1f} -> {after['p95_ms']:7.1f} ms"
+            f"{_change(before['p95_ms'], after['p95_ms']):<8}"
+            f" queries {before['queries']:5.1f} -> {after['queries']:5.1f}"
+            f"{_change(before['queries'], after['queries']):<8}"
+            f" db {before['db_ms']:6.1f} -> {after['db_ms']:6.1f} ms"
+        )
+    return lines
+
+
+def format_report(result: Dict[str, Any], bot_calls: Counter) -> List[str]:
+    lines = [f"Replayed in {result['seconds']:.1f} s, Bot API calls: {sum(bot_calls.values())}"]
+    for kind, item in [("total", result["total"]), *result["kinds"].items()]:
+        if item is None:
+            continue
+        lines.append(
+            f"{kind:<32} {item['count']:6d}  p50 {item['p50_ms']:7.1f}  p95 {item['p95_ms']:7.1f}"
+            f"  max {item['max_ms']:7.1f} ms  queries {item['queries']:5.1f}  db {item['db_ms']:6.1f} ms"
+            f"  errors {item['errors']}"
+        )
+    return lines
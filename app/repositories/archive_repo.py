@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import List
+
+from sqlalchemy import Table, select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.archive import ArchivedPayment, ArchivedTimeEntry
+from app.models.payment import Payment
+from app.models.time_entry import TimeEntry
+from app.models.work_object import ObjectStatus, WorkObject
+from app.utils.dateparse import local_day
+
+# (hot table, archive table) pairs moved together
+ARCHIVED_TABLES = (
+    (TimeEntry.__table__, ArchivedTimeEntry.__table__),
+    (Payment.__table__, ArchivedPayment.__table__),
+)
+
+
+def _shared_columns(source: Table, target: Table, include_id: bool = True) -> str:
+    names = [
+        column.name for column in target.columns
+        if column.name in source.c and (include_id or column.name != "id")
+    ]
+    return ", ".join(names)
+
+
+def _id_list(ids) -> str:
+    return ", ".join(str(int(row_id)) for row_id in ids)
+
+
+class ArchiveRepository:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_objects_to_archive(self, completed_before: datetime, limit: int = 100) -> List[int]:
+        """IDs of objects completed before the cutoff whose history is still in hot tables"""
+        result = await self.session.execute(
+            select(WorkObject.id)
+            .where(
+                WorkObject.status == ObjectStatus.COMPLETED,
+                WorkObject.completed_at < completed_before,
+                WorkObject.is_archived == False,
+                WorkObject.is_deleted == False
+            )
+            .order_by(WorkObject.completed_at)
+            .limit(limit)
+        )
+        return list(result.scalars().all())
+
+    async def archive_object_batch(self, object_id: int, batch_size: int = 500) -> int:
+        """
+        Move up to batch_size rows of object history to the archive tables.
+        The object is flagged first, so readers union both sides while rows move.
+        Returns number of rows moved; 0 means the object is fully archived or
+        no longer completed (reopened between batches).
+        """
+        result = await self.session.execute(
+            update(WorkObject)
+            .where(WorkObject.id == object_id, WorkObject.status == ObjectStatus.COMPLETED)
+            .values(is_archived=True)
+        )
+        if not result.rowcount:
+            return 0
+
+        for source, target in ARCHIVED_TABLES:
+            ids = (
+                await self.session.execute(
+                    text(f"SELECT id FROM {source.name} WHERE work_object_id = :object_id ORDER BY id LIMIT :batch_size"),
+                    {"object_id": object_id, "batch_size": batch_size},
+                )
+            ).scalars().all()
+            if not ids:
+                continue
+
+            placeholders = _id_list(ids)
+            # Hot tables reuse the ids freed by archiving their last rows, so an id
+            # may already be taken in the archive by another object's row
+            taken = set(
+                (
+                    await self.session.execute(text(f"SELECT id FROM {target.name} WHERE id IN ({placeholders})"))
+                ).scalars().all()
+            )
+            # Keep original ids where they are still free...
+            kept = [row_id for row_id in ids if row_id not in taken]
+            if kept:
+                columns = _shared_columns(source, target)
+                await self.session.execute(
+                    text(
+                        f"INSERT INTO {target.name} ({columns}) SELECT {columns} FROM {source.name} "
+                        f"WHERE id IN ({_id_list(kept)})"
+                    )
+                )
+            # ...and give new ids to the rest
+            if taken:
+                columns_without_id = _shared_columns(source, target, include_id=False)
+                await self.session.execute(
+                    text(
+                        f"INSERT INTO {target.name} ({columns_without_id}) SELECT {columns_without_id} "
+                        f"FROM {source.name} WHERE id IN ({_id_list(taken)})"
+                    )
+                )
+            await self.session.execute(text(f"DELETE FROM {source.name} WHERE id IN ({placeholders})"))
+            return len(ids)
+
+        return 0
+
+    async def restore_object(self, object_id: int) -> int:
+        """Move object history back to the hot tables; returns number of rows restored"""
+        restored = 0
+        for source, target in ARCHIVED_TABLES:
+            columns = _shared_columns(source, target)
+            columns_without_id = _shared_columns(source, target, include_id=False)
+            params = {"object_id": object_id}
+
+            # Ids reused meanwhile in the hot table, by other objects or by rows
+            # added to this one; listed first, as a row given a new id may take
+            # the original id of another archived row
+            taken = (
+                await self.session.execute(
+                    text(
+                        f"SELECT a.id FROM {target.name} a JOIN {source.name} h ON h.id = a.id "
+                        f"WHERE a.work_object_id = :object_id"
+                    ),
+                    params,
+                )
+            ).scalars().all()
+            # Keep original ids where they are still free...
+            result = await self.session.execute(
+                text(
+                    f"INSERT INTO {source.name} ({columns}) "
+                    f"SELECT {columns} FROM {target.name} a WHERE a.work_object_id = :object_id "
+                    f"AND NOT EXISTS (SELECT 1 FROM {source.name} h WHERE h.id = a.id)"
+                ),
+                params,
+            )
+            restored += result.rowcount
+            # ...and give new ids to the rest
+            if taken:
+                result = await self.session.execute(
+                    text(
+                        f"INSERT INTO {source.name} ({columns_without_id}) "
+                        f"SELECT {columns_without_id} FROM {target.name} a "
+                        f"WHERE a.work_object_id = :object_id AND a.id IN ({_id_list(taken)})"
+                    ),
+                    params,
+                )
+                restored += result.rowcount
+            await self.session.execute(
+                text(f"DELETE FROM {target.name} WHERE work_object_id = :object_id"), params
+            )
+
+        await self.session.execute(
+            update(WorkObject).where(WorkObject.id == object_id).values(is_archived=False)
+        )
+        return restored
+
+    async def get_entries(self, object_id: int) -> List[ArchivedTimeEntry]:
+        """Get archived time entries for work object"""
+        result = await self.session.execute(
+            select(ArchivedTimeEntry).where(ArchivedTimeEntry.work_object_id == object_id)
+        )
+        return list(result.scalars().all())
+
+    async def get_entries_in_period(
+        self, object_id: int, start_date: datetime, end_date: datetime
+    ) -> List[ArchivedTimeEntry]:
+        """Get archived time entries of the local days in [start_date, end_date]"""
+        result = await self.session.execute(
+            select(ArchivedTimeEntry).where(
+                ArchivedTimeEntry.work_object_id == object_id,
+                ArchivedTimeEntry.local_day >= local_day(start_date),
+                ArchivedTimeEntry.local_day <= local_day(end_date)
+            )
+        )
+        return list(result.scalars().all())
+
+    async def get_payments(self, object_id: int) -> List[ArchivedPayment]:
+        """Get archived payments for work object"""
+        result = await self.session.execute(
+            select(ArchivedPayment).where(ArchivedPayment.work_object_id == object_id)
+        )
+        return list(result.scalars().all())
+
+    async def get_payments_in_period(
+        self, object_id: int, start_date: datetime, end_date: datetime
+    ) -> List[ArchivedPayment]:
+        """Get archived payments of the local days in [start_date, end_date]"""
+        result = await self.session.execute(
+            select(ArchivedPayment).where(
+                ArchivedPayment.work_object_id == object_id,
+                ArchivedPayment.local_day >= local_day(start_date),
+                ArchivedPayment.local_day <= local_day(end_date)
+            )
+        )
+        return list(result.scalars().all())
@@ -1,11 +1,20 @@
 from __future__ import annotations
 
-from typing import List, Optional
+from datetime import datetime, UTC
+from typing import List, NamedTuple, Optional, Tuple
 
-from sqlalchemy import select
+from sqlalchemy import and_, lambda_stmt, or_, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.keyboards.cache import object_keyboard_cache
 from app.models.work_object import ObjectStatus, WorkObject
+from app.repositories.archive_repo import ArchiveRepository
+
+
+class ObjectPage(NamedTuple):
+    objects: List[WorkObject]
+    # (last_activity_at, id) of the last object when more pages follow
+    next_cursor: Optional[Tuple[datetime, int]]
 
 
 class WorkObjectRepository:
@@ -15,11 +24,11 @@ class WorkObjectRepository:
     async def get_by_id(self, object_id: int, user_id: int) -> Optional[WorkObject]:
         """Get work object by ID for specific user"""
         result = await self.session.execute(
-            select(WorkObject).where(
+            lambda_stmt(lambda: select(WorkObject).where(
                 WorkObject.id == object_id,
                 WorkObject.user_id == user_id,
                 WorkObject.is_deleted == False
-            )
+            ))
         )
         return result.scalar_one_or_none()
 
@@ -29,46 +38,145 @@ class WorkObjectRepository:
         include_completed: bool = True
     ) -> List[WorkObject]:
         """Get all work objects for user"""
-        query = select(WorkObject).where(
+        query = lambda_stmt(lambda: select(WorkObject).where(
             WorkObject.user_id == user_id,
             WorkObject.is_deleted == False
-        )
+        ))
         
         if not include_completed:
-            query = query.where(WorkObject.status == ObjectStatus.ACTIVE)
+            query += lambda s: s.where(WorkObject.status == ObjectStatus.ACTIVE)
         
-        query = query.order_by(WorkObject.created_at.desc())
+        query += lambda s: s.order_by(WorkObject.created_at.desc())
         
         result = await self.session.execute(query)
         return list(result.scalars().all())
 
+    async def get_page(
+        self,
+        user_id: int,
+        include_completed: bool = True,
+        limit: int = 8,
+        after: Optional[Tuple[datetime, int]] = None,
+    ) -> ObjectPage:
+        """Get one page of user's objects, most recently active first (keyset pagination)"""
+        query = lambda_stmt(lambda: select(WorkObject).where(
+            WorkObject.user_id == user_id,
+            WorkObject.is_deleted == False
+        ))
+
+        if not include_completed:
+            query += lambda s: s.where(WorkObject.status == ObjectStatus.ACTIVE)
+
+        if after is not None:
+            after_activity, after_id = after
+            query += lambda s: s.where(
+                or_(
+                    WorkObject.last_activity_at < after_activity,
+                    and_(WorkObject.last_activity_at == after_activity, WorkObject.id < after_id),
+                )
+            )
+
+        # One extra row tells whether a next page exists
+        fetch = limit + 1
+        query += lambda s: s.order_by(WorkObject.last_activity_at.desc(), WorkObject.id.desc()).limit(fetch)
+
+        result = await self.session.execute(query)
+        objects = list(result.scalars().all())
+        if len(objects) <= limit:
+            return ObjectPage(objects, None)
+        objects = objects[:limit]
+        return ObjectPage(objects, (objects[-1].last_activity_at, objects[-1].id))
+
+    async def search_by_prefix(
+        self,
+        user_id: int,
+        prefix: str,
+        include_completed: bool = True,
+        limit: int = 8,
+    ) -> List[WorkObject]:
+        """Find user's objects whose name starts with prefix (case-insensitive, indexed range scan)"""
+        key = prefix.strip().casefold()
+        if not key:
+            return []
+
+        key_end = key + "\U0010ffff"
+        query = lambda_stmt(lambda: select(WorkObject).where(
+            WorkObject.user_id == user_id,
+            WorkObject.name_key >= key,
+            WorkObject.name_key < key_end,
+            WorkObject.is_deleted == False
+        ))
+
+        if not include_completed:
+            query += lambda s: s.where(WorkObject.status == ObjectStatus.ACTIVE)
+
+        query += lambda s: s.order_by(WorkObject.name_key).limit(limit)
+
+        result = await self.session.execute(query)
+        return list(result.scalars().all())
+
+    async def touch_activity(self, object_id: int) -> Optional[int]:
+        """Move object to the top of the pickers after new work or payment; returns owner's user_id"""
+        result = await self.session.execute(
+            update(WorkObject)
+            .where(WorkObject.id == object_id)
+            .values(last_activity_at=datetime.now(UTC))
+            .returning(WorkObject.user_id)
+        )
+        user_id = result.scalar_one_or_none()
+        if user_id is not None:
+            object_keyboard_cache.invalidate(user_id)
+        return user_id
+
     async def create_object(self, user_id: int, name: str) -> WorkObject:
         """Create new work object"""
         work_object = WorkObject(
             user_id=user_id,
             name=name,
+            name_key=name.casefold(),
             status=ObjectStatus.ACTIVE
         )
         self.session.add(work_object)
         await self.session.flush()
+        object_keyboard_cache.invalidate(user_id)
         return work_object
 
-    async def update_status(self, object_id: int, user_id: int, status: ObjectStatus) -> Optional[WorkObject]:
-        """Update work object status"""
-        work_object = await self.get_by_id(object_id, user_id)
-        if work_object:
-            work_object.status = status
-            await self.session.flush()
-        return work_object
+    async def update_status(self, object_id: int, user_id: int, status: ObjectStatus) -> Optional[str]:
+        """
+        Update status of user's object with a single UPDATE ... RETURNING
+        (ownership in the WHERE clause); returns the object's name, None if not found
+        """
+        result = await self.session.execute(
+            update(WorkObject)
+            .where(WorkObject.id == object_id, WorkObject.user_id == user_id, WorkObject.is_deleted == False)
+            .values(
+                status=status,
+                completed_at=datetime.now(UTC) if status == ObjectStatus.COMPLETED else None,
+            )
+            .returning(WorkObject.name, WorkObject.is_archived)
+        )
+        row = result.one_or_none()
+        if row is None:
+            return None
+        name, is_archived = row
+        if status == ObjectStatus.ACTIVE and is_archived:
+            # Reopened: bring archived history back to the hot tables
+            await ArchiveRepository(self.session).restore_object(object_id)
+        object_keyboard_cache.invalidate(user_id)
+        return name
 
-    async def delete_object(self, object_id: int, user_id: int) -> bool:
-        """Soft delete work object"""
-        work_object = await self.get_by_id(object_id, user_id)
-        if work_object:
-            work_object.is_deleted = True
-            await self.session.flush()
-            return True
-        return False
+    async def delete_object(self, object_id: int, user_id: int) -> Optional[str]:
+        """Soft delete user's object with a single UPDATE ... RETURNING; returns its name, None if not found"""
+        result = await self.session.execute(
+            update(WorkObject)
+            .where(WorkObject.id == object_id, WorkObject.user_id == user_id, WorkObject.is_deleted == False)
+            .values(is_deleted=True, deleted_at=datetime.now(UTC))
+            .returning(WorkObject.name)
+        )
+        name = result.scalar_one_or_none()
+        if name is not None:
+            object_keyboard_cache.invalidate(user_id)
+        return name
 
     async def get_by_name(self, user_id: int, name: str) -> Optional[WorkObject]:
         """Get work object by name for specific user"""
@@ -1,12 +1,42 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import List, Optional
+from typing import List, NamedTuple, Optional
 
-from sqlalchemy import select
+from sqlalchemy import delete, func, lambda_stmt, literal, select, union_all, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.models.archive import ArchivedPayment
 from app.models.payment import Payment
+from app.models.work_object import WorkObject
+from app.repositories.archive_repo import ArchiveRepository
+from app.repositories.object_repo import WorkObjectRepository
+from app.repositories.rollup_repo import RollupRepository, local_day_date
+from app.utils.dateparse import local_day
+
+
+class PaymentRow(NamedTuple):
+    """Read-only payment for cards and history: no identity map or change tracking"""
+    id: int
+    date: datetime
+    amount: int  # kopecks
+
+
+class UpdatedPayment(NamedTuple):
+    """Payment as written by update_payment, with its object's name for the reply"""
+    id: int
+    work_object_id: int
+    object_name: str
+    date: datetime
+    amount: int  # kopecks
+
+
+def _owned(payment_id: int, user_id: int) -> tuple:
+    """WHERE clause of a payment belonging to one of user's objects"""
+    return (
+        Payment.id == payment_id,
+        Payment.work_object_id.in_(select(WorkObject.id).where(WorkObject.user_id == user_id)),
+    )
 
 
 class PaymentRepository:
@@ -16,18 +46,44 @@ class PaymentRepository:
     async def get_by_id(self, payment_id: int) -> Optional[Payment]:
         """Get payment by ID"""
         result = await self.session.execute(
-            select(Payment).where(Payment.id == payment_id)
+            lambda_stmt(lambda: select(Payment).where(Payment.id == payment_id))
         )
         return result.scalar_one_or_none()
 
-    async def get_by_object_id(self, object_id: int) -> List[Payment]:
-        """Get all payments for work object"""
+    async def get_by_object_id(self, object_id: int, include_archive: bool = False) -> List[Payment]:
+        """Get all payments for work object (with archived ones if asked)"""
         result = await self.session.execute(
-            select(Payment)
+            lambda_stmt(lambda: select(Payment)
             .where(Payment.work_object_id == object_id)
-            .order_by(Payment.date.desc(), Payment.created_at.desc())
+            .order_by(Payment.date.desc(), Payment.created_at.desc()))
         )
-        return list(result.scalars().all())
+        payments = list(result.scalars().all())
+        if include_archive:
+            payments.extend(await ArchiveRepository(self.session).get_payments(object_id))
+            payments.sort(key=lambda payment: (payment.date, payment.created_at), reverse=True)
+        return payments
+
+    async def get_rows(self, object_id: int, include_archive: bool = False) -> List[PaymentRow]:
+        """Payments of work object as plain rows, newest first (archived ones in the same query)"""
+        if not include_archive:
+            result = await self.session.execute(
+                lambda_stmt(lambda: select(Payment.id, Payment.date, Payment.amount)
+                .where(Payment.work_object_id == object_id)
+                .order_by(Payment.date.desc(), Payment.created_at.desc()))
+            )
+            return [PaymentRow(*row) for row in result.all()]
+
+        rows = union_all(
+            select(Payment.id, Payment.date, Payment.amount, Payment.created_at)
+            .where(Payment.work_object_id == object_id),
+            select(ArchivedPayment.id, ArchivedPayment.date, ArchivedPayment.amount, ArchivedPayment.created_at)
+            .where(ArchivedPayment.work_object_id == object_id),
+        ).subquery()
+        result = await self.session.execute(
+            select(rows.c.id, rows.c.date, rows.c.amount)
+            .order_by(rows.c.date.desc(), rows.c.created_at.desc())
+        )
+        return [PaymentRow(*row) for row in result.all()]
 
     async def create_payment(
         self, 
@@ -39,51 +95,121 @@ class PaymentRepository:
         payment = Payment(
             work_object_id=work_object_id,
             amount=amount_kopecks,
-            date=date
+            date=date,
+            local_day=local_day(date)
         )
         self.session.add(payment)
         await self.session.flush()
+        user_id = await WorkObjectRepository(self.session).touch_activity(work_object_id)
+        await RollupRepository(self.session).apply(
+            user_id, work_object_id, payment.local_day, amount=amount_kopecks, payment_count=1
+        )
         return payment
 
     async def update_payment(
         self, 
         payment_id: int, 
+        user_id: int,
         amount_kopecks: Optional[int] = None,
         date: Optional[datetime] = None
-    ) -> Optional[Payment]:
-        """Update payment"""
-        payment = await self.get_by_id(payment_id)
-        if payment:
-            if amount_kopecks is not None:
-                payment.amount = amount_kopecks
-            if date is not None:
-                payment.date = date
-            await self.session.flush()
+    ) -> Optional[UpdatedPayment]:
+        """
+        Update user's payment with a single UPDATE ... RETURNING; ownership is
+        part of the WHERE clause. None when there is no such payment of this user.
+        """
+        owned = _owned(payment_id, user_id)
+        values = {}
+        if amount_kopecks is not None:
+            values["amount"] = amount_kopecks
+        if date is not None:
+            values.update(date=date, local_day=local_day(date))
+
+        rollups = RollupRepository(self.session)
+        if values:
+            # Take the payment's current amount out of its day before it changes
+            await rollups.apply_from(
+                select(
+                    literal(user_id), local_day_date(Payment.local_day), Payment.work_object_id,
+                    literal(0), -Payment.amount, literal(0), literal(-1),
+                ).where(*owned)
+            )
+        object_name = (
+            select(WorkObject.name)
+            .where(WorkObject.id == Payment.work_object_id)
+            .correlate(Payment)
+            .scalar_subquery()
+        )
+        result = await self.session.execute(
+            update(Payment)
+            .where(*owned)
+            .values(**values)
+            .returning(
+                Payment.id, Payment.work_object_id, object_name, Payment.date, Payment.amount, Payment.local_day
+            )
+        )
+        row = result.one_or_none()
+        if row is None:
+            return None
+        *fields, day = row
+        payment = UpdatedPayment(*fields)
+        if values:
+            await rollups.apply(user_id, payment.work_object_id, day, amount=payment.amount, payment_count=1)
+            await rollups.prune(user_id, payment.work_object_id)
         return payment
 
-    async def delete_payment(self, payment_id: int) -> bool:
-        """Delete payment"""
-        payment = await self.get_by_id(payment_id)
-        if payment:
-            await self.session.delete(payment)
-            await self.session.flush()
-            return True
-        return False
+    async def delete_payment(self, payment_id: int, user_id: int) -> bool:
+        """Delete user's payment with a single DELETE ... RETURNING"""
+        result = await self.session.execute(
+            delete(Payment)
+            .where(*_owned(payment_id, user_id))
+            .returning(Payment.work_object_id, Payment.local_day, Payment.amount)
+        )
+        row = result.one_or_none()
+        if row is None:
+            return False
+        work_object_id, day, amount = row
+        await RollupRepository(self.session).apply(
+            user_id, work_object_id, day, amount=-amount, payment_count=-1
+        )
+        return True
 
     async def get_payments_in_period(
         self, 
         object_id: int, 
         start_date: datetime, 
-        end_date: datetime
+        end_date: datetime,
+        include_archive: bool = False
     ) -> List[Payment]:
-        """Get payments within date range"""
+        """Get payments of the local days in [start_date, end_date]"""
+        first_day, last_day = local_day(start_date), local_day(end_date)
         result = await self.session.execute(
-            select(Payment)
+            lambda_stmt(lambda: select(Payment)
             .where(
                 Payment.work_object_id == object_id,
-                Payment.date >= start_date,
-                Payment.date <= end_date
+                Payment.local_day >= first_day,
+                Payment.local_day <= last_day
+            )
+            .order_by(Payment.date.desc()))
+        )
+        payments = list(result.scalars().all())
+        if include_archive:
+            payments.extend(
+                await ArchiveRepository(self.session).get_payments_in_period(object_id, start_date, end_date)
             )
-            .order_by(Payment.date.desc())
+            payments.sort(key=lambda payment: payment.date, reverse=True)
+        return payments
+
+    async def get_total_amount(self, object_id: int, include_archive: bool = False) -> int:
+        """Get exact total of payments for work object in kopecks"""
+        result = await self.session.execute(
+            lambda_stmt(lambda: select(func.coalesce(func.sum(Payment.amount), 0))
+            .where(Payment.work_object_id == object_id))
         )
-        return list(result.scalars().all())
+        total = int(result.scalar_one())
+        if include_archive:
+            result = await self.session.execute(
+                select(func.coalesce(func.sum(ArchivedPayment.amount), 0))
+                .where(ArchivedPayment.work_object_id == object_id)
+            )
+            total += int(result.scalar_one())
+        return total
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import List
+
+from sqlalchemy import delete, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.archive import ArchivedPayment, ArchivedTimeEntry
+from app.models.payment import Payment
+from app.models.rollup import DailyRollup
+from app.models.time_entry import TimeEntry
+from app.models.work_object import WorkObject
+
+# Tables holding object history, emptied before the object row itself
+PURGED_TABLES = (
+    TimeEntry.__tablename__,
+    Payment.__tablename__,
+    ArchivedTimeEntry.__tablename__,
+    ArchivedPayment.__tablename__,
+    DailyRollup.__tablename__,
+)
+
+
+class PurgeRepository:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_objects_to_purge(self, deleted_before: datetime, limit: int = 100) -> List[int]:
+        """IDs of soft-deleted objects past the grace period"""
+        result = await self.session.execute(
+            select(WorkObject.id)
+            .where(
+                WorkObject.is_deleted == True,
+                WorkObject.deleted_at < deleted_before
+            )
+            .order_by(WorkObject.deleted_at)
+            .limit(limit)
+        )
+        return list(result.scalars().all())
+
+    async def delete_history_batch(self, table: str, object_id: int, batch_size: int = 500) -> int:
+        """Hard-delete up to batch_size history rows of the object from one table"""
+        result = await self.session.execute(
+            text(
+                f"DELETE FROM {table} WHERE rowid IN ("
+                f"SELECT rowid FROM {table} WHERE work_object_id = :object_id LIMIT :batch_size)"
+            ),
+            {"object_id": object_id, "batch_size": batch_size},
+        )
+        return result.rowcount
+
+    async def delete_object_row(self, object_id: int) -> int:
+        """Hard-delete the object itself once its history is gone"""
+        result = await self.session.execute(
+            delete(WorkObject).where(WorkObject.id == object_id, WorkObject.is_deleted == True)
+        )
+        return result.rowcount
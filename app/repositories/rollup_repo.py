@@ -0,0 +1,291 @@
+from __future__ import annotations
+
+from datetime import date, datetime
+from typing import List, NamedTuple, Optional, Union
+
+from sqlalchemy import BigInteger, Integer, Select, case, cast, delete, func, insert, literal, select, union_all
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.archive import ArchivedPayment, ArchivedTimeEntry
+from app.models.payment import Payment
+from app.models.rollup import DailyRollup
+from app.models.time_entry import TimeEntry
+from app.models.work_object import WorkObject
+from app.utils.dateparse import day_to_date
+
+ROLLUP_KEY = ("user_id", "day", "work_object_id")
+ROLLUP_TOTALS = ("minutes", "amount", "entry_count", "payment_count")
+
+
+class PeriodTotals(NamedTuple):
+    work_object_id: Optional[int]  # None for the row summing all objects
+    minutes: int
+    amount: int
+    work_days: int  # distinct days with time entries
+
+
+class MonthTotals(NamedTuple):
+    month: date  # first day of the month
+    minutes: int
+    amount: int
+    work_days: int
+    prev_minutes: int
+    prev_amount: int
+    prev_work_days: int
+    ytd_minutes: int
+    ytd_amount: int
+
+
+def _month_start(value: date, shift: int = 0) -> date:
+    index = value.year * 12 + value.month - 1 + shift
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def local_day_date(column):
+    """SQL date of a local day number column, as rollup rows store it"""
+    return func.date(column * 86400, "unixepoch")
+
+
+def rollup_day(value: Union[datetime, date]) -> date:
+    """Calendar day of a period bound"""
+    return value.date() if isinstance(value, datetime) else value
+
+
+class RollupRepository:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_owner(self, work_object_id: int) -> Optional[int]:
+        """User owning the object (rollup rows are keyed by it)"""
+        result = await self.session.execute(
+            select(WorkObject.user_id).where(WorkObject.id == work_object_id)
+        )
+        return result.scalar_one_or_none()
+
+    async def apply(
+        self,
+        user_id: Optional[int],
+        work_object_id: int,
+        day: int,
+        minutes: int = 0,
+        amount: int = 0,
+        entry_count: int = 0,
+        payment_count: int = 0,
+    ) -> None:
+        """
+        Add deltas to the totals of one local day (a day number from local_day);
+        rows left without entries and payments are dropped
+        """
+        if user_id is None:
+            return
+        day = day_to_date(day)
+        stmt = sqlite_insert(DailyRollup).values(
+            user_id=user_id,
+            work_object_id=work_object_id,
+            day=day,
+            minutes=minutes,
+            amount=amount,
+            entry_count=entry_count,
+            payment_count=payment_count,
+        )
+        await self.session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=ROLLUP_KEY,
+                set_={column: getattr(DailyRollup, column) + getattr(stmt.excluded, column) for column in ROLLUP_TOTALS},
+            )
+        )
+        if entry_count < 0 or payment_count < 0:
+            await self.session.execute(
+                delete(DailyRollup).where(
+                    DailyRollup.user_id == user_id,
+                    DailyRollup.day == day,
+                    DailyRollup.work_object_id == work_object_id,
+                    DailyRollup.entry_count <= 0,
+                    DailyRollup.payment_count <= 0,
+                )
+            )
+
+    async def apply_from(self, rows: Select) -> None:
+        """
+        Add deltas computed by a SELECT of (user_id, day, work_object_id, minutes,
+        amount, entry_count, payment_count) in one statement, so a row's current
+        contribution can be taken out without loading it. The SELECT needs a
+        WHERE clause (SQLite's INSERT ... SELECT ... ON CONFLICT rule); rows it
+        empties are left for prune().
+        """
+        stmt = sqlite_insert(DailyRollup).from_select(ROLLUP_KEY + ROLLUP_TOTALS, rows)
+        await self.session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=ROLLUP_KEY,
+                set_={column: getattr(DailyRollup, column) + getattr(stmt.excluded, column) for column in ROLLUP_TOTALS},
+            )
+        )
+
+    async def prune(self, user_id: int, work_object_id: int) -> None:
+        """Drop the object's rows left without entries and payments"""
+        await self.session.execute(
+            delete(DailyRollup).where(
+                DailyRollup.user_id == user_id,
+                DailyRollup.work_object_id == work_object_id,
+                DailyRollup.entry_count <= 0,
+                DailyRollup.payment_count <= 0,
+            )
+        )
+
+    async def get_in_period(self, user_id: int, start_date: datetime, end_date: datetime) -> List[DailyRollup]:
+        """User's rollup rows for days in [start_date, end_date]"""
+        result = await self.session.execute(
+            select(DailyRollup)
+            .where(
+                DailyRollup.user_id == user_id,
+                DailyRollup.day >= rollup_day(start_date),
+                DailyRollup.day <= rollup_day(end_date)
+            )
+            .order_by(DailyRollup.day)
+        )
+        return list(result.scalars().all())
+
+    async def get_period_totals(self, user_id: int, start_date: datetime, end_date: datetime) -> List[PeriodTotals]:
+        """
+        Per-object totals for days in [start_date, end_date] plus a row for all
+        objects together, with distinct work days counted in SQL
+        """
+        in_period = (
+            select(DailyRollup)
+            .join(WorkObject, WorkObject.id == DailyRollup.work_object_id)
+            .where(
+                DailyRollup.user_id == user_id,
+                DailyRollup.day >= rollup_day(start_date),
+                DailyRollup.day <= rollup_day(end_date),
+                WorkObject.is_deleted == False
+            )
+            .subquery()
+        )
+        totals = (func.sum(in_period.c.minutes), func.sum(in_period.c.amount))
+        work_day = func.count(func.distinct(case((in_period.c.entry_count > 0, in_period.c.day))))
+        result = await self.session.execute(
+            union_all(
+                select(in_period.c.work_object_id, *totals, work_day).group_by(in_period.c.work_object_id),
+                select(literal(None, BigInteger), *totals, work_day).having(func.count() > 0),
+            )
+        )
+        return [
+            PeriodTotals(object_id, int(minutes), int(amount), int(work_days))
+            for object_id, minutes, amount, work_days in result.all()
+        ]
+
+    async def get_monthly_totals(self, user_id: int, start_date: datetime, end_date: datetime) -> List[MonthTotals]:
+        """
+        Per-month totals for every month in the range, in one statement: a month
+        series (empty months included) joined with grouped rollups, with the
+        previous month (LAG) and running year-to-date sums as window functions
+        """
+        first = _month_start(rollup_day(start_date))
+        last = rollup_day(end_date)
+        # One month earlier for LAG and back to January for the running YTD sums
+        series_start = min(_month_start(first, -1), first.replace(month=1))
+
+        month = func.strftime("%Y-%m", DailyRollup.day)
+        totals = (
+            select(
+                month.label("month"),
+                func.sum(DailyRollup.minutes).label("minutes"),
+                func.sum(DailyRollup.amount).label("amount"),
+                func.count(func.distinct(case((DailyRollup.entry_count > 0, DailyRollup.day)))).label("work_days"),
+            )
+            .join(WorkObject, WorkObject.id == DailyRollup.work_object_id)
+            .where(
+                DailyRollup.user_id == user_id,
+                DailyRollup.day >= series_start,
+                DailyRollup.day <= last,
+                WorkObject.is_deleted == False
+            )
+            .group_by(month)
+            .cte("month_totals")
+        )
+
+        months = select(literal(series_start.strftime("%Y-%m")).label("month")).cte("months", recursive=True)
+        months = months.union_all(
+            select(func.strftime("%Y-%m", months.c.month + "-01", "+1 month"))
+            .where(months.c.month < last.strftime("%Y-%m"))
+        )
+
+        minutes = func.coalesce(totals.c.minutes, 0)
+        amount = func.coalesce(totals.c.amount, 0)
+        work_days = func.coalesce(totals.c.work_days, 0)
+        by_month = {"order_by": months.c.month}
+        year_to_date = {"partition_by": func.substr(months.c.month, 1, 4), "order_by": months.c.month}
+        windowed = (
+            select(
+                months.c.month,
+                minutes.label("minutes"),
+                amount.label("amount"),
+                work_days.label("work_days"),
+                func.lag(minutes, 1, 0).over(**by_month).label("prev_minutes"),
+                func.lag(amount, 1, 0).over(**by_month).label("prev_amount"),
+                func.lag(work_days, 1, 0).over(**by_month).label("prev_work_days"),
+                func.sum(minutes).over(**year_to_date).label("ytd_minutes"),
+                func.sum(amount).over(**year_to_date).label("ytd_amount"),
+            )
+            .select_from(months.outerjoin(totals, totals.c.month == months.c.month))
+            .subquery()
+        )
+
+        result = await self.session.execute(
+            select(windowed)
+            .where(windowed.c.month >= first.strftime("%Y-%m"))
+            .order_by(windowed.c.month)
+        )
+        return [
+            MonthTotals(date.fromisoformat(f"{row[0]}-01"), *(int(value) for value in row[1:]))
+            for row in result.all()
+        ]
+
+    async def rebuild(self, user_id: Optional[int] = None) -> int:
+        """Recompute rollups from scratch out of live and archived history (for everyone or one user)"""
+        history = union_all(
+            *(
+                select(
+                    model.work_object_id,
+                    local_day_date(model.local_day).label("day"),
+                    func.coalesce(model.minutes, cast(func.round(model.hours * 60), Integer)).label("minutes"),
+                    literal(0).label("amount"),
+                    literal(1).label("entry_count"),
+                    literal(0).label("payment_count"),
+                )
+                for model in (TimeEntry, ArchivedTimeEntry)
+            ),
+            *(
+                select(
+                    model.work_object_id,
+                    local_day_date(model.local_day).label("day"),
+                    literal(0).label("minutes"),
+                    model.amount.label("amount"),
+                    literal(0).label("entry_count"),
+                    literal(1).label("payment_count"),
+                )
+                for model in (Payment, ArchivedPayment)
+            ),
+        ).subquery()
+
+        totals = (
+            select(
+                WorkObject.user_id,
+                history.c.day,
+                history.c.work_object_id,
+                *(func.sum(history.c[column]) for column in ROLLUP_TOTALS),
+            )
+            .join_from(history, WorkObject, WorkObject.id == history.c.work_object_id)
+            .group_by(WorkObject.user_id, history.c.day, history.c.work_object_id)
+        )
+        wipe = delete(DailyRollup)
+        if user_id is not None:
+            totals = totals.where(WorkObject.user_id == user_id)
+            wipe = wipe.where(DailyRollup.user_id == user_id)
+
+        await self.session.execute(wipe)
+        result = await self.session.execute(
+            insert(DailyRollup).from_select(ROLLUP_KEY + ROLLUP_TOTALS, totals)
+        )
+        return result.rowcount
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import re
+from datetime import datetime
+from typing import List, NamedTuple, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Snippet markers: control characters that cannot come from user text,
+# replaced with real markup after escaping
+HIGHLIGHT_START = "\x02"
+HIGHLIGHT_END = "\x03"
+
+_TOKEN_RE = re.compile(r"\w+")
+
+_SEARCH_SQL = text(
+    "SELECT s.rowid AS rowid, "
+    f"snippet(search_index, 0, '{HIGHLIGHT_START}', '{HIGHLIGHT_END}', '…', 12) AS snippet, "
+    "wo.id AS object_id, wo.name AS object_name, "
+    "te.id AS entry_id, te.date AS entry_date, te.minutes AS entry_minutes "
+    "FROM search_index s "
+    "LEFT JOIN time_entries te ON s.rowid % 2 = 1 AND te.id = s.rowid / 2 "
+    "JOIN work_objects wo ON wo.id = CASE WHEN s.rowid % 2 = 0 THEN s.rowid / 2 ELSE te.work_object_id END "
+    "WHERE search_index MATCH :match AND wo.is_deleted = 0 "
+    "ORDER BY bm25(search_index, 1.0, 0.0) "
+    "LIMIT :limit OFFSET :offset"
+)
+
+
+class SearchHit(NamedTuple):
+    object_id: int
+    object_name: str
+    snippet: str
+    # Set for time entry comments, None for object names
+    entry_id: Optional[int]
+    entry_date: Optional[datetime]
+    entry_minutes: Optional[int]
+
+
+def build_match_query(user_id: int, query: str) -> Optional[str]:
+    """Turn free user text into an FTS5 query: every word as a prefix term, scoped to the user"""
+    tokens = _TOKEN_RE.findall(query.casefold())
+    if not tokens:
+        return None
+    terms = " AND ".join(f'"{token}"*' for token in tokens)
+    return f"owner:u{user_id} AND body:({terms})"
+
+
+class SearchRepository:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def search(
+        self,
+        user_id: int,
+        query: str,
+        limit: int = 10,
+        offset: int = 0,
+    ) -> List[SearchHit]:
+        """Ranked full-text search over user's object names and entry comments"""
+        match = build_match_query(user_id, query)
+        if match is None:
+            return []
+
+        result = await self.session.execute(
+            _SEARCH_SQL, {"match": match, "limit": limit, "offset": offset}
+        )
+        return [
+            SearchHit(
+                object_id=row.object_id,
+                object_name=row.object_name,
+                snippet=row.snippet,
+                entry_id=row.entry_id,
+                entry_date=datetime.fromisoformat(row.entry_date) if row.entry_date else None,
+                entry_minutes=row.entry_minutes,
+            )
+            for row in result
+        ]
@@ -1,12 +1,53 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import List, Optional
+from typing import List, NamedTuple, Optional, Tuple
 
-from sqlalchemy import select
+from sqlalchemy import Integer, cast, delete, func, lambda_stmt, literal, select, union_all, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.models.archive import ArchivedTimeEntry
 from app.models.time_entry import TimeEntry
+from app.models.work_object import WorkObject
+from app.repositories.archive_repo import ArchiveRepository
+from app.repositories.object_repo import WorkObjectRepository
+from app.repositories.rollup_repo import RollupRepository, local_day_date
+from app.utils.dateparse import calculate_minutes, local_day
+
+# Exact minutes of an entry in SQL; rows not yet backfilled fall back to hours
+entry_minutes = func.coalesce(
+    TimeEntry.minutes, cast(func.round(TimeEntry.hours * 60), Integer)
+)
+archived_entry_minutes = func.coalesce(
+    ArchivedTimeEntry.minutes, cast(func.round(ArchivedTimeEntry.hours * 60), Integer)
+)
+
+
+class EntryRow(NamedTuple):
+    """Read-only time entry for cards and history: no identity map or change tracking"""
+    id: int
+    date: datetime
+    duration_minutes: int
+    comment: Optional[str]
+
+
+class UpdatedEntry(NamedTuple):
+    """Entry as written by update_entry, with its object's name for the reply"""
+    id: int
+    work_object_id: int
+    object_name: str
+    date: datetime
+    duration_minutes: int
+    comment: Optional[str]
+
+
+class EntryInterval(NamedTuple):
+    id: int
+    work_object_id: int
+    object_name: str
+    date: datetime
+    start_time: datetime
+    end_time: datetime
 
 
 class TimeEntryRepository:
@@ -16,83 +57,232 @@ class TimeEntryRepository:
     async def get_by_id(self, entry_id: int) -> Optional[TimeEntry]:
         """Get time entry by ID"""
         result = await self.session.execute(
-            select(TimeEntry).where(TimeEntry.id == entry_id)
+            lambda_stmt(lambda: select(TimeEntry).where(TimeEntry.id == entry_id))
         )
         return result.scalar_one_or_none()
 
-    async def get_by_object_id(self, object_id: int) -> List[TimeEntry]:
-        """Get all time entries for work object"""
+    async def get_by_object_id(self, object_id: int, include_archive: bool = False) -> List[TimeEntry]:
+        """Get all time entries for work object (with archived ones if asked)"""
         result = await self.session.execute(
-            select(TimeEntry)
+            lambda_stmt(lambda: select(TimeEntry)
             .where(TimeEntry.work_object_id == object_id)
-            .order_by(TimeEntry.date.desc(), TimeEntry.created_at.desc())
+            .order_by(TimeEntry.date.desc(), TimeEntry.created_at.desc()))
+        )
+        entries = list(result.scalars().all())
+        if include_archive:
+            entries.extend(await ArchiveRepository(self.session).get_entries(object_id))
+            entries.sort(key=lambda entry: (entry.date, entry.created_at), reverse=True)
+        return entries
+
+    async def get_rows(self, object_id: int, include_archive: bool = False) -> List[EntryRow]:
+        """Time entries of work object as plain rows, newest first (archived ones in the same query)"""
+        if not include_archive:
+            result = await self.session.execute(
+                lambda_stmt(lambda: select(TimeEntry.id, TimeEntry.date, entry_minutes, TimeEntry.comment)
+                .where(TimeEntry.work_object_id == object_id)
+                .order_by(TimeEntry.date.desc(), TimeEntry.created_at.desc()))
+            )
+            return [EntryRow(*row) for row in result.all()]
+
+        rows = union_all(
+            select(
+                TimeEntry.id, TimeEntry.date, entry_minutes.label("minutes"),
+                TimeEntry.comment, TimeEntry.created_at,
+            ).where(TimeEntry.work_object_id == object_id),
+            select(
+                ArchivedTimeEntry.id, ArchivedTimeEntry.date, archived_entry_minutes.label("minutes"),
+                ArchivedTimeEntry.comment, ArchivedTimeEntry.created_at,
+            ).where(ArchivedTimeEntry.work_object_id == object_id),
+        ).subquery()
+        result = await self.session.execute(
+            select(rows.c.id, rows.c.date, rows.c.minutes, rows.c.comment)
+            .order_by(rows.c.date.desc(), rows.c.created_at.desc())
         )
-        return list(result.scalars().all())
+        return [EntryRow(*row) for row in result.all()]
 
     async def create_entry(
         self, 
         work_object_id: int, 
         start_time: datetime,
         end_time: datetime,
-        hours: float, 
-        date: datetime, 
-        comment: Optional[str] = None
+        hours: Optional[float] = None,
+        date: Optional[datetime] = None,
+        comment: Optional[str] = None,
+        minutes: Optional[int] = None
     ) -> TimeEntry:
-        """Create new time entry"""
+        """Create new time entry (minutes and date default to the start/end interval)"""
+        if minutes is None:
+            minutes = calculate_minutes(start_time, end_time)
+        user_id = await WorkObjectRepository(self.session).touch_activity(work_object_id)
+        if date is None:
+            date = start_time.replace(hour=0, minute=0, second=0, microsecond=0)
         entry = TimeEntry(
             work_object_id=work_object_id,
+            user_id=user_id,
             start_time=start_time,
             end_time=end_time,
-            hours=hours,
+            minutes=minutes,
+            hours=hours if hours is not None else round(minutes / 60, 2),
             date=date,
+            local_day=local_day(date),
             comment=comment
         )
         self.session.add(entry)
         await self.session.flush()
+        await RollupRepository(self.session).apply(
+            user_id, work_object_id, entry.local_day, minutes=minutes, entry_count=1
+        )
         return entry
 
     async def update_entry(
         self, 
         entry_id: int, 
-        hours: Optional[int] = None,
+        user_id: int,
+        minutes: Optional[int] = None,
         date: Optional[datetime] = None,
         comment: Optional[str] = None
-    ) -> Optional[TimeEntry]:
-        """Update time entry"""
-        entry = await self.get_by_id(entry_id)
-        if entry:
-            if hours is not None:
-                entry.hours = hours
-            if date is not None:
-                entry.date = date
-            if comment is not None:
-                entry.comment = comment
-            await self.session.flush()
+    ) -> Optional[UpdatedEntry]:
+        """
+        Update user's time entry with a single UPDATE ... RETURNING; ownership is
+        part of the WHERE clause. None when there is no such entry of this user.
+        """
+        owned = (TimeEntry.id == entry_id, TimeEntry.user_id == user_id)
+        values = {}
+        if minutes is not None:
+            values.update(minutes=minutes, hours=round(minutes / 60, 2))
+        if date is not None:
+            values.update(date=date, local_day=local_day(date))
+        if comment is not None:
+            values["comment"] = comment
+
+        rollups = RollupRepository(self.session)
+        moves_totals = minutes is not None or date is not None
+        if moves_totals:
+            # Take the entry's current minutes out of its day before they change
+            await rollups.apply_from(
+                select(
+                    TimeEntry.user_id, local_day_date(TimeEntry.local_day), TimeEntry.work_object_id,
+                    -entry_minutes, literal(0), literal(-1), literal(0),
+                ).where(*owned)
+            )
+
+        object_name = (
+            select(WorkObject.name)
+            .where(WorkObject.id == TimeEntry.work_object_id)
+            .correlate(TimeEntry)
+            .scalar_subquery()
+        )
+        result = await self.session.execute(
+            update(TimeEntry)
+            .where(*owned)
+            .values(**values)
+            .returning(
+                TimeEntry.id, TimeEntry.work_object_id, object_name, TimeEntry.date,
+                entry_minutes, TimeEntry.comment, TimeEntry.local_day,
+            )
+        )
+        row = result.one_or_none()
+        if row is None:
+            return None
+        *fields, day = row
+        entry = UpdatedEntry(*fields)
+        if moves_totals:
+            await rollups.apply(user_id, entry.work_object_id, day, minutes=entry.duration_minutes, entry_count=1)
+            await rollups.prune(user_id, entry.work_object_id)
         return entry
 
-    async def delete_entry(self, entry_id: int) -> bool:
-        """Delete time entry"""
-        entry = await self.get_by_id(entry_id)
-        if entry:
-            await self.session.delete(entry)
-            await self.session.flush()
-            return True
-        return False
+    async def delete_entry(self, entry_id: int, user_id: int) -> bool:
+        """Delete user's time entry with a single DELETE ... RETURNING"""
+        result = await self.session.execute(
+            delete(TimeEntry)
+            .where(TimeEntry.id == entry_id, TimeEntry.user_id == user_id)
+            .returning(TimeEntry.work_object_id, TimeEntry.local_day, entry_minutes)
+        )
+        row = result.one_or_none()
+        if row is None:
+            return False
+        work_object_id, day, minutes = row
+        await RollupRepository(self.session).apply(
+            user_id, work_object_id, day, minutes=-minutes, entry_count=-1
+        )
+        return True
 
     async def get_entries_in_period(
         self, 
         object_id: int, 
         start_date: datetime, 
-        end_date: datetime
+        end_date: datetime,
+        include_archive: bool = False
     ) -> List[TimeEntry]:
-        """Get time entries within date range"""
+        """Get time entries of the local days in [start_date, end_date]"""
+        first_day, last_day = local_day(start_date), local_day(end_date)
         result = await self.session.execute(
-            select(TimeEntry)
+            lambda_stmt(lambda: select(TimeEntry)
             .where(
                 TimeEntry.work_object_id == object_id,
-                TimeEntry.date >= start_date,
-                TimeEntry.date <= end_date
+                TimeEntry.local_day >= first_day,
+                TimeEntry.local_day <= last_day
             )
-            .order_by(TimeEntry.date.desc())
+            .order_by(TimeEntry.date.desc()))
         )
-        return list(result.scalars().all())
+        entries = list(result.scalars().all())
+        if include_archive:
+            entries.extend(
+                await ArchiveRepository(self.session).get_entries_in_period(object_id, start_date, end_date)
+            )
+            entries.sort(key=lambda entry: entry.date, reverse=True)
+        return entries
+
+    async def find_overlapping(
+        self,
+        user_id: int,
+        date: datetime,
+        start_time: datetime,
+        end_time: datetime,
+        exclude_id: Optional[int] = None,
+        limit: int = 5,
+    ) -> List[Tuple[TimeEntry, str]]:
+        """User's entries on the same day whose interval intersects [start_time, end_time), with object names"""
+        query = lambda_stmt(lambda: select(TimeEntry, WorkObject.name)
+            .join(WorkObject, WorkObject.id == TimeEntry.work_object_id)
+            .where(
+                TimeEntry.user_id == user_id,
+                TimeEntry.date == date,
+                TimeEntry.start_time < end_time,
+                TimeEntry.end_time > start_time,
+                WorkObject.is_deleted == False
+            ))
+        if exclude_id is not None:
+            query += lambda s: s.where(TimeEntry.id != exclude_id)
+        query += lambda s: s.order_by(TimeEntry.start_time).limit(limit)
+
+        result = await self.session.execute(query)
+        return [(entry, name) for entry, name in result.all()]
+
+    async def get_intervals(self, user_id: int) -> List[EntryInterval]:
+        """All user's entry intervals ordered by start, for sweep-line overlap search"""
+        result = await self.session.execute(
+            lambda_stmt(lambda: select(
+                TimeEntry.id, TimeEntry.work_object_id, WorkObject.name,
+                TimeEntry.date, TimeEntry.start_time, TimeEntry.end_time
+            )
+            .join(WorkObject, WorkObject.id == TimeEntry.work_object_id)
+            .where(TimeEntry.user_id == user_id, WorkObject.is_deleted == False)
+            .order_by(TimeEntry.start_time, TimeEntry.id))
+        )
+        return [EntryInterval(*row) for row in result.all()]
+
+    async def get_total_minutes(self, object_id: int, include_archive: bool = False) -> int:
+        """Get exact total minutes logged for work object"""
+        result = await self.session.execute(
+            lambda_stmt(lambda: select(func.coalesce(func.sum(entry_minutes), 0))
+            .where(TimeEntry.work_object_id == object_id))
+        )
+        total = int(result.scalar_one())
+        if include_archive:
+            result = await self.session.execute(
+                select(func.coalesce(func.sum(archived_entry_minutes), 0))
+                .where(ArchivedTimeEntry.work_object_id == object_id)
+            )
+            total += int(result.scalar_one())
+        return total
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from typing import Optional
 
-from sqlalchemy import select
+from sqlalchemy import lambda_stmt, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.user import User
@@ -15,7 +15,7 @@ class UserRepository:
     async def get_by_telegram_id(self, telegram_id: int) -> Optional[User]:
         """Get user by Telegram ID"""
         result = await self.session.execute(
-            select(User).where(User.telegram_id == telegram_id)
+            lambda_stmt(lambda: select(User).where(User.telegram_id == telegram_id))
         )
         return result.scalar_one_or_none()
 
@@ -49,3 +49,17 @@ class UserRepository:
         if user is None:
             user = await self.create_user(telegram_id, username, first_name, last_name)
         return user
+
+    async def get_timezone(self, telegram_id: int) -> Optional[str]:
+        """User's own timezone name (None when not set or no such user)"""
+        result = await self.session.execute(
+            lambda_stmt(lambda: select(User.timezone).where(User.telegram_id == telegram_id))
+        )
+        return result.scalar_one_or_none()
+
+    async def set_timezone(self, telegram_id: int, timezone_name: Optional[str]) -> bool:
+        """Set user's timezone (None resets to the bot default); False when no such user"""
+        result = await self.session.execute(
+            update(User).where(User.telegram_id == telegram_id).values(timezone=timezone_name)
+        )
+        return result.rowcount > 0
@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import datetime, timedelta, UTC
+
+from app.db.session import db_session
+from app.repositories.archive_repo import ArchiveRepository
+
+logger = logging.getLogger(__name__)
+
+
+async def archive_object(object_id: int, batch_size: int = 500, pause: float = 0.05) -> int:
+    """Move object history to the archive tables, one short transaction per batch"""
+    total = 0
+    while True:
+        async with db_session() as session:
+            moved = await ArchiveRepository(session).archive_object_batch(object_id, batch_size)
+        if not moved:
+            return total
+        total += moved
+        # Let interactive writes through between batches
+        await asyncio.sleep(pause)
+
+
+async def archive_completed_objects(months: int, batch_size: int = 500, pause: float = 0.05) -> int:
+    """Archive history of objects completed more than `months` months ago; returns rows moved"""
+    completed_before = datetime.now(UTC) - timedelta(days=30 * months)
+    async with db_session() as session:
+        object_ids = await ArchiveRepository(session).get_objects_to_archive(completed_before)
+
+    total = 0
+    for object_id in object_ids:
+        moved = await archive_object(object_id, batch_size, pause)
+        logger.info("Archived object %d: %d rows moved", object_id, moved)
+        total += moved
+    return total
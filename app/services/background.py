@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+
+async def run_periodically(name: str, job: Callable[[], Awaitable[object]], interval: float) -> None:
+    """Run `job` every `interval` seconds until cancelled; failures are logged, not raised"""
+    while True:
+        try:
+            await job()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Background job %s failed", name)
+        await asyncio.sleep(interval)
+
+
+def start_background_task(
+    name: str, job: Callable[[], Awaitable[object]], interval: float
+) -> asyncio.Task:
+    return asyncio.create_task(run_periodically(name, job, interval), name=name)
@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+import asyncio
+import gzip
+import logging
+import os
+import shutil
+import sqlite3
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+
+from sqlalchemy.engine import make_url
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_PREFIX = "worktime-"
+SNAPSHOT_SUFFIX = ".db.gz"
+# Pages copied per backup step; the read lock is released between steps
+STEP_PAGES = 256
+# A write by another connection restarts the copy from the first page;
+# after this many restarts the rest is copied in one step
+MAX_RESTARTS = 3
+
+
+class BackupError(Exception):
+    pass
+
+
+class _TooManyRestarts(Exception):
+    pass
+
+
+def database_path(database_url: str) -> Optional[Path]:
+    """File behind a SQLite URL (None for in-memory and other databases)"""
+    url = make_url(database_url)
+    if url.get_backend_name() != "sqlite" or url.database in (None, "", ":memory:"):
+        return None
+    return Path(url.database)
+
+
+@dataclass
+class BackupResult:
+    path: Path
+    size: int  # bytes of the database copy
+    compressed_size: int
+    seconds: float
+    restarts: int = 0
+
+
+class BackupStats:
+    """Outcome of the latest backup for /diag and the logs"""
+
+    def __init__(self):
+        self.last: Optional[BackupResult] = None
+        self.last_at: Optional[datetime] = None
+        self.backups = 0
+        self.failures = 0
+
+    def record(self, result: BackupResult) -> None:
+        self.last = result
+        self.last_at = datetime.now()
+        self.backups += 1
+
+    def snapshot(self) -> dict:
+        last = self.last
+        return {
+            "backups": self.backups,
+            "failures": self.failures,
+            "last_at": self.last_at.isoformat(timespec="seconds") if self.last_at else None,
+            "last_seconds": round(last.seconds, 2) if last else None,
+            "last_size": last.size if last else None,
+            "last_compressed_size": last.compressed_size if last else None,
+        }
+
+
+backup_stats = BackupStats()
+
+
+def _copy_online(source: Path, target: Path, pages: int, pause: float) -> int:
+    """Copy a live database with the backup API; returns the number of restarts"""
+    restarts = 0
+    remaining_before: Optional[int] = None
+
+    def progress(status: int, remaining: int, total: int) -> None:
+        nonlocal restarts, remaining_before
+        if remaining_before is not None and remaining > remaining_before:
+            restarts += 1
+            if restarts > MAX_RESTARTS:
+                raise _TooManyRestarts()
+        remaining_before = remaining
+        # Between steps no lock is held: the bot's writes go through here
+        if remaining and pause:
+            time.sleep(pause)
+
+    src = sqlite3.connect(f"file:{source}?mode=ro", uri=True)
+    try:
+        dst = sqlite3.connect(target)
+        try:
+            try:
+                src.backup(dst, pages=pages, progress=progress)
+            except _TooManyRestarts:
+                logger.warning("Backup restarted %d times under writes, copying in one step", restarts)
+                src.backup(dst, pages=-1)
+        finally:
+            dst.close()
+    finally:
+        src.close()
+    return restarts
+
+
+def integrity_check(path: Path) -> str:
+    """'ok' or SQLite's description of the problems found"""
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        return "\n".join(row[0] for row in conn.execute("PRAGMA integrity_check"))
+    finally:
+        conn.close()
+
+
+def list_snapshots(backup_dir: Path) -> List[Path]:
+    """Compressed snapshots, newest first"""
+    return sorted(backup_dir.glob(f"{SNAPSHOT_PREFIX}*{SNAPSHOT_SUFFIX}"), reverse=True)
+
+
+def _rotate(backup_dir: Path, keep: int) -> None:
+    for old in list_snapshots(backup_dir)[keep:]:
+        old.unlink()
+        logger.info("Removed old backup %s", old)
+
+
+def create_backup(
+    database: Path, backup_dir: Path, keep: int = 7, pages: int = STEP_PAGES, pause: float = 0.01
+) -> BackupResult:
+    """
+    Online copy of the database, verified with PRAGMA integrity_check,
+    gzipped into backup_dir; only the newest `keep` snapshots are kept.
+    Blocking: run it in a worker thread.
+    """
+    started = time.perf_counter()
+    backup_dir.mkdir(parents=True, exist_ok=True)
+    name = f"{SNAPSHOT_PREFIX}{datetime.now():%Y%m%d-%H%M%S}"
+    path = backup_dir / f"{name}{SNAPSHOT_SUFFIX}"
+    copy = backup_dir / f"{name}.db.tmp"
+    packing = backup_dir / f"{name}{SNAPSHOT_SUFFIX}.tmp"
+    try:
+        restarts = _copy_online(database, copy, pages, pause)
+        status = integrity_check(copy)
+        if status != "ok":
+            raise BackupError(f"Backup copy failed integrity check: {status}")
+        size = copy.stat().st_size
+        with open(copy, "rb") as raw, gzip.open(packing, "wb") as packed:
+            shutil.copyfileobj(raw, packed)
+        # Only complete snapshots ever carry the final name
+        os.replace(packing, path)
+    finally:
+        copy.unlink(missing_ok=True)
+        packing.unlink(missing_ok=True)
+
+    _rotate(backup_dir, keep)
+    return BackupResult(path, size, path.stat().st_size, time.perf_counter() - started, restarts)
+
+
+def restore_backup(snapshot: Path, database: Path) -> None:
+    """
+    Replace the database contents with a snapshot (plain or gzipped) after
+    checking its integrity. Stop the bot first. Blocking.
+    """
+    unpacked = database.with_name(f"{database.name}.restore")
+    try:
+        opener = gzip.open if snapshot.suffix == ".gz" else open
+        with opener(snapshot, "rb") as packed, open(unpacked, "wb") as raw:
+            shutil.copyfileobj(packed, raw)
+        status = integrity_check(unpacked)
+        if status != "ok":
+            raise BackupError(f"Snapshot {snapshot} failed integrity check: {status}")
+        # Through the backup API, so journal files of the target stay consistent
+        src = sqlite3.connect(unpacked)
+        dst = sqlite3.connect(database)
+        try:
+            src.backup(dst)
+        finally:
+            dst.close()
+            src.close()
+    finally:
+        unpacked.unlink(missing_ok=True)
+
+
+async def backup_database(
+    database: Path, backup_dir: Path, keep: int = 7, pages: int = STEP_PAGES, pause: float = 0.01
+) -> BackupResult:
+    """Background job: create a snapshot off the event loop and record its metrics"""
+    try:
+        result = await asyncio.to_thread(create_backup, database, backup_dir, keep, pages, pause)
+    except Exception:
+        backup_stats.failures += 1
+        raise
+    backup_stats.record(result)
+    logger.info(
+        "Backup written to %s",
+        result.path,
+        extra={
+            "seconds": round(result.seconds, 2),
+            "size": result.size,
+            "compressed_size": result.compressed_size,
+            "restarts": result.restarts,
+        },
+    )
+    return result
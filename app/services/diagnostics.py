@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import gc
+import sys
+import tracemalloc
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from aiogram.fsm.storage.base import BaseStorage
+from sqlalchemy.orm import Session
+
+
+def rss_bytes() -> int:
+    """Current resident set size (peak RSS where /proc is not available)"""
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    import resource
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def deep_sizeof(value: Any, seen: Optional[set] = None) -> int:
+    """Approximate size of plain containers (dict/list/tuple/set) and their contents"""
+    if seen is None:
+        seen = set()
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(deep_sizeof(key, seen) + deep_sizeof(item, seen) for key, item in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(item, seen) for item in value)
+    return size
+
+
+@dataclass
+class FsmStorageStats:
+    entries: int
+    with_state: int
+    empty: int  # records left behind after state.clear()
+    approx_bytes: int
+
+
+def fsm_storage_stats(storage: BaseStorage) -> Optional[FsmStorageStats]:
+    """Entry count and approximate size of in-memory FSM storage (None for other storages)"""
+    records = getattr(storage, "storage", None)
+    if not isinstance(records, dict):
+        return None
+    seen: set = set()
+    approx = sys.getsizeof(records)
+    with_state = empty = 0
+    for key, record in list(records.items()):
+        approx += sys.getsizeof(key) + deep_sizeof(record.data, seen) + deep_sizeof(record.state, seen)
+        if record.state is not None:
+            with_state += 1
+        elif not record.data:
+            empty += 1
+    return FsmStorageStats(len(records), with_state, empty, approx)
+
+
+def identity_map_stats() -> Dict[str, int]:
+    """Live ORM sessions and objects held in their identity maps (walks the GC heap)"""
+    sessions = [obj for obj in gc.get_objects() if isinstance(obj, Session)]
+    return {
+        "sessions": len(sessions),
+        "identity_map": sum(len(session.identity_map) for session in sessions),
+    }
+
+
+def engine_stats(engine) -> Dict[str, Any]:
+    """Connection pool status and compiled statement cache fill"""
+    compiled_cache = getattr(engine.sync_engine, "_compiled_cache", None)
+    return {
+        "pool": engine.pool.status(),
+        "compiled_cache": len(compiled_cache) if compiled_cache is not None else 0,
+    }
+
+
+class MemorySnapshots:
+    """
+    On-demand tracemalloc: the first take() starts tracing and stores a baseline,
+    each following take() returns the top allocation sites grown since the previous one.
+    """
+
+    def __init__(self, frames: int = 1):
+        self.frames = frames
+        self._last: Optional[tracemalloc.Snapshot] = None
+
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def take(self, limit: int = 10) -> Optional[List[tracemalloc.StatisticDiff]]:
+        """None when tracing just started; otherwise the top growth since the previous snapshot"""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._last = None
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+        previous, self._last = self._last, snapshot
+        if previous is None:
+            return None
+        return snapshot.compare_to(previous, "lineno")[:limit]
+
+    def traced_bytes(self) -> int:
+        return tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else 0
+
+    def stop(self) -> None:
+        self._last = None
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+
+memory_snapshots = MemorySnapshots()
@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from app.db.session import Base, get_engine
+from app.middlewares.scheduler import SchedulerStats, scheduler_stats
+
+logger = logging.getLogger(__name__)
+
+# PRAGMA auto_vacuum values
+AUTO_VACUUM_INCREMENTAL = 2
+# Free pages returned to the file system per incremental_vacuum step
+VACUUM_STEP_PAGES = 256
+# A table is re-analyzed when its row count moved this much since the last ANALYZE
+STAT_CHANGE_RATIO = 0.1
+STAT_CHANGE_MIN_ROWS = 50
+
+
+@dataclass
+class MaintenanceResult:
+    seconds: float = 0.0
+    analyzed: List[str] = field(default_factory=list)
+    reclaimed_bytes: int = 0
+    free_pages_left: int = 0
+    checkpointed: bool = False
+    interrupted: bool = False  # stopped early because updates came in
+
+
+async def _pragma(conn: AsyncConnection, statement: str):
+    return (await conn.exec_driver_sql(f"PRAGMA {statement}")).scalar()
+
+
+async def _analyzed_rows(conn: AsyncConnection) -> Dict[str, int]:
+    """Row counts recorded by the last ANALYZE, per table"""
+    exists = await conn.execute(text("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'"))
+    if exists.first() is None:
+        return {}
+    result = await conn.execute(text("SELECT tbl, stat FROM sqlite_stat1"))
+    return {table: int(stat.split()[0]) for table, stat in result.all() if stat}
+
+
+async def changed_tables(conn: AsyncConnection) -> List[str]:
+    """Model tables whose size drifted from their planner statistics"""
+    analyzed = await _analyzed_rows(conn)
+    changed = []
+    for table in Base.metadata.sorted_tables:
+        rows = (await conn.execute(text(f'SELECT COUNT(*) FROM "{table.name}"'))).scalar_one()
+        before = analyzed.get(table.name)
+        if before is None:
+            if rows:
+                changed.append(table.name)
+        elif abs(rows - before) >= max(STAT_CHANGE_MIN_ROWS, before * STAT_CHANGE_RATIO):
+            changed.append(table.name)
+    return changed
+
+
+async def run_maintenance(
+    engine: AsyncEngine,
+    is_idle: Callable[[], bool] = lambda: True,
+    vacuum_step_pages: int = VACUUM_STEP_PAGES,
+    pause: float = 0.05,
+) -> MaintenanceResult:
+    """
+    ANALYZE tables with stale statistics, PRAGMA optimize, incremental_vacuum of
+    free pages and a WAL checkpoint. Work is done in short autocommitted steps;
+    it stops as soon as is_idle() turns false.
+    """
+    started = time.perf_counter()
+    result = MaintenanceResult()
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        page_size = await _pragma(conn, "page_size")
+        pages_before = await _pragma(conn, "page_count")
+
+        for table in await changed_tables(conn):
+            if not is_idle():
+                result.interrupted = True
+                break
+            await conn.exec_driver_sql(f'ANALYZE "{table}"')
+            result.analyzed.append(table)
+            await asyncio.sleep(pause)
+
+        if not result.interrupted:
+            await conn.exec_driver_sql("PRAGMA optimize")
+
+        if await _pragma(conn, "auto_vacuum") == AUTO_VACUUM_INCREMENTAL:
+            while not result.interrupted and await _pragma(conn, "freelist_count"):
+                if not is_idle():
+                    result.interrupted = True
+                    break
+                await conn.exec_driver_sql(f"PRAGMA incremental_vacuum({vacuum_step_pages})")
+                await asyncio.sleep(pause)
+
+        if not result.interrupted and await _pragma(conn, "journal_mode") == "wal":
+            await conn.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)")
+            result.checkpointed = True
+
+        result.reclaimed_bytes = (pages_before - await _pragma(conn, "page_count")) * page_size
+        result.free_pages_left = await _pragma(conn, "freelist_count")
+
+    result.seconds = time.perf_counter() - started
+    logger.info(
+        "Database maintenance %s",
+        "interrupted by updates" if result.interrupted else "finished",
+        extra={
+            "seconds": round(result.seconds, 2),
+            "reclaimed_bytes": result.reclaimed_bytes,
+            "free_pages_left": result.free_pages_left,
+            "analyzed": ",".join(result.analyzed) or "-",
+        },
+    )
+    return result
+
+
+async def enable_incremental_vacuum(engine: AsyncEngine) -> bool:
+    """
+    Switch an existing database to auto_vacuum=INCREMENTAL. Takes a full VACUUM,
+    which rewrites the file and blocks writers: run it with the bot stopped.
+    Returns False when the database already was in that mode.
+    """
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        if await _pragma(conn, "auto_vacuum") == AUTO_VACUUM_INCREMENTAL:
+            return False
+        await conn.exec_driver_sql("PRAGMA auto_vacuum = INCREMENTAL")
+        await conn.exec_driver_sql("VACUUM")
+        return True
+
+
+class MaintenanceScheduler:
+    """
+    Periodic job: runs maintenance at most once per `interval` seconds, and only
+    after `idle_seconds` without updates; an interrupted run is retried in the
+    next idle window.
+    """
+
+    def __init__(self, interval: float, idle_seconds: float, stats: SchedulerStats = scheduler_stats):
+        self.interval = interval
+        self.idle_seconds = idle_seconds
+        self.stats = stats
+        self._last_run: Optional[float] = None
+
+    def is_idle(self) -> bool:
+        return self.stats.idle_seconds() >= self.idle_seconds
+
+    def due(self) -> bool:
+        return self._last_run is None or time.monotonic() - self._last_run >= self.interval
+
+    async def tick(self) -> Optional[MaintenanceResult]:
+        if not self.due() or not self.is_idle():
+            return None
+        result = await run_maintenance(get_engine(), is_idle=self.is_idle)
+        if not result.interrupted:
+            self._last_run = time.monotonic()
+        return result
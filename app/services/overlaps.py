@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+import heapq
+from typing import Iterable, List, Tuple
+
+from app.repositories.time_repo import EntryInterval
+
+
+def find_overlaps(intervals: Iterable[EntryInterval]) -> List[Tuple[EntryInterval, EntryInterval]]:
+    """
+    Every pair of intersecting intervals, in one sweep over intervals sorted by start.
+    Entries still running at the current start are kept in a heap by end time,
+    so the pass costs O(n log n + pairs).
+    """
+    running: List[Tuple[object, int, EntryInterval]] = []
+    pairs: List[Tuple[EntryInterval, EntryInterval]] = []
+    for current in intervals:
+        while running and running[0][0] <= current.start_time:
+            heapq.heappop(running)
+        pairs.extend((earlier, current) for _, _, earlier in sorted(running, key=lambda item: item[1]))
+        heapq.heappush(running, (current.end_time, current.id, current))
+    return pairs
+
+
+def is_duplicate(first: EntryInterval, second: EntryInterval) -> bool:
+    """Same interval logged twice"""
+    return first.start_time == second.start_time and first.end_time == second.end_time
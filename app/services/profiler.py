@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from types import CodeType, FrameType
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from aiogram import Router
+
+logger = logging.getLogger(__name__)
+
+# Root of stacks sampled while no registered handler was running
+OUTSIDE_HANDLERS = "<outside handlers>"
+
+
+def handler_names(router: Router) -> Dict[CodeType, str]:
+    """Code objects of every handler callback in the router tree, mapped to readable names"""
+    names: Dict[CodeType, str] = {}
+    for current in router.chain_tail:
+        for observer in current.observers.values():
+            for handler in observer.handlers:
+                # Dispatcher's own update listener wraps every handler
+                if isinstance(getattr(handler.callback, "__self__", None), Router):
+                    continue
+                code = getattr(handler.callback, "__code__", None)
+                if code is not None:
+                    names[code] = f"{handler.callback.__module__}.{handler.callback.__qualname__}"
+    return names
+
+
+def _frame_label(frame: FrameType) -> str:
+    return f"{frame.f_globals.get('__name__', '?')}.{frame.f_code.co_qualname}"
+
+
+@dataclass
+class ProfileResult:
+    samples: int
+    updates: int
+    seconds: float
+    interval: float
+    path: Optional[Path]
+    per_handler: List[Tuple[str, int]] = field(default_factory=list)
+    top_functions: List[Tuple[str, int]] = field(default_factory=list)
+
+
+class SamplingProfiler:
+    """
+    Low-overhead statistical profiler for the event loop thread: while active,
+    a helper thread samples the loop's current stack every `interval` seconds.
+    Each sample is attributed to the registered handler found on the stack.
+    A session ends after a number of updates or seconds. It writes a
+    collapsed-stack file (flamegraph.pl / speedscope) to `output_dir`.
+    """
+
+    def __init__(self, output_dir: str = "profiles", interval: float = 0.005):
+        self.output_dir = Path(output_dir)
+        self.interval = interval
+        self._stacks: Counter = Counter()
+        self._handlers: Dict[CodeType, str] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._target_thread = 0
+        self._max_updates: Optional[int] = None
+        self._updates = 0
+        self._started_at = 0.0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._finishing: Optional[asyncio.Task] = None
+        self._on_finish: Optional[Callable[[ProfileResult], Awaitable[None]]] = None
+
+    @property
+    def running(self) -> bool:
+        """A session is sampling or still writing its results"""
+        return self._thread is not None
+
+    @property
+    def active(self) -> bool:
+        """Updates still count toward the session"""
+        return self._thread is not None and self._finishing is None
+
+    def start(
+        self,
+        handlers: Dict[CodeType, str],
+        updates: Optional[int] = None,
+        seconds: Optional[float] = None,
+        on_finish: Optional[Callable[[ProfileResult], Awaitable[None]]] = None,
+    ) -> None:
+        """Start sampling the calling (event loop) thread; must be called from the loop"""
+        if self._thread is not None:
+            raise RuntimeError("Profiler is already running")
+        self._stacks = Counter()
+        self._handlers = handlers
+        self._max_updates = updates
+        self._updates = 0
+        self._on_finish = on_finish
+        self._finishing = None
+        self._target_thread = threading.get_ident()
+        self._started_at = time.perf_counter()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._sample, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        if seconds is not None:
+            self._timer = asyncio.get_running_loop().call_later(seconds, self.stop)
+
+    def update_started(self) -> bool:
+        """Called per update; True when the update counts toward the session"""
+        return self.active
+
+    def update_finished(self) -> None:
+        self._updates += 1
+        if self._max_updates is not None and self._updates >= self._max_updates:
+            self.stop()
+
+    def stop(self) -> Optional[asyncio.Task]:
+        """End the session (results are written and reported in the background)"""
+        if self._thread is None:
+            return None
+        if self._finishing is None:
+            self._finishing = asyncio.get_running_loop().create_task(self._finish())
+        return self._finishing
+
+    def _sample(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._target_thread)
+            if frame is None:
+                continue
+            # Leaf first; the outermost registered handler owns the sample
+            stack: List[str] = []
+            handler, handler_depth = OUTSIDE_HANDLERS, None
+            while frame is not None:
+                name = self._handlers.get(frame.f_code)
+                if name is not None:
+                    handler, handler_depth = name, len(stack)
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            if handler_depth is not None:
+                stack = stack[:handler_depth]
+            stack.reverse()
+            self._stacks[(handler, *stack)] += 1
+
+    async def _finish(self) -> ProfileResult:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._stop.set()
+        await asyncio.to_thread(self._thread.join)
+        seconds = time.perf_counter() - self._started_at
+
+        per_handler: Counter = Counter()
+        self_time: Counter = Counter()
+        for stack, count in self._stacks.items():
+            per_handler[stack[0]] += count
+            if stack[0] != OUTSIDE_HANDLERS:
+                self_time[stack[-1]] += count
+
+        path = await asyncio.to_thread(self._write_collapsed) if self._stacks else None
+        result = ProfileResult(
+            samples=sum(self._stacks.values()),
+            updates=self._updates,
+            seconds=seconds,
+            interval=self.interval,
+            path=path,
+            per_handler=per_handler.most_common(),
+            top_functions=self_time.most_common(10),
+        )
+        logger.info(
+            "Profile finished: %d samples over %.1f s, %d updates, written to %s",
+            result.samples, seconds, result.updates, path,
+        )
+        self._thread = None
+        on_finish, self._on_finish = self._on_finish, None
+        if on_finish is not None:
+            await on_finish(result)
+        return result
+
+    def _write_collapsed(self) -> Path:
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        path = self.output_dir / f"profile-{datetime.now():%Y%m%d-%H%M%S}.collapsed"
+        with open(path, "w", encoding="utf-8") as output:
+            for stack, count in self._stacks.most_common():
+                output.write(f"{';'.join(stack)} {count}\n")
+        return path
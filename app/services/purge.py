@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import Counter
+from datetime import datetime, timedelta, UTC
+
+from app.db.session import db_session
+from app.models.work_object import WorkObject
+from app.repositories.purge_repo import PURGED_TABLES, PurgeRepository
+
+logger = logging.getLogger(__name__)
+
+
+async def purge_object(object_id: int, counts: Counter, batch_size: int = 500, pause: float = 0.05) -> None:
+    """Hard-delete object history table by table, one short transaction per batch"""
+    for table in PURGED_TABLES:
+        while True:
+            async with db_session() as session:
+                deleted = await PurgeRepository(session).delete_history_batch(table, object_id, batch_size)
+            if not deleted:
+                break
+            counts[table] += deleted
+            # Let interactive writes through between batches
+            await asyncio.sleep(pause)
+
+    async with db_session() as session:
+        counts[WorkObject.__tablename__] += await PurgeRepository(session).delete_object_row(object_id)
+
+
+async def purge_deleted_objects(days: int, batch_size: int = 500, pause: float = 0.05) -> Counter:
+    """Hard-delete objects soft-deleted more than `days` days ago; returns rows purged per table"""
+    deleted_before = datetime.now(UTC) - timedelta(days=days)
+    async with db_session() as session:
+        object_ids = await PurgeRepository(session).get_objects_to_purge(deleted_before)
+
+    counts: Counter = Counter()
+    for object_id in object_ids:
+        await purge_object(object_id, counts, batch_size, pause)
+
+    logger.info(
+        "Purged %d deleted objects: %s",
+        len(object_ids),
+        ", ".join(f"{table}={count}" for table, count in sorted(counts.items())) or "nothing to purge",
+    )
+    return counts
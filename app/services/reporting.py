@@ -1,112 +1,182 @@
 from __future__ import annotations
 
 from datetime import datetime, timedelta
-from typing import List, Tuple
+from operator import attrgetter
+from typing import List, Sequence, Tuple
 
-from app.models.payment import Payment
-from app.models.time_entry import TimeEntry
-from app.models.work_object import WorkObject
+from app.repositories.payment_repo import PaymentRow
+from app.repositories.rollup_repo import MonthTotals, PeriodTotals
+from app.repositories.time_repo import EntryRow
+from app.models.work_object import ObjectStatus, WorkObject
+from app.utils.dateparse import get_today_in_timezone, local_day
 from app.utils.formatting import (
     format_currency,
+    format_currency_delta,
     format_date_range,
-    format_hours,
+    format_minutes,
+    format_minutes_delta,
+    format_month_name,
     format_month_year,
     format_rate,
+    format_rate_delta,
+    format_short_date,
     format_work_days,
+    hourly_rate,
+    plural,
+    WORK_DAY_FORMS,
 )
 
 
+def _local_today(timezone_name: str) -> datetime:
+    """Today's midnight in the timezone as naive wall time, like stored dates"""
+    return get_today_in_timezone(timezone_name).replace(tzinfo=None)
+
+
 class ReportingService:
     @staticmethod
     def generate_object_report(
         work_object: WorkObject,
-        time_entries: List[TimeEntry],
-        payments: List[Payment]
+        total_minutes: int,
+        total_payments: int,
+        work_days: int
     ) -> str:
-        """Generate report for a single work object"""
-        total_hours = sum(entry.hours for entry in time_entries)
-        total_payments = sum(payment.amount for payment in payments)
-        
-        if total_hours == 0:
+        """Generate report line for a single work object from its totals"""
+        if total_minutes == 0:
             return f"{work_object.name} — 0ч — {format_currency(total_payments)}"
         
-        # Calculate work days (unique dates with time entries)
-        work_dates = set(entry.date.date() for entry in time_entries)
-        work_days = len(work_dates)
-        
         # Calculate hourly rate
-        rate_str = format_rate(total_payments, total_hours)
+        rate_str = format_rate(total_payments, total_minutes)
         
         return (
-            f"{work_object.name} — {format_hours(total_hours)} "
-            f"({format_work_days(work_days)} д. работы) — "
+            f"{work_object.name} — {format_minutes(total_minutes)} "
+            f"({format_work_days(work_days)} работы) — "
             f"{format_currency(total_payments)} ({rate_str})"
         )
 
+    @staticmethod
+    def generate_object_card(
+        work_object: WorkObject,
+        time_entries: Sequence[EntryRow],
+        payments: Sequence[PaymentRow],
+        total_minutes: int,
+        total_payments: int
+    ) -> str:
+        """Generate object card with its totals, time entries and payments"""
+        active = work_object.status == ObjectStatus.ACTIVE
+        lines = [
+            f"🏗️ <b>{work_object.name}</b>",
+            f"Статус: {'🔵 Активен' if active else '🟢 Завершён'}",
+            f"Всего часов: {format_minutes(total_minutes)}",
+            f"Всего оплат: {format_currency(total_payments)}",
+            f"Дата создания: {format_short_date(work_object.created_at)}",
+        ]
+
+        entries = sorted(time_entries, key=attrgetter("date"))
+        if entries:
+            lines.append(f"Начало работ: {format_short_date(entries[0].date)}")
+            if work_object.status == ObjectStatus.COMPLETED:
+                lines.append(f"Завершение: {format_short_date(entries[-1].date)}")
+            lines += ["", "🕒 <b>Записи работ:</b>"]
+            lines += [
+                f"• {format_short_date(entry.date)} — {format_minutes(entry.duration_minutes)}"
+                for entry in entries
+            ]
+
+        if payments:
+            lines += ["", "💰 <b>Записи оплат:</b>"]
+            lines += [
+                f"• {format_short_date(payment.date)} — {format_currency(payment.amount)}"
+                for payment in sorted(payments, key=attrgetter("date"))
+            ]
+
+        return "\n".join(lines)
+
     @staticmethod
     def generate_period_report(
         objects: List[WorkObject],
-        time_entries: List[TimeEntry],
-        payments: List[Payment],
+        totals: List[PeriodTotals],
         start_date: datetime,
         end_date: datetime
     ) -> str:
-        """Generate report for a specific period"""
+        """Generate report for a specific period from per-object rollup totals"""
         if not objects:
             return "📊 За указанный период нет данных."
-        
-        # Group entries by object
-        object_entries = {}
-        object_payments = {}
-        
-        for entry in time_entries:
-            if entry.work_object_id not in object_entries:
-                object_entries[entry.work_object_id] = []
-            object_entries[entry.work_object_id].append(entry)
-        
-        for payment in payments:
-            if payment.work_object_id not in object_payments:
-                object_payments[payment.work_object_id] = []
-            object_payments[payment.work_object_id].append(payment)
-        
-        # Generate object reports
-        object_reports = []
-        total_hours = 0
-        total_payments = 0
-        
+
+        by_object = {row.work_object_id: row for row in totals}
+        empty = PeriodTotals(None, 0, 0, 0)
+        report_lines = []
         for obj in objects:
-            entries = object_entries.get(obj.id, [])
-            obj_payments = object_payments.get(obj.id, [])
-            
-            object_report = ReportingService.generate_object_report(obj, entries, obj_payments)
-            object_reports.append(object_report)
-            
-            total_hours += sum(entry.hours for entry in entries)
-            total_payments += sum(payment.amount for payment in obj_payments)
-        
-        # Calculate overall statistics
-        all_work_dates = set()
-        for entries in object_entries.values():
-            all_work_dates.update(entry.date.date() for entry in entries)
-        
-        work_days = len(all_work_dates)
-        total_days = (end_date.date() - start_date.date()).days + 1
-        
-        # Calculate average hourly rate
-        avg_rate_str = format_rate(total_payments, total_hours) if total_hours > 0 else "0 р./час"
-        
-        # Build report
-        report_lines = object_reports
+            row = by_object.get(obj.id, empty)
+            report_lines.append(
+                ReportingService.generate_object_report(obj, row.minutes, row.amount, row.work_days)
+            )
+
+        # Row without an object sums them all; its work days are distinct across objects
+        overall = by_object.get(None, empty)
+        total_days = local_day(end_date) - local_day(start_date) + 1
+
         report_lines.append("")  # Empty line
-        report_lines.append(f"Итого: {format_currency(total_payments)} ({avg_rate_str})")
-        report_lines.append(f"{format_work_days(work_days)} рабочих дней из {total_days} дней в {format_month_year(start_date)}")
-        
+        report_lines.append(
+            f"Итого: {format_currency(overall.amount)} ({format_rate(overall.amount, overall.minutes)})"
+        )
+        report_lines.append(
+            f"{overall.work_days} {plural(overall.work_days, WORK_DAY_FORMS)} из {format_work_days(total_days)} "
+            f"в {format_month_year(start_date)}"
+        )
+
         return "\n".join(report_lines)
 
     @staticmethod
-    def get_last_month_period() -> Tuple[datetime, datetime]:
-        """Get start and end dates for last month"""
-        today = datetime.now()
+    def generate_monthly_report(months: List[MonthTotals], year_to_date: bool = False) -> str:
+        """Generate month-by-month report with changes against the previous month"""
+        if not any(month.minutes or month.amount for month in months):
+            return "📊 За указанный период нет данных."
+
+        report_lines = []
+        for month in months:
+            rate_change = (
+                hourly_rate(month.amount, month.minutes)
+                - hourly_rate(month.prev_amount, month.prev_minutes)
+            )
+            report_lines.append(f"<b>{format_month_name(month.month)}</b>")
+            report_lines.append(
+                f"{format_minutes(month.minutes)} · {format_work_days(month.work_days)} · "
+                f"{format_currency(month.amount)} ({format_rate(month.amount, month.minutes)})"
+            )
+            report_lines.append(
+                f"К прошлому месяцу: {format_minutes_delta(month.minutes - month.prev_minutes)}, "
+                f"{format_currency_delta(month.amount - month.prev_amount)}, "
+                f"{format_rate_delta(rate_change)}"
+            )
+            report_lines.append("")
+
+        if year_to_date:
+            # Running sums of the last month cover the whole year so far
+            last = months[-1]
+            report_lines.append(
+                f"Итого с начала года: {format_minutes(last.ytd_minutes)} — "
+                f"{format_currency(last.ytd_amount)} ({format_rate(last.ytd_amount, last.ytd_minutes)})"
+            )
+
+        return "\n".join(report_lines).rstrip()
+
+    @staticmethod
+    def get_year_to_date_period(timezone_name: str = "Europe/Moscow") -> Tuple[datetime, datetime]:
+        """Get start and end dates from January 1st to today in the given timezone"""
+        today = _local_today(timezone_name)
+        return today.replace(month=1, day=1), today
+
+    @staticmethod
+    def get_recent_months_period(count: int = 6, timezone_name: str = "Europe/Moscow") -> Tuple[datetime, datetime]:
+        """Get start and end dates of the last `count` months including the current one"""
+        today = _local_today(timezone_name)
+        index = today.year * 12 + today.month - count
+        return datetime(index // 12, index % 12 + 1, 1), today
+
+    @staticmethod
+    def get_last_month_period(timezone_name: str = "Europe/Moscow") -> Tuple[datetime, datetime]:
+        """Get start and end dates for last month in the given timezone"""
+        today = _local_today(timezone_name)
         
         # Get first day of current month
         first_day_current = today.replace(day=1)
@@ -2,10 +2,14 @@ from app.utils.dateparse import parse_russian_date, format_russian_date, get_tod
 from app.utils.formatting import (
     format_currency,
     format_hours,
+    format_minutes,
     format_work_days,
     format_rate,
     format_date_range,
     format_month_year,
+    format_month_name,
+    format_short_date,
+    plural,
 )
 
 __all__ = [
@@ -14,9 +18,13 @@ __all__ = [
     "get_today_in_timezone",
     "format_currency",
     "format_hours",
+    "format_minutes",
     "format_work_days",
     "format_rate",
     "format_date_range",
     "format_month_year",
+    "format_month_name",
+    "format_short_date",
+    "plural",
 ]
 
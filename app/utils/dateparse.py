@@ -1,10 +1,46 @@
 from __future__ import annotations
 
-from datetime import datetime, timezone
+from datetime import date as date_type, datetime, timezone
+from functools import lru_cache
 import re
 from typing import Optional
 
-import pytz # type: ignore
+
+@lru_cache(maxsize=None)
+def _get_timezone(timezone_name: str):
+    # pytz is imported on first date operation, not at bot startup
+    import pytz  # type: ignore
+    return pytz.timezone(timezone_name)
+
+
+def is_valid_timezone(timezone_name: str) -> bool:
+    """
+    True for IANA timezone names such as 'Europe/Moscow'
+    """
+    import pytz  # type: ignore
+    return timezone_name in pytz.all_timezones_set
+
+
+# Day numbers count calendar days since 1970-01-01
+_EPOCH_ORDINAL = date_type(1970, 1, 1).toordinal()
+
+
+def local_day(value: datetime | date_type) -> int:
+    """
+    Number of the calendar day a time entry or payment belongs to.
+    Stored dates are local wall time (SQLite keeps no offset): parsers localize
+    input in the user's timezone, so the wall date is the user's day.
+    """
+    if isinstance(value, datetime):
+        value = value.date()
+    return value.toordinal() - _EPOCH_ORDINAL
+
+
+def day_to_date(day: int) -> date_type:
+    """
+    Calendar date of a day number produced by local_day
+    """
+    return date_type.fromordinal(day + _EPOCH_ORDINAL)
 
 
 def parse_russian_date(
@@ -17,15 +53,14 @@ def parse_russian_date(
     try:
         # Try DD.MM.YY format first
         if len(date_str.split(".")[-1]) == 2:
+            # %y already maps 2-digit years to 19xx/20xx
             dt = datetime.strptime(date_str, "%d.%m.%y")
-            # Assume 20xx for 2-digit years
-            dt = dt.replace(year=dt.year + 2000)
         else:
             # DD.MM.YYYY format
             dt = datetime.strptime(date_str, "%d.%m.%Y")
 
         # Set time to midnight in the specified timezone
-        tz = pytz.timezone(timezone_name)
+        tz = _get_timezone(timezone_name)
         dt = tz.localize(dt)
 
         return dt
@@ -37,9 +72,9 @@ def format_russian_date(dt: datetime, timezone_name: str = "Europe/Moscow") -> s
     """
     Format datetime to DD.MM.YY string in specified timezone
     """
-    tz = pytz.timezone(timezone_name)
+    tz = _get_timezone(timezone_name)
     if dt.tzinfo is None:
-        dt = pytz.utc.localize(dt)
+        dt = dt.replace(tzinfo=timezone.utc)
 
     local_dt = dt.astimezone(tz)
     return local_dt.strftime("%d.%m.%y")
@@ -49,7 +84,7 @@ def get_today_in_timezone(timezone_name: str = "Europe/Moscow") -> datetime:
     """
     Get today's date at midnight in specified timezone
     """
-    tz = pytz.timezone(timezone_name)
+    tz = _get_timezone(timezone_name)
     now = datetime.now(tz)
     return now.replace(hour=0, minute=0, second=0, microsecond=0)
 
@@ -87,7 +122,7 @@ def parse_time(
         if not (0 <= hour <= 23 and 0 <= minute <= 59):
             return None
 
-        tz = pytz.timezone(timezone_name)
+        tz = _get_timezone(timezone_name)
         return tz.localize(
             datetime.combine(
                 date.date(), datetime.min.time().replace(hour=hour, minute=minute)
@@ -118,25 +153,20 @@ def parse_date(user_input: str | None) -> Optional[datetime]:
     return None
 
 
-def calculate_hours(start_time: datetime, end_time: datetime) -> float:
+def calculate_minutes(start_time: datetime, end_time: datetime) -> int:
     """
-    Calculate hours between start and end time
+    Calculate whole minutes between start and end time
     """
     if start_time >= end_time:
-        return 0.0
+        return 0
 
     delta = end_time - start_time
-    return round(delta.total_seconds() / 3600, 2)  # Round to 2 decimal places
+    return int(delta.total_seconds()) // 60
 
 
-def hours_to_str(hours: float) -> str:
+def calculate_hours(start_time: datetime, end_time: datetime) -> float:
     """
-    Преобразует часы в формате float (например, 7.75)
-    в строку формата HH:MM (например, '7:45')
+    Calculate hours between start and end time
+    (deprecated: use calculate_minutes, hours are kept only for the old column)
     """
-    h = int(hours)
-    m = int(round((hours - h) * 60))
-    if m == 60:  # защита от округления 59.999 → 60
-        h += 1
-        m = 0
-    return f"{h}:{m:02d}"
+    return round(calculate_minutes(start_time, end_time) / 60, 2)
@@ -1,11 +1,37 @@
 from __future__ import annotations
 
-from datetime import datetime
-from typing import Any
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Any, Tuple
 
 from app.utils.dateparse import format_russian_date
 
+# Word forms for 1, 2 and 5 of a thing, e.g. ("час", "часа", "часов")
+PluralForms = Tuple[str, str, str]
 
+HOUR_FORMS: PluralForms = ("час", "часа", "часов")
+DAY_FORMS: PluralForms = ("день", "дня", "дней")
+WORK_DAY_FORMS: PluralForms = ("рабочий день", "рабочих дня", "рабочих дней")
+
+# Index into PluralForms by n % 100: 1, 21, 101 -> 0; 2-4, 22-24 -> 1; 0, 5-20, 111 -> 2
+_PLURAL_INDEX = tuple(
+    2 if 11 <= n <= 14 else 0 if n % 10 == 1 else 1 if 2 <= n % 10 <= 4 else 2
+    for n in range(100)
+)
+
+# Formatters below are called per line of cards, keyboards and reports
+# with a small set of distinct values, so their results are memoized
+FORMAT_CACHE_SIZE = 4096
+
+
+def plural(n: int, forms: PluralForms) -> str:
+    """
+    Russian word form for the number n, e.g. plural(22, HOUR_FORMS) -> 'часа'
+    """
+    return forms[_PLURAL_INDEX[abs(n) % 100]]
+
+
+@lru_cache(maxsize=FORMAT_CACHE_SIZE)
 def format_currency(amount_kopecks: int) -> str:
     """
     Format amount in kopecks to rubles string
@@ -19,65 +45,96 @@ def format_currency(amount_kopecks: int) -> str:
         return f"{rubles:,}.{kopecks:02d} р.".replace(",", " ")
 
 
+def minutes_to_str(minutes: int) -> str:
+    """
+    Преобразует минуты (например, 465) в строку формата HH:MM (например, '7:45')
+    """
+    h, m = divmod(minutes, 60)
+    return f"{h}:{m:02d}"
+
+
 def hours_to_str(hours: float) -> str:
     """
     Преобразует часы в формате float (например, 7.75)
     в строку формата HH:MM (например, '7:45')
     """
-    h = int(hours)
-    m = int(round((hours - h) * 60))
-    if m == 60:  # защита от округления
-        h += 1
-        m = 0
-    return f"{h}:{m:02d}"
+    return minutes_to_str(round(hours * 60))
 
 
-def format_hours(hours: float) -> str:
+@lru_cache(maxsize=FORMAT_CACHE_SIZE)
+def format_minutes(minutes: int) -> str:
     """
-    Форматирует часы с правильными русскими окончаниями
-    и добавляет человекочитаемый формат HH:MM
+    Форматирует длительность в минутах с правильными русскими окончаниями
+    (по целым часам) и добавляет человекочитаемый формат HH:MM
     """
-    time_str = hours_to_str(hours)
+    return f"{minutes_to_str(minutes)} {plural(minutes // 60, HOUR_FORMS)}"
 
-    # Правильные окончания для целых часов
-    h = int(hours)
-    if h == 1:
-        word = "час"
-    elif 2 <= h <= 4:
-        word = "часа"
-    else:
-        word = "часов"
 
-    return f"{time_str} {word}"
+def format_hours(hours: float) -> str:
+    """
+    Форматирует часы (float) — обёртка над format_minutes для старого столбца hours
+    """
+    return format_minutes(round(hours * 60))
 
 
+@lru_cache(maxsize=FORMAT_CACHE_SIZE)
 def format_work_days(days: int) -> str:
     """
     Format work days with proper Russian word forms
     """
-    if days == 1:
-        return "1 день"
-    elif 2 <= days <= 4:
-        return f"{days} дня"
-    else:
-        return f"{days} дней"
+    return f"{days} {plural(days, DAY_FORMS)}"
 
 
-def format_rate(amount_kopecks: int, hours: int) -> str:
+@lru_cache(maxsize=FORMAT_CACHE_SIZE)
+def format_short_date(dt: date) -> str:
     """
-    Calculate and format hourly rate
+    Short date for list lines and buttons, e.g. '05.06.24'
     """
-    if hours == 0:
-        return "0 р./час"
+    return dt.strftime("%d.%m.%y")
+
 
-    # Convert kopecks to rubles first, then divide
-    amount_rubles = amount_kopecks / 100
-    rate_rubles = amount_rubles / hours
+def format_rate(amount_kopecks: int, minutes: int) -> str:
+    """
+    Calculate and format hourly rate using exact integer arithmetic
+    """
+    return f"{hourly_rate(amount_kopecks, minutes):,} р./час".replace(",", " ")
 
-    # Round to nearest ruble
-    rate_rubles_rounded = round(rate_rubles)
 
-    return f"{rate_rubles_rounded:,} р./час".replace(",", " ")
+def hourly_rate(amount_kopecks: int, minutes: int) -> int:
+    """
+    Hourly rate in whole rubles (0 when no time was logged)
+    """
+    if minutes <= 0:
+        return 0
+
+    # rubles per hour = kopecks * 60 / (minutes * 100), rounded half up to a ruble
+    divisor = minutes * 100
+    return (amount_kopecks * 60 * 2 + divisor) // (divisor * 2)
+
+
+def _sign(value: int) -> str:
+    return "+" if value >= 0 else "−"
+
+
+def format_minutes_delta(minutes: int) -> str:
+    """
+    Signed difference in time, e.g. '+1:30 ч' or '−0:45 ч'
+    """
+    return f"{_sign(minutes)}{minutes_to_str(abs(minutes))} ч"
+
+
+def format_currency_delta(amount_kopecks: int) -> str:
+    """
+    Signed difference in money, e.g. '+1 500 р.' or '−300 р.'
+    """
+    return f"{_sign(amount_kopecks)}{format_currency(abs(amount_kopecks))}"
+
+
+def format_rate_delta(rubles_per_hour: int) -> str:
+    """
+    Signed difference in hourly rate, e.g. '+50 р./час'
+    """
+    return f"{_sign(rubles_per_hour)}{abs(rubles_per_hour):,} р./час".replace(",", " ")
 
 
 def format_date_range(start_date: datetime, end_date: datetime) -> str:
@@ -93,26 +150,47 @@ def format_date_range(start_date: datetime, end_date: datetime) -> str:
         return f"{start_str} - {end_str}"
 
 
+MONTH_NAMES = (
+    "январь",
+    "февраль",
+    "март",
+    "апрель",
+    "май",
+    "июнь",
+    "июль",
+    "август",
+    "сентябрь",
+    "октябрь",
+    "ноябрь",
+    "декабрь",
+)
+
+
+def format_month_name(dt: date) -> str:
+    """
+    Month and year in nominative case, e.g. 'Июнь 2024'
+    """
+    return f"{MONTH_NAMES[dt.month - 1].capitalize()} {dt.year}"
+
+
+MONTH_NAMES_PREPOSITIONAL = (
+    "январе",
+    "феврале",
+    "марте",
+    "апреле",
+    "мае",
+    "июне",
+    "июле",
+    "августе",
+    "сентябре",
+    "октябре",
+    "ноябре",
+    "декабре",
+)
+
+
 def format_month_year(dt: datetime) -> str:
     """
-    Format month and year in Russian
-    """
-    months = {
-        1: "январе",
-        2: "феврале",
-        3: "марте",
-        4: "апреле",
-        5: "мае",
-        6: "июне",
-        7: "июле",
-        8: "августе",
-        9: "сентябре",
-        10: "октябре",
-        11: "ноябре",
-        12: "декабре",
-    }
-
-    month_name = months[dt.month]
-    year = dt.year
-
-    return f"{month_name} {year}"
+    Format month and year in Russian, e.g. 'июне 2024'
+    """
+    return f"{MONTH_NAMES_PREPOSITIONAL[dt.month - 1]} {dt.year}"
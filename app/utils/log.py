@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import logging
+import queue
+from collections import defaultdict
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Iterable, Optional, Tuple
+
+# Attributes every LogRecord has; anything else was passed through `extra`
+_RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+
+class KeyValueFormatter(logging.Formatter):
+    """Appends fields passed via `extra` as key=value pairs after the message"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        fields = [
+            f"{key}={value}"
+            for key, value in record.__dict__.items()
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_")
+        ]
+        return f"{line} {' '.join(fields)}" if fields else line
+
+
+class DebugSamplingFilter(logging.Filter):
+    """Keeps every `every`-th DEBUG record per call site; other levels always pass"""
+
+    def __init__(self, every: int = 1):
+        super().__init__()
+        self.every = max(1, every)
+        self._seen: Dict[Tuple[str, int], int] = defaultdict(int)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.every == 1 or record.levelno > logging.DEBUG:
+            return True
+        site = (record.pathname, record.lineno)
+        self._seen[site] += 1
+        return self._seen[site] % self.every == 1
+
+
+def setup_logging(
+    level: str = "INFO",
+    module_levels: Iterable[Tuple[str, str]] = (),
+    debug_sample_every: int = 1,
+    handler: Optional[logging.Handler] = None,
+) -> QueueListener:
+    """
+    Route all logging through a queue: the event loop only enqueues records,
+    a listener thread formats and writes them. Returns the started listener;
+    stop it on shutdown to flush what is left.
+    """
+    if handler is None:
+        handler = logging.StreamHandler()
+    handler.setFormatter(KeyValueFormatter(LOG_FORMAT))
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = QueueHandler(log_queue)
+    # Dropped before anything is formatted or enqueued
+    queue_handler.addFilter(DebugSamplingFilter(debug_sample_every))
+
+    root = logging.getLogger()
+    for existing in root.handlers[:]:
+        root.removeHandler(existing)
+    root.addHandler(queue_handler)
+    root.setLevel(level.upper())
+    for name, module_level in module_levels:
+        logging.getLogger(name).setLevel(module_level.upper())
+
+    listener = QueueListener(log_queue, handler, respect_handler_level=True)
+    listener.start()
+    return listener
+
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import importlib
+import time
+from contextlib import contextmanager
+from types import ModuleType
+from typing import Iterator, List, Optional, Tuple
+
+
+class StartupProfiler:
+    """Wall-clock timing of startup phases, module imports and the first processed update"""
+
+    def __init__(self, started_at: float):
+        # time.perf_counter() taken as early as possible in the entry point
+        self.started_at = started_at
+        self.phases: List[Tuple[str, float]] = []
+        self.imports: List[Tuple[str, float]] = []
+        self.ready_at: Optional[float] = None
+        self.first_update_at: Optional[float] = None
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - start))
+
+    def import_module(self, name: str) -> ModuleType:
+        """Import a module, recording what it added on top of already loaded ones"""
+        start = time.perf_counter()
+        module = importlib.import_module(name)
+        self.imports.append((name, time.perf_counter() - start))
+        return module
+
+    def mark_ready(self) -> float:
+        self.ready_at = time.perf_counter()
+        return self.ready_at - self.started_at
+
+    def mark_first_update(self) -> Optional[float]:
+        """Seconds from start to the first processed update; None after the first call"""
+        if self.first_update_at is not None:
+            return None
+        self.first_update_at = time.perf_counter()
+        return self.first_update_at - self.started_at
+
+    def first_update_line(self) -> Optional[str]:
+        if self.first_update_at is None:
+            return None
+        return f"First update processed after {(self.first_update_at - self.started_at) * 1000:.1f} ms"
+
+    def report(self) -> str:
+        lines = ["Startup phases:"]
+        lines.extend(f"  {name:<32} {seconds * 1000:8.1f} ms" for name, seconds in self.phases)
+        if self.imports:
+            lines.append("Imports (incremental, in load order):")
+            lines.extend(f"  {name:<32} {seconds * 1000:8.1f} ms" for name, seconds in self.imports)
+        if self.ready_at is not None:
+            lines.append(f"Ready to poll after {(self.ready_at - self.started_at) * 1000:.1f} ms")
+        if self.first_update_at is not None:
+            lines.append(self.first_update_line())
+        lines.append("For a full tree run: python -X importtime main.py")
+        return "\n".join(lines)
@@ -0,0 +1,136 @@
+"""
+Микробенчмарк форматирования: карточка объекта, клавиатура истории и отчёт
+на 10 000 строк — сборка через += и builder без кэша против списков,
+"\\n".join и кэшированных форматтеров.
+
+    python -m benchmarks.bench_formatting
+"""
+from __future__ import annotations
+
+import random
+import timeit
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from aiogram.types import InlineKeyboardButton
+from aiogram.utils.keyboard import InlineKeyboardBuilder
+
+from app.keyboards.objects import get_object_history_keyboard
+from app.models.work_object import ObjectStatus
+from app.services.reporting import ReportingService
+from app.utils.formatting import format_currency, format_minutes
+
+LINES = 10_000
+NUMBER = 5
+# The builder re-checks the whole markup on every add(): the old keyboard is
+# quadratic and takes minutes at 10 000 buttons, so it is measured at 1 000
+KEYBOARD_LINES = 1_000
+
+# Formatters as they were before memoization
+_format_minutes = format_minutes.__wrapped__
+_format_currency = format_currency.__wrapped__
+
+
+def _legacy_card(work_object, time_entries, payments, total_minutes, total_payments) -> str:
+    info_text = (
+        f"🏗️ <b>{work_object.name}</b>\n"
+        f"Статус: 🔵 Активен\n"
+        f"Всего часов: {_format_minutes(total_minutes)}\n"
+        f"Всего оплат: {_format_currency(total_payments)}\n"
+        f"Дата создания: {work_object.created_at.strftime('%d.%m.%y')}"
+    )
+    if time_entries:
+        first_date = min(entry.date for entry in time_entries).strftime("%d.%m.%y")
+        info_text += f"\nНачало работ: {first_date}"
+        info_text += "\n\n🕒 <b>Записи работ:</b>"
+        for entry in sorted(time_entries, key=lambda x: x.date):
+            info_text += f"\n• {entry.date.strftime('%d.%m.%y')} — {_format_minutes(entry.duration_minutes)}"
+    if payments:
+        info_text += "\n\n💰 <b>Записи оплат:</b>"
+        for payment in sorted(payments, key=lambda x: x.date):
+            info_text += f"\n• {payment.date.strftime('%d.%m.%y')} — {_format_currency(payment.amount)}"
+    return info_text
+
+
+def _legacy_history_keyboard(work_object, time_entries, payments):
+    builder = InlineKeyboardBuilder()
+    for entry in time_entries:
+        button_text = f"⏰ {entry.date.strftime('%d.%m.%y')} - {_format_minutes(entry.duration_minutes)}"
+        builder.add(InlineKeyboardButton(text=button_text, callback_data=f"edit_time_{entry.id}"))
+    for payment in payments:
+        button_text = f"💰 {payment.date.strftime('%d.%m.%y')} - {_format_currency(payment.amount)}"
+        builder.add(InlineKeyboardButton(text=button_text, callback_data=f"edit_payment_{payment.id}"))
+    builder.add(InlineKeyboardButton(text="⬅️ К объекту", callback_data=f"object_{work_object.id}"))
+    builder.adjust(1)
+    return builder.as_markup()
+
+
+def _legacy_report(objects, totals) -> str:
+    report = ""
+    for obj in objects:
+        minutes, amount = totals[obj.id]
+        report += f"{obj.name} — {_format_minutes(minutes)} — {_format_currency(amount)}\n"
+    return report
+
+
+def _per_call_ms(func, number: int = NUMBER) -> float:
+    return timeit.timeit(func, number=number) / number * 1e3
+
+
+def _report(name: str, before: float, after: float) -> None:
+    print(f"{name:<28} {before:9.2f} ms -> {after:7.2f} ms  (x{before / after:,.1f})")
+
+
+def main() -> None:
+    rng = random.Random(1)
+    start = datetime(2024, 1, 1, 9)
+    # Realistic values: quarter-hour durations, whole-ruble payments, a year of days
+    entries = [
+        SimpleNamespace(
+            id=i,
+            date=start + timedelta(days=rng.randrange(365)),
+            duration_minutes=rng.randrange(1, 49) * 15,
+            comment=None,
+        )
+        for i in range(LINES // 2)
+    ]
+    payments = [
+        SimpleNamespace(id=i, date=start + timedelta(days=rng.randrange(365)), amount=rng.randrange(1, 500) * 10000)
+        for i in range(LINES // 2)
+    ]
+    work_object = SimpleNamespace(id=1, name="Дом", status=ObjectStatus.ACTIVE, created_at=start)
+    total_minutes = sum(entry.duration_minutes for entry in entries)
+    total_payments = sum(payment.amount for payment in payments)
+
+    _report(
+        f"object card ({LINES} lines)",
+        _per_call_ms(lambda: _legacy_card(work_object, entries, payments, total_minutes, total_payments)),
+        _per_call_ms(lambda: ReportingService.generate_object_card(
+            work_object, entries, payments, total_minutes, total_payments
+        )),
+    )
+    half = KEYBOARD_LINES // 2
+    _report(
+        f"history keyboard ({KEYBOARD_LINES})",
+        _per_call_ms(lambda: _legacy_history_keyboard(work_object, entries[:half], payments[:half]), 1),
+        _per_call_ms(lambda: get_object_history_keyboard(work_object, entries[:half], payments[:half])),
+    )
+    print(
+        f"history keyboard ({LINES})    "
+        f"{_per_call_ms(lambda: get_object_history_keyboard(work_object, entries, payments)):9.2f} ms (new only)"
+    )
+
+    objects = [SimpleNamespace(id=i, name=f"Объект {i}") for i in range(LINES)]
+    totals = {obj.id: (rng.randrange(1, 400) * 15, rng.randrange(1, 500) * 10000) for obj in objects}
+    _report(
+        f"report ({LINES} objects)",
+        _per_call_ms(lambda: _legacy_report(objects, totals)),
+        _per_call_ms(lambda: "\n".join(
+            f"{obj.name} — {format_minutes(totals[obj.id][0])} — {format_currency(totals[obj.id][1])}"
+            for obj in objects
+        )),
+    )
+
+
+if __name__ == "__main__":
+    main()
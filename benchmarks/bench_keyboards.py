@@ -0,0 +1,55 @@
+"""
+Микробенчмарк клавиатур: построение через builder на каждый вызов
+против готовых разметок и кэша клавиатуры объектов.
+
+    python -m benchmarks.bench_keyboards
+"""
+from __future__ import annotations
+
+import timeit
+from types import SimpleNamespace
+
+from app.keyboards.cache import ObjectKeyboardCache
+from app.keyboards.common import (
+    _build_cancel_keyboard,
+    _build_date_selection_keyboard,
+    _build_main_keyboard,
+    get_cancel_keyboard,
+    get_date_selection_keyboard,
+    get_main_keyboard,
+    get_object_selection_keyboard,
+)
+
+NUMBER = 20_000
+
+
+def _per_call_us(func, number: int = NUMBER) -> float:
+    return timeit.timeit(func, number=number) / number * 1e6
+
+
+def _report(name: str, before: float, after: float) -> None:
+    print(f"{name:<28} {before:9.2f} us -> {after:7.3f} us  (x{before / after:,.0f})")
+
+
+def main() -> None:
+    _report("main keyboard", _per_call_us(_build_main_keyboard), _per_call_us(get_main_keyboard))
+    _report("cancel keyboard", _per_call_us(_build_cancel_keyboard), _per_call_us(get_cancel_keyboard))
+    _report(
+        "date selection keyboard",
+        _per_call_us(_build_date_selection_keyboard),
+        _per_call_us(get_date_selection_keyboard),
+    )
+
+    objects = [SimpleNamespace(id=i, name=f"Объект {i}") for i in range(20)]
+    cache = ObjectKeyboardCache()
+    cache.set(1, get_object_selection_keyboard(objects))
+    _report(
+        "object keyboard (20 objects)",
+        _per_call_us(lambda: get_object_selection_keyboard(objects), NUMBER // 10),
+        _per_call_us(lambda: cache.get(1)),
+    )
+    print("(object keyboard: cache hit also skips the active-objects SELECT)")
+
+
+if __name__ == "__main__":
+    main()
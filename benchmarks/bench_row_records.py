@@ -0,0 +1,108 @@
+"""
+Чтение 10 000 записей для карточки объекта: ORM-сущности TimeEntry/Payment
+(identity map, отслеживание изменений, все столбцы) против Core-запроса
+нужных столбцов в именованные кортежи EntryRow/PaymentRow.
+Время — на загрузку плюс сборку карточки, память — удерживаемая результатом
+(для ORM вместе с identity map сессии).
+
+    python -m benchmarks.bench_row_records
+"""
+from __future__ import annotations
+
+import asyncio
+import gc
+import random
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.db.session import Base
+from app.models import Payment, TimeEntry
+from app.repositories.object_repo import WorkObjectRepository
+from app.repositories.payment_repo import PaymentRepository
+from app.repositories.time_repo import TimeEntryRepository
+from app.repositories.user_repo import UserRepository
+from app.services.reporting import ReportingService
+from app.utils.dateparse import local_day
+
+ROWS = 10_000
+NUMBER = 5
+
+
+async def _load_orm(session: AsyncSession, object_id: int):
+    entries = await TimeEntryRepository(session).get_by_object_id(object_id)
+    payments = await PaymentRepository(session).get_by_object_id(object_id)
+    return entries, payments
+
+
+async def _load_rows(session: AsyncSession, object_id: int):
+    entries = await TimeEntryRepository(session).get_rows(object_id)
+    payments = await PaymentRepository(session).get_rows(object_id)
+    return entries, payments
+
+
+async def _measure(sessionmaker, load, work_object) -> tuple:
+    """(ms per load + card, KiB held by the loaded result)"""
+    elapsed = 0.0
+    for _ in range(NUMBER):
+        async with sessionmaker() as session:
+            start = time.perf_counter()
+            entries, payments = await load(session, work_object.id)
+            ReportingService.generate_object_card(
+                work_object, entries, payments,
+                sum(entry.duration_minutes for entry in entries), sum(payment.amount for payment in payments),
+            )
+            elapsed += time.perf_counter() - start
+
+    async with sessionmaker() as session:
+        gc.collect()
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        result = await load(session, work_object.id)
+        held = tracemalloc.get_traced_memory()[0] - before
+        tracemalloc.stop()
+        del result
+    return elapsed / NUMBER * 1e3, held / 1024
+
+
+async def main() -> None:
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    sessionmaker = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+
+    rng = random.Random(1)
+    start = datetime(2024, 1, 1, 9)
+    async with sessionmaker() as session:
+        user = await UserRepository(session).create_user(telegram_id=42)
+        work_object = await WorkObjectRepository(session).create_object(user.id, "Дом")
+        entries, payments = [], []
+        for i in range(ROWS // 2):
+            day = start + timedelta(days=rng.randrange(365))
+            minutes = rng.randrange(1, 49) * 15
+            entries.append({
+                "work_object_id": work_object.id, "user_id": user.id, "start_time": day,
+                "end_time": day + timedelta(minutes=minutes), "minutes": minutes, "hours": round(minutes / 60, 2),
+                "date": day.replace(hour=0), "local_day": local_day(day), "comment": f"запись {i}" if i % 3 else None,
+            })
+            payments.append({
+                "work_object_id": work_object.id, "amount": rng.randrange(1, 500) * 10000,
+                "date": day.replace(hour=0), "local_day": local_day(day),
+            })
+        await session.execute(insert(TimeEntry), entries)
+        await session.execute(insert(Payment), payments)
+        await session.commit()
+
+    orm_ms, orm_kib = await _measure(sessionmaker, _load_orm, work_object)
+    rows_ms, rows_kib = await _measure(sessionmaker, _load_rows, work_object)
+    await engine.dispose()
+
+    print(f"{'object card (' + str(ROWS) + ' rows)':<28} {orm_ms:8.1f} ms -> {rows_ms:8.1f} ms  (x{orm_ms / rows_ms:.1f})")
+    print(f"{'memory held':<28} {orm_kib:8.0f} KiB -> {rows_kib:7.0f} KiB  (x{orm_kib / rows_kib:.1f})")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,96 @@
+"""
+Поиск по 100k комментариям: время одного запроса SearchRepository.search.
+
+    python -m benchmarks.bench_search
+"""
+from __future__ import annotations
+
+import asyncio
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.db.migrations import run_migrations
+from app.repositories.search_repo import SearchRepository
+
+USERS = 50
+OBJECTS_PER_USER = 20
+ENTRIES = 100_000
+QUERIES = ("монтаж", "покр", "труб стен", "дача", "плитка")
+
+WORDS = (
+    "монтаж покраска стен укладка плитки труб демонтаж штукатурка шпаклёвка электрика "
+    "сантехника кровля окна двери пол ламинат потолок дача квартира офис гараж баня"
+).split()
+
+
+async def fill(engine) -> None:
+    rnd = random.Random(42)
+    async with engine.begin() as conn:
+        await conn.execute(
+            text(
+                "INSERT INTO users (id, telegram_id, created_at, updated_at) "
+                "VALUES (:id, :id, '2025-01-01', '2025-01-01')"
+            ),
+            [{"id": user_id} for user_id in range(1, USERS + 1)],
+        )
+        await conn.execute(
+            text(
+                "INSERT INTO work_objects (id, user_id, name, name_key, status, is_deleted, created_at, updated_at) "
+                "VALUES (:id, :user_id, :name, :name_key, 'active', 0, '2025-01-01', '2025-01-01')"
+            ),
+            [
+                {
+                    "id": object_id,
+                    "user_id": (object_id - 1) // OBJECTS_PER_USER + 1,
+                    "name": f"{rnd.choice(WORDS).capitalize()} {object_id}",
+                    "name_key": f"object {object_id}",
+                }
+                for object_id in range(1, USERS * OBJECTS_PER_USER + 1)
+            ],
+        )
+        await conn.execute(
+            text(
+                "INSERT INTO time_entries (work_object_id, start_time, end_time, hours, minutes, date, comment, created_at, updated_at) "
+                "VALUES (:object_id, '2025-01-01 09:00:00', '2025-01-01 17:00:00', 8, 480, '2025-01-01', :comment, '2025-01-01', '2025-01-01')"
+            ),
+            [
+                {
+                    "object_id": rnd.randint(1, USERS * OBJECTS_PER_USER),
+                    "comment": " ".join(rnd.sample(WORDS, 4)),
+                }
+                for _ in range(ENTRIES)
+            ],
+        )
+
+
+async def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{Path(tmp) / 'bench.db'}")
+        await run_migrations(engine)
+
+        started = time.perf_counter()
+        await fill(engine)
+        print(f"filled {ENTRIES:,} entries in {time.perf_counter() - started:.1f}s")
+
+        sessionmaker = async_sessionmaker(engine, class_=AsyncSession)
+        async with sessionmaker() as session:
+            repo = SearchRepository(session)
+            for query in QUERIES:
+                await repo.search(1, query)  # warm up
+                runs = 50
+                started = time.perf_counter()
+                for _ in range(runs):
+                    hits = await repo.search(1, query)
+                elapsed_ms = (time.perf_counter() - started) / runs * 1000
+                print(f"{query!r:<14} {len(hits):3d} hits  {elapsed_ms:6.2f} ms/query")
+
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,102 @@
+"""
+Накладные расходы на построение и компиляцию запросов: свежий select()
+на каждый вызов против lambda_stmt из репозиториев (кэш скомпилированных
+выражений). База в памяти и крошечные таблицы, так что разница — это
+почти целиком работа SQLAlchemy, а не SQLite.
+
+    python -m benchmarks.bench_statements
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+import timeit
+
+from sqlalchemy import and_, lambda_stmt, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.db.session import Base
+from app.models import User, WorkObject
+from app.repositories.object_repo import WorkObjectRepository
+from app.repositories.user_repo import UserRepository
+
+NUMBER = 3_000
+
+
+async def _per_call_us(func, number: int = NUMBER) -> float:
+    for _ in range(50):  # warm up caches
+        await func()
+    start = time.perf_counter()
+    for _ in range(number):
+        await func()
+    return (time.perf_counter() - start) / number * 1e6
+
+
+def _build_us(func, number: int = NUMBER * 10) -> float:
+    return timeit.timeit(func, number=number) / number * 1e6
+
+
+def _report(name: str, before: float, after: float) -> None:
+    print(f"{name:<28} {before:8.1f} us -> {after:8.1f} us  ({(after / before - 1) * 100:+.0f}%)")
+
+
+async def main() -> None:
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    async with async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)() as session:
+        user = await UserRepository(session).create_user(telegram_id=42)
+        objects = WorkObjectRepository(session)
+        for i in range(20):
+            await objects.create_object(user.id, f"Объект {i}")
+        await session.commit()
+        first_page = await objects.get_page(user.id)
+
+        async def user_select():
+            result = await session.execute(select(User).where(User.telegram_id == 42))
+            return result.scalar_one_or_none()
+
+        async def page_select():
+            after_activity, after_id = first_page.next_cursor
+            query = (
+                select(WorkObject)
+                .where(WorkObject.user_id == user.id, WorkObject.is_deleted == False)
+                .where(
+                    or_(
+                        WorkObject.last_activity_at < after_activity,
+                        and_(WorkObject.last_activity_at == after_activity, WorkObject.id < after_id),
+                    )
+                )
+                .order_by(WorkObject.last_activity_at.desc(), WorkObject.id.desc())
+                .limit(9)
+            )
+            return (await session.execute(query)).scalars().all()
+
+        _report(
+            "user by telegram_id",
+            await _per_call_us(user_select),
+            await _per_call_us(lambda: UserRepository(session).get_by_telegram_id(42)),
+        )
+        _report(
+            "object page (keyset)",
+            await _per_call_us(page_select),
+            await _per_call_us(lambda: objects.get_page(user.id, after=first_page.next_cursor)),
+        )
+
+    await engine.dispose()
+
+    # Python-side cost only: build the statement and compute its cache key,
+    # which is what every execute() pays before the compiled cache lookup
+    def build_select():
+        return select(User).where(User.telegram_id == 42)._generate_cache_key()
+
+    def build_lambda():
+        telegram_id = 42
+        return lambda_stmt(lambda: select(User).where(User.telegram_id == telegram_id))._generate_cache_key()
+
+    _report("build + cache key (user)", _build_us(build_select), _build_us(build_lambda))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,95 @@
+"""
+Пропускная способность записи при 100 одновременных писателях:
+отдельная транзакция на каждую запись (как db_session() в хендлерах)
+против группового коммита WriteCoalescer. База — файл на диске,
+так что каждый коммит платит за синхронизацию журнала.
+
+    python -m benchmarks.bench_write_batching
+"""
+from __future__ import annotations
+
+import asyncio
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.db.session import Base
+from app.db.write_batcher import WriteCoalescer
+from app.repositories.object_repo import WorkObjectRepository
+from app.repositories.time_repo import TimeEntryRepository
+
+WRITERS = 100
+ROUNDS = 5
+
+START = datetime(2025, 6, 2, 8, 0)
+
+
+async def _add_entry(session: AsyncSession, object_id: int, i: int) -> int:
+    entry = await TimeEntryRepository(session).create_entry(
+        object_id, START + timedelta(minutes=i), START + timedelta(minutes=i + 30)
+    )
+    return entry.id
+
+
+async def _setup(path: Path):
+    # Generous busy timeout: the baseline has 100 sessions fighting for the write lock
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{path}",
+        connect_args={"timeout": 60},
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    sessions = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+    async with sessions() as session:
+        obj = await WorkObjectRepository(session).create_object(user_id=1, name="Бенчмарк")
+        await session.commit()
+    return engine, sessions, obj.id
+
+
+async def _per_transaction(sessions, object_id: int) -> float:
+    async def writer(i: int) -> int:
+        async with sessions() as session:
+            row_id = await _add_entry(session, object_id, i)
+            await session.commit()
+            return row_id
+
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        await asyncio.gather(*(writer(i) for i in range(WRITERS)))
+    return time.perf_counter() - start
+
+
+async def _group_commit(sessions, object_id: int) -> tuple[float, WriteCoalescer]:
+    coalescer = WriteCoalescer(sessions, window=0.005)
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        await asyncio.gather(
+            *(coalescer.submit(lambda session, i=i: _add_entry(session, object_id, i)) for i in range(WRITERS))
+        )
+    return time.perf_counter() - start, coalescer
+
+
+async def main() -> None:
+    total = WRITERS * ROUNDS
+    with tempfile.TemporaryDirectory() as tmp:
+        engine, sessions, object_id = await _setup(Path(tmp) / "baseline.db")
+        baseline = await _per_transaction(sessions, object_id)
+        await engine.dispose()
+
+        engine, sessions, object_id = await _setup(Path(tmp) / "batched.db")
+        batched, coalescer = await _group_commit(sessions, object_id)
+        await engine.dispose()
+
+    print(f"{WRITERS} concurrent writers x {ROUNDS} rounds = {total} inserts")
+    print(f"transaction per write   {baseline:7.2f} s  {total / baseline:8.0f} rows/s  {total} commits")
+    print(
+        f"group commit            {batched:7.2f} s  {total / batched:8.0f} rows/s  "
+        f"{coalescer.batches} commits (x{baseline / batched:.1f})"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
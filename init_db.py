@@ -1,24 +1,116 @@
+import argparse
 import asyncio
 import logging
+from pathlib import Path
 
 from app.config import get_settings
-from app.db.session import _engine, Base
+from app.db.migrations import plan_migrations, run_migrations
+from app.db.session import Base, db_session, dispose_engine, get_engine
 from app.models import User, WorkObject, TimeEntry, Payment  # Import models to register them
 
 logger = logging.getLogger(__name__)
 
 
-async def init_db():
-    """Initialize database tables"""
+async def backup(settings) -> None:
+    """One-off online backup into BACKUP_DIR"""
+    from app.services.backup import backup_database, database_path
+
+    database = database_path(settings.database_url)
+    if database is None:
+        raise SystemExit("Backups need a file-based SQLite DATABASE_URL")
+    result = await backup_database(
+        database,
+        Path(settings.backup_dir),
+        settings.backup_keep,
+        settings.backup_step_pages,
+        settings.backup_step_pause_ms / 1000,
+    )
+    logger.info(
+        "Backup %s: %d bytes (%d compressed) in %.2f s",
+        result.path, result.size, result.compressed_size, result.seconds,
+    )
+
+
+def restore(settings, snapshot: Path) -> None:
+    """Replace the database with a verified snapshot; the bot must be stopped"""
+    from app.services.backup import database_path, restore_backup
+
+    database = database_path(settings.database_url)
+    if database is None:
+        raise SystemExit("Restore needs a file-based SQLite DATABASE_URL")
+    restore_backup(snapshot, database)
+    logger.info("Restored %s from %s", database, snapshot)
+
+
+async def vacuum() -> None:
+    """Switch an existing database to incremental auto-vacuum (full VACUUM; stop the bot first)"""
+    from app.services.maintenance import enable_incremental_vacuum
+
+    try:
+        if await enable_incremental_vacuum(get_engine()):
+            logger.info("Database rewritten with auto_vacuum=INCREMENTAL")
+        else:
+            logger.info("Incremental auto-vacuum is already enabled")
+    finally:
+        await dispose_engine()
+
+
+async def init_db(dry_run: bool = False, batch_size: int = 500, rebuild_rollups: bool = False):
+    """Initialize database tables and apply pending migrations"""
     settings = get_settings()
-    
-    logger.info("Creating database tables...")
-    
-    async with _engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-    
-    logger.info("Database tables created successfully!")
+
+    engine = get_engine()
+
+    try:
+        if dry_run:
+            for statement in await plan_migrations(engine):
+                print(f"{statement};")
+            return
+
+        version = await run_migrations(engine, batch_size=batch_size)
+        if rebuild_rollups:
+            from app.repositories.rollup_repo import RollupRepository
+
+            async with db_session() as session:
+                rows = await RollupRepository(session).rebuild()
+            logger.info("Rebuilt daily rollups: %d rows", rows)
+    finally:
+        await dispose_engine()
+
+    logger.info("Database is up to date (schema version %d)", version)
 
 
 if __name__ == "__main__":
-    asyncio.run(init_db())
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+    parser = argparse.ArgumentParser(description="Create, migrate, back up or restore the bot database")
+    parser.add_argument("--dry-run", action="store_true", help="print the planned DDL without applying it")
+    parser.add_argument("--batch-size", type=int, default=500, help="rows per committed backfill batch")
+    parser.add_argument(
+        "--rebuild-rollups",
+        action="store_true",
+        help="recompute daily report rollups from time entries and payments",
+    )
+    parser.add_argument("--backup", action="store_true", help="write a verified, compressed snapshot to BACKUP_DIR")
+    parser.add_argument(
+        "--restore",
+        type=Path,
+        metavar="SNAPSHOT",
+        help="replace the database with a snapshot (.db or .db.gz) after an integrity check; stop the bot first",
+    )
+    parser.add_argument(
+        "--vacuum",
+        action="store_true",
+        help="enable incremental auto-vacuum on an existing database (rewrites the file; stop the bot first)",
+    )
+    args = parser.parse_args()
+    if args.vacuum:
+        asyncio.run(vacuum())
+    elif args.restore:
+        restore(get_settings(), args.restore)
+    elif args.backup:
+        asyncio.run(backup(get_settings()))
+    else:
+        asyncio.run(init_db(dry_run=args.dry_run, batch_size=args.batch_size, rebuild_rollups=args.rebuild_rollups))
@@ -1,73 +1,179 @@
+import time
+
+# Taken before any heavy import so the startup profile covers them
+STARTED_AT = time.perf_counter()
+
+import argparse
 import asyncio
 import logging
 from contextlib import suppress
-
-from aiogram import Bot, Dispatcher
-from aiogram.fsm.storage.memory import MemoryStorage
-from aiogram.types import BotCommand
+from pathlib import Path
 
 from app.config import get_settings
-from app.db.session import AsyncSessionLocal
-from app.handlers import (
-    add_payment,
-    add_time,
-    edit,
-    help,
-    objects,
-    report,
-    start,
-)
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-)
+from app.handlers import ROUTER_MODULES
+from app.utils.log import setup_logging
+from app.utils.startup import StartupProfiler
+
 logger = logging.getLogger(__name__)
 
+ARCHIVE_INTERVAL = 6 * 60 * 60  # seconds
+PURGE_INTERVAL = 6 * 60 * 60  # seconds
+SCHEDULER_STATS_INTERVAL = 10 * 60  # seconds
+# How often the maintenance job checks whether it is due and updates are quiet
+MAINTENANCE_CHECK_INTERVAL = 60  # seconds
 
-async def set_commands(bot: Bot):
+
+async def set_commands(bot):
     """Set bot commands"""
+    from aiogram.types import BotCommand
+
     commands = [
         BotCommand(command="start", description="🚀 Запустить бота"),
         BotCommand(command="add", description="⏰ Добавить часы работы"),
         BotCommand(command="payment", description="💰 Добавить оплату"),
         BotCommand(command="objects", description="🏗️ Список объектов"),
         BotCommand(command="report", description="📊 Отчёты"),
+        BotCommand(command="search", description="🔎 Поиск"),
+        BotCommand(command="duplicates", description="🔁 Пересечения записей"),
+        BotCommand(command="timezone", description="🕰 Часовой пояс"),
         BotCommand(command="help", description="❓ Справка"),
     ]
     await bot.set_my_commands(commands)
 
 
-async def main():
+def start_background_tasks(settings) -> list:
+    """Start periodic maintenance jobs; their modules are loaded only when enabled"""
+    from app.middlewares.scheduler import log_scheduler_stats
+    from app.services.background import start_background_task
+
+    tasks = [start_background_task("scheduler stats", log_scheduler_stats, SCHEDULER_STATS_INTERVAL)]
+    if settings.archive_after_months > 0:
+        from app.services.archive import archive_completed_objects
+
+        tasks.append(
+            start_background_task(
+                "archive",
+                lambda: archive_completed_objects(settings.archive_after_months),
+                ARCHIVE_INTERVAL,
+            )
+        )
+    if settings.purge_deleted_after_days > 0:
+        from app.services.purge import purge_deleted_objects
+
+        tasks.append(
+            start_background_task(
+                "purge",
+                lambda: purge_deleted_objects(settings.purge_deleted_after_days),
+                PURGE_INTERVAL,
+            )
+        )
+    if settings.backup_interval_hours > 0:
+        from app.services.backup import backup_database, database_path
+
+        database = database_path(settings.database_url)
+        if database is not None:
+            tasks.append(
+                start_background_task(
+                    "backup",
+                    lambda: backup_database(
+                        database,
+                        Path(settings.backup_dir),
+                        settings.backup_keep,
+                        settings.backup_step_pages,
+                        settings.backup_step_pause_ms / 1000,
+                    ),
+                    settings.backup_interval_hours * 60 * 60,
+                )
+            )
+    if settings.maintenance_interval_hours > 0:
+        from app.services.maintenance import MaintenanceScheduler
+
+        maintenance = MaintenanceScheduler(
+            settings.maintenance_interval_hours * 60 * 60, settings.maintenance_idle_seconds
+        )
+        tasks.append(start_background_task("maintenance", maintenance.tick, MAINTENANCE_CHECK_INTERVAL))
+    return tasks
+
+
+async def main(startup_profile: bool = False):
     """Main function"""
-    settings = get_settings()
-    
-    # Initialize bot and dispatcher
-    bot = Bot(token=settings.bot_token)
-    storage = MemoryStorage()
-    dp = Dispatcher(storage=storage)
-    
-    # Register routers
-    dp.include_router(start.router)
-    dp.include_router(help.router)
-    dp.include_router(objects.router)
-    dp.include_router(add_time.router)
-    dp.include_router(add_payment.router)
-    dp.include_router(edit.router)
-    dp.include_router(report.router)
-    
-    # Set commands
-    await set_commands(bot)
-    
-    logger.info("Bot started")
-    
+    profiler = StartupProfiler(STARTED_AT)
+
+    with profiler.phase("settings"):
+        settings = get_settings()
+
+    with profiler.phase("logging"):
+        # Records are only enqueued on the event loop; a thread writes them out
+        log_listener = setup_logging(
+            settings.log_level, settings.log_levels, settings.log_debug_sample_every
+        )
+
+    with profiler.phase("imports"):
+        profiler.import_module("aiogram")
+        profiler.import_module("sqlalchemy.ext.asyncio")
+        profiler.import_module("app.models")
+        handlers = [profiler.import_module(f"app.handlers.{name}") for name in ROUTER_MODULES]
+
+    from aiogram import Bot
+    from sqlalchemy.orm import configure_mappers
+
+    from app.db.session import dispose_engine, get_engine
+    from app.dispatcher import build_dispatcher
+    from app.middlewares.idempotency import CallbackAnswerRecorder
+    from app.middlewares.startup import FirstUpdateMiddleware
+
+    with profiler.phase("configure mappers"):
+        # Once here instead of lazily inside the first handler's query
+        configure_mappers()
+
+    with profiler.phase("database engine"):
+        get_engine()
+
+    with profiler.phase("bot and dispatcher"):
+        # Initialize bot and dispatcher
+        bot = Bot(token=settings.bot_token)
+        bot.session.middleware(CallbackAnswerRecorder())
+        outer_middlewares = [FirstUpdateMiddleware(profiler, print_report=startup_profile)]
+        recorder = None
+        if settings.record_updates_path:
+            from app.replay import UpdateRecorder
+
+            # Opt-in: anonymized traffic for python -m app.replay
+            recorder = UpdateRecorder(Path(settings.record_updates_path), settings.record_updates_key)
+            outer_middlewares.append(recorder)
+        dp = build_dispatcher(settings, [module.router for module in handlers], outer_middlewares)
+
+    with profiler.phase("set commands"):
+        # Set commands
+        await set_commands(bot)
+
+    background_tasks = start_background_tasks(settings)
+
+    logger.info("Bot started in %.1f ms", profiler.mark_ready() * 1000)
+    if startup_profile:
+        print(profiler.report())
+
     try:
         # Start polling
         await dp.start_polling(bot)
     finally:
+        for task in background_tasks:
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
         await bot.session.close()
+        await dispose_engine()
+        if recorder is not None:
+            recorder.close()
+        log_listener.stop()
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(description="Run the WorkTime bot")
+    parser.add_argument(
+        "--startup-profile",
+        action="store_true",
+        help="print per-phase startup timing and import costs",
+    )
+    args = parser.parse_args()
+    asyncio.run(main(startup_profile=args.startup_profile))
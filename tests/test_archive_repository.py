@@ -0,0 +1,146 @@
+import pytest
+from datetime import datetime, timedelta, UTC
+
+from app.models.work_object import ObjectStatus
+from app.repositories.archive_repo import ArchiveRepository
+from app.repositories.object_repo import WorkObjectRepository
+from app.repositories.payment_repo import PaymentRepository
+from app.repositories.time_repo import TimeEntryRepository
+
+
+@pytest.mark.asyncio
+async def test_archive_union_reads_and_restore(test_session):
+    object_repo = WorkObjectRepository(test_session)
+    time_repo = TimeEntryRepository(test_session)
+    payment_repo = PaymentRepository(test_session)
+    archive_repo = ArchiveRepository(test_session)
+
+    obj = await object_repo.create_object(user_id=1, name="Дача")
+    start = datetime(2024, 3, 1, 9, 0)
+    for day in range(3):
+        await time_repo.create_entry(
+            obj.id, start + timedelta(days=day), start + timedelta(days=day, hours=2), comment=f"день {day}"
+        )
+    await payment_repo.create_payment(obj.id, 500000, datetime(2024, 3, 5))
+    await object_repo.update_status(obj.id, 1, ObjectStatus.COMPLETED)
+    obj.completed_at = datetime.now(UTC) - timedelta(days=400)
+    await test_session.commit()
+
+    assert await archive_repo.get_objects_to_archive(datetime.now(UTC) - timedelta(days=180)) == [obj.id]
+
+    # Batches of two: entries first, then the payment
+    moved = []
+    while batch := await archive_repo.archive_object_batch(obj.id, batch_size=2):
+        moved.append(batch)
+    await test_session.commit()
+    assert moved == [2, 1, 1]
+    assert await time_repo.get_by_object_id(obj.id) == []
+
+    await test_session.refresh(obj)
+    assert obj.is_archived
+    assert await time_repo.get_total_minutes(obj.id, include_archive=True) == 360
+    assert await payment_repo.get_total_amount(obj.id, include_archive=True) == 500000
+    period = await time_repo.get_entries_in_period(
+        obj.id, datetime(2024, 3, 2), datetime(2024, 3, 3), include_archive=True
+    )
+    assert [entry.comment for entry in period] == ["день 2", "день 1"]
+    # Plain rows for the object card come from both tables in one query
+    rows = await time_repo.get_rows(obj.id, include_archive=True)
+    assert [(row.date.day, row.duration_minutes, row.comment) for row in rows] == [
+        (3, 120, "день 2"), (2, 120, "день 1"), (1, 120, "день 0")
+    ]
+    assert [tuple(row[1:]) for row in await payment_repo.get_rows(obj.id, include_archive=True)] == [
+        (datetime(2024, 3, 5), 500000)
+    ]
+
+    # Reopening brings the history back with the original ids
+    await object_repo.update_status(obj.id, 1, ObjectStatus.ACTIVE)
+    await test_session.commit()
+    entries = await time_repo.get_by_object_id(obj.id)
+    assert sorted(entry.comment for entry in entries) == ["день 0", "день 1", "день 2"]
+    assert await payment_repo.get_total_amount(obj.id) == 500000
+    assert [row.comment for row in await time_repo.get_rows(obj.id)] == ["день 2", "день 1", "день 0"]
+    assert await archive_repo.get_entries(obj.id) == []
+    assert not obj.is_archived and obj.completed_at is None
+
+
+async def _completed_object(session, name: str, comments) -> int:
+    object_repo = WorkObjectRepository(session)
+    obj = await object_repo.create_object(user_id=1, name=name)
+    start = datetime(2024, 3, 1, 9, 0)
+    for day, comment in enumerate(comments):
+        await TimeEntryRepository(session).create_entry(
+            obj.id, start + timedelta(days=day), start + timedelta(days=day, hours=1), comment=comment
+        )
+    await object_repo.update_status(obj.id, 1, ObjectStatus.COMPLETED)
+    await session.commit()
+    return obj.id
+
+
+@pytest.mark.asyncio
+async def test_archive_gives_new_ids_to_reused_hot_ids(test_session):
+    time_repo = TimeEntryRepository(test_session)
+    archive_repo = ArchiveRepository(test_session)
+
+    first = await _completed_object(test_session, "Баня", ["баня 1", "баня 2"])
+    while await archive_repo.archive_object_batch(first):
+        pass
+    await test_session.commit()
+
+    # The hot table is empty again, so the next entry reuses an archived id
+    second = await _completed_object(test_session, "Гараж", ["гараж"])
+    [reused] = await time_repo.get_by_object_id(second)
+    assert reused.id in {entry.id for entry in await archive_repo.get_entries(first)}
+
+    while await archive_repo.archive_object_batch(second):
+        pass
+    await test_session.commit()
+    assert sorted(entry.comment for entry in await archive_repo.get_entries(first)) == ["баня 1", "баня 2"]
+    assert [entry.comment for entry in await archive_repo.get_entries(second)] == ["гараж"]
+
+    assert await archive_repo.restore_object(second) == 1
+    assert [entry.comment for entry in await time_repo.get_by_object_id(second)] == ["гараж"]
+
+
+@pytest.mark.asyncio
+async def test_archive_stops_when_object_is_reopened(test_session):
+    time_repo = TimeEntryRepository(test_session)
+    archive_repo = ArchiveRepository(test_session)
+
+    object_id = await _completed_object(test_session, "Сарай", ["день 0", "день 1", "день 2"])
+    assert await archive_repo.archive_object_batch(object_id, batch_size=2) == 2
+    await test_session.commit()
+
+    # Reopened between batches: history comes back and the next batch moves nothing
+    await WorkObjectRepository(test_session).update_status(object_id, 1, ObjectStatus.ACTIVE)
+    await test_session.commit()
+    assert await archive_repo.archive_object_batch(object_id, batch_size=2) == 0
+    await test_session.commit()
+
+    assert len(await time_repo.get_by_object_id(object_id)) == 3
+    assert await archive_repo.get_entries(object_id) == []
+    obj = await WorkObjectRepository(test_session).get_by_id(object_id, 1)
+    await test_session.refresh(obj)
+    assert not obj.is_archived
+
+
+@pytest.mark.asyncio
+async def test_restore_keeps_rows_whose_id_the_same_object_reused(test_session):
+    time_repo = TimeEntryRepository(test_session)
+    archive_repo = ArchiveRepository(test_session)
+
+    object_id = await _completed_object(test_session, "Беседка", ["день 0", "день 1", "день 2"])
+    while await archive_repo.archive_object_batch(object_id):
+        pass
+    await test_session.commit()
+
+    # An entry added to the archived object takes the id of an archived one
+    start = datetime(2024, 4, 1, 9, 0)
+    added = await time_repo.create_entry(object_id, start, start + timedelta(hours=1), comment="новая")
+    assert added.id in {entry.id for entry in await archive_repo.get_entries(object_id)}
+
+    assert await archive_repo.restore_object(object_id) == 3
+    await test_session.commit()
+    entries = await time_repo.get_by_object_id(object_id)
+    assert sorted(entry.comment for entry in entries) == ["день 0", "день 1", "день 2", "новая"]
+    assert len({entry.id for entry in entries}) == 4
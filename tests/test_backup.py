@@ -0,0 +1,69 @@
+import sqlite3
+
+import pytest
+
+from app.services.backup import (
+    BackupError,
+    backup_database,
+    backup_stats,
+    database_path,
+    list_snapshots,
+    restore_backup,
+)
+
+
+def _make_database(path, rows):
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE IF NOT EXISTS items (id INTEGER PRIMARY KEY, body TEXT)")
+    conn.executemany("INSERT INTO items (body) VALUES (?)", [("x" * 500,)] * rows)
+    conn.commit()
+    conn.close()
+
+
+def _count(path):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_database_path_only_for_sqlite_files():
+    assert str(database_path("sqlite+aiosqlite:////data/worktime.db")) == "/data/worktime.db"
+    assert database_path("sqlite+aiosqlite:///:memory:") is None
+    assert database_path("postgresql+asyncpg://localhost/worktime") is None
+
+
+@pytest.mark.asyncio
+async def test_backup_in_steps_rotates_and_restores(tmp_path):
+    database = tmp_path / "worktime.db"
+    backups = tmp_path / "backups"
+    backups.mkdir()
+    _make_database(database, 200)
+    for second in range(3):
+        (backups / f"worktime-20000101-00000{second}.db.gz").write_bytes(b"old")
+
+    # Small steps: the copy takes many steps with a pause after each
+    result = await backup_database(database, backups, keep=2, pages=4, pause=0.001)
+    assert result.size == database.stat().st_size
+    assert 0 < result.compressed_size < result.size
+    assert backup_stats.last is result
+    assert [path.name for path in list_snapshots(backups)] == [
+        result.path.name, "worktime-20000101-000002.db.gz"
+    ]
+    assert not list(backups.glob("*.tmp"))
+
+    _make_database(database, 100)
+    restore_backup(result.path, database)
+    assert _count(database) == 200
+
+
+def test_restore_rejects_corrupt_snapshot(tmp_path):
+    database = tmp_path / "worktime.db"
+    _make_database(database, 10)
+    broken = tmp_path / "broken.db"
+    broken.write_bytes(b"SQLite format 3\x00" + b"\x00" * 200)
+
+    with pytest.raises((BackupError, sqlite3.DatabaseError)):
+        restore_backup(broken, database)
+    assert _count(database) == 10
@@ -0,0 +1,62 @@
+from datetime import datetime
+
+import pytest
+from aiogram import Bot, Dispatcher
+from aiogram.fsm.storage.memory import MemoryStorage
+from aiogram.methods import Response, SendMessage
+from aiogram.types import Chat, Message, Update, User
+
+from app.handlers import diag
+from app.services.diagnostics import fsm_storage_stats, memory_snapshots
+
+
+class _OfflineSession:
+    def __init__(self):
+        self.calls = []
+
+    async def __call__(self, make_request, bot, method):
+        self.calls.append(method)
+        return Response[bool](ok=True, result=True)
+
+
+def _command(update_id: int, user_id: int, text: str) -> Update:
+    user = User(id=user_id, is_bot=False, first_name="Тест")
+    message = Message(
+        message_id=update_id, date=datetime.now(), chat=Chat(id=user_id, type="private"), from_user=user, text=text
+    )
+    return Update(update_id=update_id, message=message)
+
+
+@pytest.mark.asyncio
+async def test_diag_is_admin_only_and_reports_state():
+    storage = MemoryStorage()
+    dp = Dispatcher(storage=storage, admin_ids=frozenset({1}))
+    dp.include_router(diag.router)
+    bot = Bot("42:TEST")
+    offline = _OfflineSession()
+    bot.session.middleware(offline)
+
+    context = dp.fsm.get_context(bot, chat_id=5, user_id=5)
+    await context.set_state("AddTimeStates:waiting_for_date")
+    await context.update_data(date="15.08.24")
+    await dp.fsm.get_context(bot, chat_id=6, user_id=6).clear()
+    stats = fsm_storage_stats(storage)
+    assert (stats.entries, stats.with_state, stats.empty) == (2, 1, 1)
+
+    await dp.feed_update(bot, _command(1, 2, "/diag"))
+    assert offline.calls == []
+
+    try:
+        await dp.feed_update(bot, _command(2, 1, "/diag"))
+        await dp.feed_update(bot, _command(3, 1, "/diag snapshot"))
+        await dp.feed_update(bot, _command(4, 1, "/diag snapshot"))
+    finally:
+        memory_snapshots.stop()
+
+    texts = [call.text for call in offline.calls if isinstance(call, SendMessage)]
+    # Every user who sent an update leaves an (empty) MemoryStorage record behind
+    assert "FSM: 4 записей (1 с состоянием, 3 пустых)" in texts[0]
+    assert "RSS:" in texts[0] and "Пул:" in texts[0]
+    assert texts[1].startswith("📸 tracemalloc включён")
+    assert texts[2].startswith("📸")
+    await bot.session.close()
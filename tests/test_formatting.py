@@ -0,0 +1,48 @@
+from datetime import datetime
+from types import SimpleNamespace
+
+from app.models.work_object import ObjectStatus
+from app.services.reporting import ReportingService
+from app.utils.formatting import DAY_FORMS, format_minutes, format_work_days, plural
+
+
+def test_plural_covers_teens_and_hundreds():
+    forms = {n: plural(n, DAY_FORMS) for n in (0, 1, 2, 5, 11, 12, 14, 21, 22, 25, 101, 111, 112, 121)}
+    assert forms == {
+        0: "дней", 1: "день", 2: "дня", 5: "дней", 11: "дней", 12: "дней", 14: "дней",
+        21: "день", 22: "дня", 25: "дней", 101: "день", 111: "дней", 112: "дней", 121: "день",
+    }
+    assert format_work_days(21) == "21 день"
+    assert format_work_days(111) == "111 дней"
+    assert format_minutes(21 * 60 + 5) == "21:05 час"
+    assert format_minutes(22 * 60) == "22:00 часа"
+    assert format_minutes(111 * 60) == "111:00 часов"
+
+
+def test_object_card_lists_entries_and_payments_by_date():
+    work_object = SimpleNamespace(
+        name="Дом", status=ObjectStatus.COMPLETED, created_at=datetime(2024, 5, 30)
+    )
+    entries = [
+        SimpleNamespace(date=datetime(2024, 6, 3), duration_minutes=90),
+        SimpleNamespace(date=datetime(2024, 6, 1), duration_minutes=480),
+    ]
+    payments = [SimpleNamespace(date=datetime(2024, 6, 5), amount=150050)]
+
+    card = ReportingService.generate_object_card(work_object, entries, payments, 570, 150050)
+    assert card.splitlines() == [
+        "🏗️ <b>Дом</b>",
+        "Статус: 🟢 Завершён",
+        "Всего часов: 9:30 часов",
+        "Всего оплат: 1 500.50 р.",
+        "Дата создания: 30.05.24",
+        "Начало работ: 01.06.24",
+        "Завершение: 03.06.24",
+        "",
+        "🕒 <b>Записи работ:</b>",
+        "• 01.06.24 — 8:00 часов",
+        "• 03.06.24 — 1:30 час",
+        "",
+        "💰 <b>Записи оплат:</b>",
+        "• 05.06.24 — 1 500.50 р.",
+    ]
@@ -0,0 +1,68 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+from aiogram import Bot, Dispatcher, F, Router
+from aiogram.fsm.storage.memory import MemoryStorage
+from aiogram.methods import AnswerCallbackQuery, Response
+from aiogram.types import CallbackQuery, Chat, Message, Update, User
+
+from app.middlewares.idempotency import CallbackAnswerRecorder, CallbackIdempotencyMiddleware
+
+
+class _OfflineSession:
+    """Request middleware answering every API call locally and recording it"""
+
+    def __init__(self):
+        self.calls = []
+
+    async def __call__(self, make_request, bot, method):
+        self.calls.append(method)
+        return Response[bool](ok=True, result=True)
+
+
+def _tap(update_id: int, data: str, message_id: int = 10) -> Update:
+    user = User(id=7, is_bot=False, first_name="Тест")
+    message = Message(message_id=message_id, date=datetime.now(), chat=Chat(id=7, type="private"), text="…")
+    query = CallbackQuery(id=f"q{update_id}", from_user=user, chat_instance="c", message=message, data=data)
+    return Update(update_id=update_id, callback_query=query)
+
+
+@pytest.mark.asyncio
+async def test_double_tap_runs_handler_once_and_replays_answer():
+    dp = Dispatcher(storage=MemoryStorage())
+    idempotency = CallbackIdempotencyMiddleware(ttl=5)
+    dp.callback_query.outer_middleware(idempotency)
+
+    router = Router()
+    runs = []
+
+    @router.callback_query(F.data.startswith("complete_"))
+    async def complete(callback: CallbackQuery):
+        runs.append(callback.data)
+        await asyncio.sleep(0.02)
+        await callback.answer("✅ Объект завершён")
+
+    dp.include_router(router)
+
+    bot = Bot("42:TEST")
+    offline = _OfflineSession()
+    bot.session.middleware(CallbackAnswerRecorder())
+    bot.session.middleware(offline)
+
+    # Two taps while the first is still running, one shortly after
+    await asyncio.gather(
+        dp.feed_update(bot, _tap(1, "complete_5")),
+        dp.feed_update(bot, _tap(2, "complete_5")),
+    )
+    await dp.feed_update(bot, _tap(3, "complete_5"))
+    # Another message or another button is not a duplicate
+    await dp.feed_update(bot, _tap(4, "complete_5", message_id=11))
+    await dp.feed_update(bot, _tap(5, "complete_6"))
+
+    assert runs == ["complete_5", "complete_5", "complete_6"]
+    answers = [call for call in offline.calls if isinstance(call, AnswerCallbackQuery)]
+    assert {call.callback_query_id for call in answers} == {"q1", "q2", "q3", "q4", "q5"}
+    assert all(call.text == "✅ Объект завершён" for call in answers)
+    assert idempotency.duplicates == 2
+    await bot.session.close()
@@ -0,0 +1,40 @@
+import logging
+
+from app.utils.log import setup_logging
+
+
+class _ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.lines = []
+
+    def emit(self, record):
+        self.lines.append(self.format(record))
+
+
+def test_queue_logging_fields_levels_and_sampling():
+    root = logging.getLogger()
+    saved_handlers, saved_level = root.handlers[:], root.level
+    handler = _ListHandler()
+    listener = setup_logging(
+        "INFO", (("test.chatty", "DEBUG"),), debug_sample_every=3, handler=handler
+    )
+    try:
+        chatty = logging.getLogger("test.chatty")
+        for object_id in range(7):
+            chatty.debug("Object selected", extra={"object_id": object_id})
+        logging.getLogger("test.quiet").debug("dropped by the root level")
+        logging.getLogger("test.quiet").warning("Purged %d objects", 2, extra={"table": "payments"})
+    finally:
+        listener.stop()
+        for existing in root.handlers[:]:
+            root.removeHandler(existing)
+        for existing in saved_handlers:
+            root.addHandler(existing)
+        root.setLevel(saved_level)
+        logging.getLogger("test.chatty").setLevel(logging.NOTSET)
+
+    selected = [line for line in handler.lines if "Object selected" in line]
+    assert [line.rsplit(" ", 1)[-1] for line in selected] == ["object_id=0", "object_id=3", "object_id=6"]
+    assert handler.lines[-1].endswith("test.quiet - WARNING - Purged 2 objects table=payments")
+    assert not any("dropped" in line for line in handler.lines)
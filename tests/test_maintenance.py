@@ -0,0 +1,59 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.db.migrations import run_migrations
+from app.middlewares.scheduler import SchedulerStats
+from app.services.maintenance import MaintenanceScheduler, run_maintenance
+
+
+async def _pragma(engine, name):
+    async with engine.connect() as conn:
+        return (await conn.exec_driver_sql(f"PRAGMA {name}")).scalar()
+
+
+@pytest.mark.asyncio
+async def test_maintenance_analyzes_and_returns_free_pages(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'worktime.db'}")
+    await run_migrations(engine)
+    assert await _pragma(engine, "auto_vacuum") == 2
+
+    async with engine.begin() as conn:
+        for i in range(2000):
+            await conn.execute(
+                text(
+                    "INSERT INTO users (telegram_id, username, created_at, updated_at) "
+                    "VALUES (:id, :name, '2024-06-01', '2024-06-01')"
+                ),
+                {"id": i, "name": "x" * 200},
+            )
+        await conn.execute(text("DELETE FROM users WHERE telegram_id >= 100"))
+    assert await _pragma(engine, "freelist_count") > 0
+
+    result = await run_maintenance(engine, pause=0)
+    assert result.analyzed == ["users"]
+    assert result.reclaimed_bytes > 0
+    assert result.free_pages_left == 0
+    assert not result.interrupted
+
+    # Статистика свежая: повторный прогон ничего не анализирует
+    assert (await run_maintenance(engine, pause=0)).analyzed == []
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_maintenance_waits_for_quiet_and_stops_on_updates(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'worktime.db'}")
+    await run_migrations(engine)
+    async with engine.begin() as conn:
+        await conn.execute(
+            text("INSERT INTO users (telegram_id, created_at, updated_at) VALUES (1, '2024-06-01', '2024-06-01')")
+        )
+
+    stats = SchedulerStats()
+    scheduler = MaintenanceScheduler(interval=3600, idle_seconds=300, stats=stats)
+    assert await scheduler.tick() is None  # обновление только что было
+
+    interrupted = await run_maintenance(engine, is_idle=lambda: False, pause=0)
+    assert interrupted.interrupted and interrupted.analyzed == []
+    await engine.dispose()
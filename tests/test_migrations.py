@@ -0,0 +1,56 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.db.migrations import latest_version, plan_migrations, run_migrations
+from app.utils.dateparse import local_day
+
+
+@pytest.mark.asyncio
+async def test_fresh_database_is_stamped_latest(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'fresh.db'}")
+
+    assert await run_migrations(engine) == latest_version()
+    # повторный запуск ничего не делает
+    assert await run_migrations(engine) == latest_version()
+
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_existing_database_gets_column_and_backfill(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'old.db'}")
+
+    # Схема до появления столбца minutes и таблицы schema_version
+    async with engine.begin() as conn:
+        await conn.execute(text("CREATE TABLE users (id INTEGER PRIMARY KEY)"))
+        await conn.execute(
+            text(
+                "CREATE TABLE time_entries (id INTEGER PRIMARY KEY, work_object_id BIGINT NOT NULL, "
+                "start_time DATETIME NOT NULL, end_time DATETIME NOT NULL, hours FLOAT NOT NULL, "
+                "date DATETIME NOT NULL, comment TEXT, created_at DATETIME NOT NULL, updated_at DATETIME NOT NULL)"
+            )
+        )
+        for i in range(5):
+            await conn.execute(
+                text(
+                    "INSERT INTO time_entries (work_object_id, start_time, end_time, hours, date, created_at, updated_at) "
+                    "VALUES (1, '2025-01-01 09:00:00.000000', '2025-01-01 17:45:00.000000', 8.75, "
+                    "'2025-01-01 00:00:00.000000', '2025-01-01', '2025-01-01')"
+                )
+            )
+
+    planned = "\n".join(await plan_migrations(engine))
+    assert "ALTER TABLE time_entries ADD COLUMN minutes INTEGER" in planned
+
+    assert await run_migrations(engine, batch_size=2, pause=0) == latest_version()
+
+    async with engine.connect() as conn:
+        minutes = (await conn.execute(text("SELECT DISTINCT minutes FROM time_entries"))).scalars().all()
+        days = (await conn.execute(text("SELECT DISTINCT local_day FROM time_entries"))).scalars().all()
+    assert minutes == [525]
+    assert days == [local_day(date(2025, 1, 1))]
+
+    await engine.dispose()
@@ -0,0 +1,72 @@
+import sqlite3
+from datetime import datetime
+
+import pytest
+from aiogram import Bot, Dispatcher
+from aiogram.fsm.storage.memory import MemoryStorage
+from aiogram.types import Chat, Message, Update, User
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.db.migrations import run_migrations
+from app.db.session import dispose_engine
+from app.handlers import add_payment, add_time
+from app.keyboards.common import Texts
+from app.replay import OfflineSession
+
+
+def _message(update_id: int, text: str) -> Update:
+    user = User(id=7, is_bot=False, first_name="Тест")
+    message = Message(
+        message_id=update_id, date=datetime.now(), chat=Chat(id=7, type="private"), from_user=user, text=text
+    )
+    return Update(update_id=update_id, message=message)
+
+
+@pytest.mark.asyncio
+async def test_commands_in_object_picker_are_not_object_names(tmp_path, monkeypatch):
+    path = tmp_path / "worktime.db"
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    await run_migrations(engine)
+    await engine.dispose()
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.execute(
+            "INSERT INTO users (telegram_id, first_name, created_at, updated_at) "
+            "VALUES (7, 'Тест', '2024-06-01', '2024-06-01')"
+        )
+    monkeypatch.setenv("DATABASE_URL", f"sqlite+aiosqlite:///{path}")
+    await dispose_engine()
+
+    dp = Dispatcher(storage=MemoryStorage())
+    dp.include_router(add_time.router)
+    dp.include_router(add_payment.router)
+    bot = Bot("42:TEST")
+    bot.session.middleware(OfflineSession())
+    context = dp.fsm.get_context(bot, chat_id=7, user_id=7)
+    picker_states = (
+        add_time.AddTimeStates.waiting_for_select_object,
+        add_payment.AddPaymentStates.waiting_for_selection_object,
+    )
+    try:
+        update_id = 0
+        for picker in picker_states:
+            await context.set_state(picker)
+            await context.set_data({"amount_kopecks": 100000, "date": datetime(2024, 6, 1)})
+            # Left for the routers of these commands and buttons
+            for text in ("/report", "/edit_time_5", Texts.REPORTS):
+                update_id += 1
+                await dp.feed_update(bot, _message(update_id, text))
+                assert await context.get_state() == picker.state
+
+        # Plain text is still taken as the name of a new object
+        await context.set_state(add_time.AddTimeStates.waiting_for_select_object)
+        await dp.feed_update(bot, _message(update_id + 1, "Дача"))
+        assert await context.get_state() == add_time.AddTimeStates.waiting_for_comment.state
+        assert (await context.get_data())["object_name"] == "Дача"
+    finally:
+        await bot.session.close()
+        await dispose_engine()
+
+    conn = sqlite3.connect(path)
+    assert conn.execute("SELECT count(*) FROM work_objects").fetchone()[0] == 0
+    conn.close()
@@ -0,0 +1,40 @@
+import pytest
+from datetime import datetime, timedelta
+
+from app.repositories.object_repo import WorkObjectRepository
+
+
+@pytest.mark.asyncio
+async def test_keyset_pages_follow_recent_activity(test_session):
+    repo = WorkObjectRepository(test_session)
+
+    base = datetime(2025, 1, 1)
+    created = []
+    for i in range(5):
+        obj = await repo.create_object(user_id=1, name=f"Объект {i}")
+        obj.last_activity_at = base + timedelta(days=i)
+        created.append(obj)
+    await test_session.commit()
+
+    first = await repo.get_page(1, limit=2)
+    assert [o.name for o in first.objects] == ["Объект 4", "Объект 3"]
+
+    second = await repo.get_page(1, limit=2, after=first.next_cursor)
+    assert [o.name for o in second.objects] == ["Объект 2", "Объект 1"]
+
+    last = await repo.get_page(1, limit=2, after=second.next_cursor)
+    assert [o.name for o in last.objects] == ["Объект 0"]
+    assert last.next_cursor is None
+
+
+@pytest.mark.asyncio
+async def test_search_by_prefix_is_case_insensitive(test_session):
+    repo = WorkObjectRepository(test_session)
+
+    for name in ("Дача Марина", "дача Олег", "Квартира"):
+        await repo.create_object(user_id=1, name=name)
+    await repo.create_object(user_id=2, name="Дача чужая")
+    await test_session.commit()
+
+    found = await repo.search_by_prefix(1, "ДАЧ")
+    assert sorted(o.name for o in found) == ["Дача Марина", "дача Олег"]
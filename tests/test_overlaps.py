@@ -0,0 +1,60 @@
+import pytest
+from datetime import datetime
+
+from app.repositories.object_repo import WorkObjectRepository
+from app.repositories.time_repo import EntryInterval, TimeEntryRepository
+from app.services.overlaps import find_overlaps, is_duplicate
+
+
+def _at(hour: int, minute: int = 0) -> datetime:
+    return datetime(2024, 5, 10, hour, minute)
+
+
+@pytest.mark.asyncio
+async def test_find_overlapping_is_per_user_and_half_open(test_session):
+    object_repo = WorkObjectRepository(test_session)
+    time_repo = TimeEntryRepository(test_session)
+
+    house = await object_repo.create_object(user_id=1, name="Дом")
+    other = await object_repo.create_object(user_id=2, name="Чужой")
+    morning = await time_repo.create_entry(house.id, _at(9), _at(12))
+    await time_repo.create_entry(house.id, _at(13), _at(15))
+    await time_repo.create_entry(other.id, _at(10), _at(11))
+    await test_session.commit()
+    assert morning.user_id == 1
+
+    found = await time_repo.find_overlapping(1, _at(0), _at(11), _at(14))
+    assert [(entry.start_time.hour, name) for entry, name in found] == [(9, "Дом"), (13, "Дом")]
+
+    # Touching intervals do not overlap
+    assert await time_repo.find_overlapping(1, _at(0), _at(12), _at(13)) == []
+    # The edited entry itself is excluded
+    found = await time_repo.find_overlapping(1, _at(0), _at(9), _at(12), exclude_id=morning.id)
+    assert found == []
+
+
+@pytest.mark.asyncio
+async def test_sweep_finds_every_overlapping_pair(test_session):
+    object_repo = WorkObjectRepository(test_session)
+    time_repo = TimeEntryRepository(test_session)
+
+    house = await object_repo.create_object(user_id=1, name="Дом")
+    await time_repo.create_entry(house.id, _at(8), _at(18))
+    await time_repo.create_entry(house.id, _at(9), _at(10))
+    await time_repo.create_entry(house.id, _at(9), _at(10))
+    await time_repo.create_entry(house.id, _at(18), _at(19))
+    await test_session.commit()
+
+    intervals = await time_repo.get_intervals(1)
+    pairs = find_overlaps(intervals)
+    assert [(a.start_time.hour, b.start_time.hour) for a, b in pairs] == [(8, 9), (8, 9), (9, 9)]
+    assert [is_duplicate(a, b) for a, b in pairs] == [False, False, True]
+
+
+def test_sweep_on_plain_intervals():
+    def interval(entry_id, start, end):
+        return EntryInterval(entry_id, 1, "Дом", _at(0), _at(start), _at(end))
+
+    assert find_overlaps([]) == []
+    chain = [interval(1, 8, 10), interval(2, 9, 11), interval(3, 10, 12)]
+    assert [(a.id, b.id) for a, b in find_overlaps(chain)] == [(1, 2), (2, 3)]
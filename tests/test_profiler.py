@@ -0,0 +1,81 @@
+import time
+from datetime import datetime
+
+import pytest
+from aiogram import Bot, Dispatcher, Router
+from aiogram.filters import Command
+from aiogram.fsm.storage.memory import MemoryStorage
+from aiogram.methods import Response, SendMessage
+from aiogram.types import Chat, Message, Update, User
+
+from app.handlers import diag
+from app.middlewares.profiling import ProfilingMiddleware
+from app.services.profiler import SamplingProfiler
+
+
+class _OfflineSession:
+    def __init__(self):
+        self.calls = []
+
+    async def __call__(self, make_request, bot, method):
+        self.calls.append(method)
+        return Response[bool](ok=True, result=True)
+
+
+def _command(update_id: int, text: str) -> Update:
+    user = User(id=1, is_bot=False, first_name="Админ")
+    message = Message(
+        message_id=update_id, date=datetime.now(), chat=Chat(id=1, type="private"), from_user=user, text=text
+    )
+    return Update(update_id=update_id, message=message)
+
+
+def _busy(seconds: float) -> None:
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+@pytest.mark.asyncio
+async def test_profile_next_updates_per_handler(tmp_path):
+    profiler = SamplingProfiler(str(tmp_path), interval=0.002)
+    dp = Dispatcher(storage=MemoryStorage(), admin_ids=frozenset({1}), profiler=profiler)
+    dp.update.outer_middleware(ProfilingMiddleware(profiler))
+
+    # diag.router itself is attached by test_diag; register the handler on a fresh router
+    router = Router()
+    router.message.register(diag.cmd_profile, Command("profile"), diag.AdminFilter())
+
+    @router.message(Command("slow"))
+    async def slow_report(message: Message):
+        _busy(0.08)
+
+    dp.include_router(router)
+    bot = Bot("42:TEST")
+    offline = _OfflineSession()
+    bot.session.middleware(offline)
+
+    await dp.feed_update(bot, _command(1, "/profile 2"), dispatcher=dp)
+    assert profiler.active
+    await dp.feed_update(bot, _command(2, "/slow"), dispatcher=dp)
+    await dp.feed_update(bot, _command(3, "/slow"), dispatcher=dp)
+    result = await profiler.stop()
+    assert not profiler.running
+
+    assert result.updates == 2
+    assert result.per_handler[0][0].endswith("slow_report")
+    assert result.top_functions[0][0] == f"{__name__}._busy"
+    collapsed = result.path.read_text(encoding="utf-8")
+    assert f"slow_report;{__name__}._busy " in collapsed
+
+    texts = [call.text for call in offline.calls if isinstance(call, SendMessage)]
+    assert texts[0].startswith("⏱ Профилирование запущено: следующие 2 апдейтов")
+    assert texts[-1].startswith("⏱ <b>Профиль готов</b>")
+    await bot.session.close()
+
+
+def test_profile_args():
+    assert diag.parse_profile_args("") == (diag.DEFAULT_PROFILE_UPDATES, diag.MAX_PROFILE_SECONDS)
+    assert diag.parse_profile_args("30s") == (None, 30)
+    assert diag.parse_profile_args("50") == (50, diag.MAX_PROFILE_SECONDS)
+    assert diag.parse_profile_args("abc") is None
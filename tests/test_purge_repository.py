@@ -0,0 +1,49 @@
+import pytest
+from datetime import datetime, timedelta, UTC
+
+from app.models.work_object import WorkObject
+from app.repositories.object_repo import WorkObjectRepository
+from app.repositories.payment_repo import PaymentRepository
+from app.repositories.purge_repo import PURGED_TABLES, PurgeRepository
+from app.repositories.time_repo import TimeEntryRepository
+
+
+@pytest.mark.asyncio
+async def test_purge_deleted_object_in_batches(test_session):
+    object_repo = WorkObjectRepository(test_session)
+    time_repo = TimeEntryRepository(test_session)
+    purge_repo = PurgeRepository(test_session)
+
+    kept = await object_repo.create_object(user_id=1, name="Живой")
+    doomed = await object_repo.create_object(user_id=1, name="Удалённый")
+    start = datetime(2025, 5, 1, 8, 0)
+    for obj in (kept, doomed):
+        for day in range(3):
+            await time_repo.create_entry(obj.id, start + timedelta(days=day), start + timedelta(days=day, hours=1))
+    await PaymentRepository(test_session).create_payment(doomed.id, 100000, start)
+
+    assert await object_repo.delete_object(doomed.id, 1) == "Удалённый"
+    await test_session.commit()
+    # A bulk UPDATE only refreshes attributes already loaded on the instance
+    await test_session.refresh(doomed)
+    assert doomed.deleted_at is not None
+
+    # Still inside the grace period
+    assert await purge_repo.get_objects_to_purge(datetime.now(UTC) - timedelta(days=30)) == []
+    assert await purge_repo.get_objects_to_purge(datetime.now(UTC) + timedelta(seconds=1)) == [doomed.id]
+
+    batches = []
+    for table in PURGED_TABLES:
+        while deleted := await purge_repo.delete_history_batch(table, doomed.id, batch_size=2):
+            batches.append((table, deleted))
+    assert batches == [
+        ("time_entries", 2), ("time_entries", 1), ("payments", 1), ("daily_rollups", 2), ("daily_rollups", 1)
+    ]
+    assert await purge_repo.delete_object_row(doomed.id) == 1
+    await test_session.commit()
+
+    # Active objects are never touched
+    assert await purge_repo.delete_object_row(kept.id) == 0
+    assert len(await time_repo.get_by_object_id(kept.id)) == 3
+    assert await time_repo.get_by_object_id(doomed.id) == []
+    assert await test_session.get(WorkObject, doomed.id, populate_existing=True) is None
@@ -0,0 +1,96 @@
+import importlib
+import json
+import sqlite3
+from datetime import datetime
+
+import pytest
+from aiogram import Bot
+from aiogram.types import Chat, Message, Update, User
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.config import get_settings
+from app.db.migrations import run_migrations
+from app.db.session import dispose_engine, get_engine
+from app.dispatcher import build_dispatcher
+from app.replay import (
+    Anonymizer,
+    OfflineSession,
+    UpdateRecorder,
+    compare,
+    count_queries,
+    load_recording,
+    prepare_database,
+    replay,
+)
+
+
+def _message(update_id: int, text: str) -> Update:
+    user = User(id=7, is_bot=False, first_name="Иван", last_name="Петров", username="ivan")
+    message = Message(
+        message_id=update_id, date=datetime.now(), chat=Chat(id=7, type="private"), from_user=user, text=text
+    )
+    return Update(update_id=update_id, message=message)
+
+
+def test_anonymizer_is_stable_and_keeps_what_handlers_parse():
+    anonymizer = Anonymizer("secret")
+    assert anonymizer.user_id(7) == anonymizer.user_id(7) != Anonymizer("other").user_id(7)
+    assert anonymizer.text("⏰ Добавить часы") == "⏰ Добавить часы"
+    assert anonymizer.text("/search Дом").startswith("/search ")
+    masked = anonymizer.text("Дом 15.08.24 8:30")
+    assert masked.endswith(" 15.08.24 8:30") and "Дом" not in masked
+    assert anonymizer.words("Дом") == anonymizer.words("дом")
+
+
+@pytest.mark.asyncio
+async def test_recorded_updates_replay_against_mapped_copy(tmp_path, monkeypatch):
+    source = tmp_path / "worktime.db"
+    engine = create_async_engine(f"sqlite+aiosqlite:///{source}")
+    await run_migrations(engine)
+    await engine.dispose()
+    conn = sqlite3.connect(source)
+    with conn:
+        conn.execute(
+            "INSERT INTO users (telegram_id, first_name, created_at, updated_at) "
+            "VALUES (7, 'Иван', '2024-06-01', '2024-06-01')"
+        )
+        conn.execute(
+            "INSERT INTO work_objects "
+            "(user_id, name, name_key, status, is_deleted, is_archived, created_at, updated_at) "
+            "VALUES (1, 'Дом', 'дом', 'active', 0, 0, '2024-06-01', '2024-06-01')"
+        )
+    conn.close()
+
+    recording = tmp_path / "updates.jsonl"
+    recorder = UpdateRecorder(recording, "secret")
+    recorder.record(_message(1, "/objects"))
+    recorder.record(_message(2, "/report"))
+    recorder.close()
+    raw = recording.read_text(encoding="utf-8")
+    assert "Иван" not in raw and "ivan" not in raw and '"id": 7' not in raw
+
+    copy = tmp_path / "replay.db"
+    prepare_database(source, copy, Anonymizer("secret"))
+    monkeypatch.setenv("DATABASE_URL", f"sqlite+aiosqlite:///{copy}")
+    await dispose_engine()
+    count_queries(get_engine())
+    bot = Bot("42:REPLAY")
+    offline = OfflineSession()
+    bot.session.middleware(offline)
+    # Module routers attach to one dispatcher only; test_diag already took diag's
+    routers = [importlib.import_module(f"app.handlers.{name}").router for name in ("objects", "report")]
+    dp = build_dispatcher(get_settings(), routers)
+    try:
+        result = await replay(dp, bot, load_recording(recording), speed=0)
+    finally:
+        await bot.session.close()
+        await dispose_engine()
+
+    assert set(result["kinds"]) == {"/objects", "/report"}
+    assert result["total"]["errors"] == 0
+    # The recorded (pseudonymous) user is found in the copy: the object list is shown
+    assert result["kinds"]["/objects"]["queries"] >= 2
+    assert offline.calls["SendMessage"] == 2
+
+    lines = compare(json.loads(json.dumps(result)), result)
+    assert lines[0].startswith("total") and "(+0%)" in lines[0]
@@ -0,0 +1,124 @@
+import pytest
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import select
+
+from app.models.rollup import DailyRollup
+from app.models.work_object import ObjectStatus
+from app.repositories.archive_repo import ArchiveRepository
+from app.repositories.object_repo import WorkObjectRepository
+from app.repositories.payment_repo import PaymentRepository
+from app.repositories.rollup_repo import RollupRepository
+from app.repositories.time_repo import TimeEntryRepository
+from app.services.reporting import ReportingService
+
+
+async def _snapshot(session):
+    result = await session.execute(select(DailyRollup).order_by(DailyRollup.day, DailyRollup.work_object_id))
+    return [
+        (row.user_id, row.day, row.work_object_id, row.minutes, row.amount, row.entry_count, row.payment_count)
+        for row in result.scalars().all()
+    ]
+
+
+@pytest.mark.asyncio
+async def test_rollups_follow_writes_and_match_rebuild(test_session):
+    object_repo = WorkObjectRepository(test_session)
+    time_repo = TimeEntryRepository(test_session)
+    payment_repo = PaymentRepository(test_session)
+    rollup_repo = RollupRepository(test_session)
+
+    house = await object_repo.create_object(user_id=1, name="Дом")
+    bath = await object_repo.create_object(user_id=1, name="Баня")
+    start = datetime(2024, 6, 3, 9, 0)
+    first = await time_repo.create_entry(house.id, start, start + timedelta(hours=2))
+    await time_repo.create_entry(house.id, start + timedelta(hours=3), start + timedelta(hours=4))
+    moved = await time_repo.create_entry(bath.id, start, start + timedelta(hours=8))
+    payment = await payment_repo.create_payment(house.id, 300000, datetime(2024, 6, 3))
+    await payment_repo.create_payment(bath.id, 100000, datetime(2024, 6, 5))
+
+    await time_repo.update_entry(first.id, 1, minutes=150)
+    await time_repo.update_entry(moved.id, 1, date=datetime(2024, 6, 4))
+    await payment_repo.update_payment(payment.id, 1, amount_kopecks=350000)
+    await time_repo.delete_entry(moved.id, 1)
+    await test_session.commit()
+
+    incremental = await _snapshot(test_session)
+    assert incremental == [
+        (1, date(2024, 6, 3), house.id, 210, 350000, 2, 1),
+        (1, date(2024, 6, 5), bath.id, 0, 100000, 0, 1),
+    ]
+    assert await rollup_repo.rebuild() == 2
+    assert await _snapshot(test_session) == incremental
+
+    # Archived history is still counted by a rebuild
+    await object_repo.update_status(house.id, 1, ObjectStatus.COMPLETED)
+    while await ArchiveRepository(test_session).archive_object_batch(house.id):
+        pass
+    await rollup_repo.rebuild(user_id=1)
+    assert await _snapshot(test_session) == incremental
+
+
+@pytest.mark.asyncio
+async def test_period_report_reads_rollups(test_session):
+    object_repo = WorkObjectRepository(test_session)
+    time_repo = TimeEntryRepository(test_session)
+    payment_repo = PaymentRepository(test_session)
+
+    house = await object_repo.create_object(user_id=1, name="Дом")
+    start = datetime(2024, 6, 3, 9, 0)
+    for day in range(3):
+        await time_repo.create_entry(house.id, start + timedelta(days=day), start + timedelta(days=day, hours=8))
+    await time_repo.create_entry(house.id, start + timedelta(days=40), start + timedelta(days=40, hours=8))
+    await payment_repo.create_payment(house.id, 2400000, datetime(2024, 6, 10))
+    # Second object: one day shared with the house, one of its own
+    shed = await object_repo.create_object(user_id=1, name="Сарай")
+    for day in (start, start + timedelta(days=17)):
+        await time_repo.create_entry(shed.id, day, day + timedelta(hours=1))
+    await test_session.commit()
+
+    period_start, period_end = ReportingService.get_month_period(2024, 6)
+    rollups = await RollupRepository(test_session).get_in_period(1, period_start, period_end)
+    assert len(rollups) == 6
+
+    totals = await RollupRepository(test_session).get_period_totals(1, period_start, period_end)
+    assert sorted(totals, key=lambda row: row.work_object_id or 0) == [
+        (None, 26 * 60, 2400000, 4),
+        (house.id, 24 * 60, 2400000, 3),
+        (shed.id, 2 * 60, 0, 2),
+    ]
+
+    report = ReportingService.generate_period_report([house, shed], totals, period_start, period_end)
+    lines = report.splitlines()
+    assert lines[0] == "Дом — 24:00 часа (3 дня работы) — 24 000 р. (1 000 р./час)"
+    assert lines[-1] == "4 рабочих дня из 30 дней в июне 2024"
+
+
+@pytest.mark.asyncio
+async def test_monthly_totals_with_gaps_deltas_and_year_to_date(test_session):
+    object_repo = WorkObjectRepository(test_session)
+    time_repo = TimeEntryRepository(test_session)
+    payment_repo = PaymentRepository(test_session)
+
+    house = await object_repo.create_object(user_id=1, name="Дом")
+    for day in (datetime(2023, 12, 20, 9), datetime(2024, 1, 10, 9), datetime(2024, 1, 11, 9), datetime(2024, 3, 5, 9)):
+        await time_repo.create_entry(house.id, day, day + timedelta(hours=4))
+    await payment_repo.create_payment(house.id, 400000, datetime(2024, 1, 31))
+    await payment_repo.create_payment(house.id, 100000, datetime(2024, 3, 5))
+    await test_session.commit()
+
+    months = await RollupRepository(test_session).get_monthly_totals(
+        1, datetime(2024, 1, 15), datetime(2024, 3, 20)
+    )
+    assert [(m.month, m.minutes, m.amount, m.work_days) for m in months] == [
+        (date(2024, 1, 1), 480, 400000, 2),
+        (date(2024, 2, 1), 0, 0, 0),
+        (date(2024, 3, 1), 240, 100000, 1),
+    ]
+    # December of the previous year feeds the January delta but not the YTD sums
+    assert [(m.prev_minutes, m.prev_amount) for m in months] == [(240, 0), (480, 400000), (0, 0)]
+    assert (months[-1].ytd_minutes, months[-1].ytd_amount) == (720, 500000)
+
+    report = ReportingService.generate_monthly_report(months, year_to_date=True)
+    assert "К прошлому месяцу: +4:00 ч, +4 000 р., +500 р./час" in report
+    assert report.endswith("Итого с начала года: 12:00 часов — 5 000 р. (417 р./час)")
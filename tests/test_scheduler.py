@@ -0,0 +1,74 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+from aiogram import Bot, Dispatcher, Router
+from aiogram.filters import StateFilter
+from aiogram.fsm.state import State, StatesGroup
+from aiogram.fsm.storage.memory import MemoryStorage
+from aiogram.types import Chat, Message, Update, User
+
+from app.middlewares.scheduler import (
+    DB_WRITE,
+    HandlerConcurrencyMiddleware,
+    SchedulerStats,
+    UserSchedulerMiddleware,
+)
+
+
+class Flow(StatesGroup):
+    waiting_for_comment = State()
+
+
+def _update(update_id: int, user_id: int, text: str) -> Update:
+    user = User(id=user_id, is_bot=False, first_name="Тест")
+    message = Message(
+        message_id=update_id,
+        date=datetime.now(),
+        chat=Chat(id=user_id, type="private"),
+        from_user=user,
+        text=text,
+    )
+    return Update(update_id=update_id, message=message)
+
+
+@pytest.mark.asyncio
+async def test_same_user_updates_run_in_order_with_fresh_state():
+    stats = SchedulerStats()
+    dp = Dispatcher(storage=MemoryStorage())
+    dp.update.outer_middleware(UserSchedulerMiddleware(max_in_flight=8, stats=stats))
+    dp.message.middleware(HandlerConcurrencyMiddleware(max_readers=8, max_writers=1, stats=stats))
+
+    router = Router()
+    saved = []
+
+    @router.message(StateFilter(Flow.waiting_for_comment), flags={DB_WRITE: True})
+    async def process_comment(message: Message, state):
+        await asyncio.sleep(0.02)
+        saved.append(message.text)
+        await state.clear()
+
+    @router.message()
+    async def other(message: Message, state):
+        await asyncio.sleep(0.01)
+
+    dp.include_router(router)
+    bot = Bot("42:TEST")
+
+    key_state = dp.fsm.get_context(bot, chat_id=1, user_id=1)
+    await key_state.set_state(Flow.waiting_for_comment)
+
+    # Double send: without the scheduler both would see waiting_for_comment and save twice
+    await asyncio.gather(
+        dp.feed_update(bot, _update(1, 1, "первый")),
+        dp.feed_update(bot, _update(2, 1, "второй")),
+        dp.feed_update(bot, _update(3, 2, "другой пользователь")),
+    )
+
+    assert saved == ["первый"]
+    snapshot = stats.snapshot()
+    assert snapshot["updates"]["count"] == 3
+    assert snapshot["writers"]["count"] == 1
+    assert snapshot["readers"]["count"] == 2
+    assert snapshot["queued_users"] == 0
+    await bot.session.close()
@@ -0,0 +1,42 @@
+import pytest
+from datetime import datetime
+
+from app.repositories.object_repo import WorkObjectRepository
+from app.repositories.search_repo import SearchRepository
+from app.repositories.time_repo import TimeEntryRepository
+
+
+@pytest.mark.asyncio
+async def test_search_is_ranked_scoped_and_synced_by_triggers(test_session):
+    objects = WorkObjectRepository(test_session)
+    entries = TimeEntryRepository(test_session)
+    search = SearchRepository(test_session)
+
+    dacha = await objects.create_object(user_id=1, name="Дача Марина")
+    await objects.create_object(user_id=2, name="Дача соседа")
+    entry = await entries.create_entry(
+        work_object_id=dacha.id,
+        start_time=datetime(2025, 1, 1, 9, 0),
+        end_time=datetime(2025, 1, 1, 12, 0),
+        date=datetime(2025, 1, 1),
+        comment="Монтаж труб",
+    )
+    await test_session.commit()
+
+    hits = await search.search(1, "дач")
+    assert [hit.object_name for hit in hits] == ["Дача Марина"]
+    assert hits[0].entry_id is None
+
+    hits = await search.search(1, "монт")
+    assert [(hit.entry_id, hit.entry_minutes) for hit in hits] == [(entry.id, 180)]
+
+    # комментарий изменён — индекс обновлён триггером
+    await entries.update_entry(entry.id, 1, comment="Покраска стен")
+    await test_session.commit()
+    assert await search.search(1, "монтаж") == []
+    assert len(await search.search(1, "покраска")) == 1
+
+    # удалённые объекты не находятся
+    await objects.delete_object(dacha.id, 1)
+    await test_session.commit()
+    assert await search.search(1, "покраска") == []
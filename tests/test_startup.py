@@ -0,0 +1,41 @@
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from app.middlewares.startup import FirstUpdateMiddleware
+from app.utils.startup import StartupProfiler
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_admin_handlers_load_diagnostics_on_first_use():
+    code = (
+        "import sys, app.handlers.diag\n"
+        "print(sorted(name for name in ('app.services.diagnostics', 'app.services.backup', "
+        "'app.services.profiler') if name in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == "[]"
+
+
+@pytest.mark.asyncio
+async def test_first_update_is_added_to_startup_profile(capsys):
+    profiler = StartupProfiler(time.perf_counter())
+    with profiler.phase("settings"):
+        pass
+    profiler.mark_ready()
+    middleware = FirstUpdateMiddleware(profiler, print_report=True)
+
+    async def handler(event, data):
+        return "done"
+
+    assert await middleware(handler, None, {}) == "done"
+    assert await middleware(handler, None, {}) == "done"
+    printed = capsys.readouterr().out.splitlines()
+    assert len(printed) == 1 and printed[0].startswith("First update processed after ")
+    assert profiler.report().splitlines()[-2] == printed[0]
@@ -1,6 +1,10 @@
 import pytest
-from datetime import datetime
+from datetime import datetime, timedelta
 
+from app.models.work_object import ObjectStatus
+from app.repositories.object_repo import WorkObjectRepository
+from app.repositories.payment_repo import PaymentRepository
+from app.repositories.rollup_repo import RollupRepository
 from app.repositories.time_repo import TimeEntryRepository
 
 @pytest.mark.asyncio
@@ -24,3 +28,57 @@ async def test_create_and_get_entry(test_session):
     assert fetched is not None
     assert fetched.comment == "Test entry"
     assert fetched.hours == 8
+
+
+@pytest.mark.asyncio
+async def test_minutes_are_exact_and_summed_in_sql(test_session):
+    repo = TimeEntryRepository(test_session)
+
+    # 3 × 20 минут — при хранении в часах с округлением до 0.01 сумма теряла минуту
+    for start_minute in (0, 20, 40):
+        start_time = datetime(2025, 1, 1, 9, start_minute)
+        await repo.create_entry(
+            work_object_id=1,
+            start_time=start_time,
+            end_time=start_time + timedelta(minutes=20),
+            date=datetime(2025, 1, 1),
+        )
+    await test_session.commit()
+
+    assert await repo.get_total_minutes(1) == 60
+
+
+
+@pytest.mark.asyncio
+async def test_edits_are_single_statements_scoped_to_owner(test_session):
+    object_repo = WorkObjectRepository(test_session)
+    time_repo = TimeEntryRepository(test_session)
+    payment_repo = PaymentRepository(test_session)
+
+    house = await object_repo.create_object(user_id=1, name="Дом")
+    entry = await time_repo.create_entry(house.id, datetime(2025, 1, 1, 9), datetime(2025, 1, 1, 10))
+    payment = await payment_repo.create_payment(house.id, 100000, datetime(2025, 1, 1))
+
+    # Чужой пользователь не может ни изменить, ни удалить
+    assert await time_repo.update_entry(entry.id, 2, minutes=90) is None
+    assert await payment_repo.update_payment(payment.id, 2, amount_kopecks=1) is None
+    assert not await time_repo.delete_entry(entry.id, 2)
+    assert not await payment_repo.delete_payment(payment.id, 2)
+    assert await object_repo.update_status(house.id, 2, ObjectStatus.COMPLETED) is None
+    assert await object_repo.delete_object(house.id, 2) is None
+
+    updated = await time_repo.update_entry(entry.id, 1, minutes=90, comment="Кровля")
+    assert (updated.object_name, updated.duration_minutes, updated.comment) == ("Дом", 90, "Кровля")
+    assert entry.minutes == 90  # загруженный экземпляр синхронизирован
+    updated = await payment_repo.update_payment(payment.id, 1, date=datetime(2025, 1, 2))
+    assert (updated.object_name, updated.amount, updated.date) == ("Дом", 100000, datetime(2025, 1, 2))
+
+    assert await object_repo.update_status(house.id, 1, ObjectStatus.COMPLETED) == "Дом"
+    rollup_repo = RollupRepository(test_session)
+    period = (datetime(2025, 1, 1), datetime(2025, 1, 2))
+    assert len(await rollup_repo.get_in_period(1, *period)) == 2
+    assert await time_repo.delete_entry(entry.id, 1)
+    assert await payment_repo.delete_payment(payment.id, 1)
+    assert await time_repo.get_rows(house.id) == [] and await payment_repo.get_rows(house.id) == []
+    # Дни без записей и оплат удаляются из сводок, как при пересчёте
+    assert await rollup_repo.get_in_period(1, *period) == []
@@ -0,0 +1,51 @@
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+from app.repositories.object_repo import WorkObjectRepository
+from app.repositories.time_repo import TimeEntryRepository
+from app.repositories.user_repo import UserRepository
+from app.services.reporting import ReportingService
+from app.utils.dateparse import day_to_date, get_today_in_timezone, local_day, parse_russian_date
+
+
+def test_local_day_uses_wall_date():
+    assert local_day(date(1970, 1, 2)) == 1
+    assert day_to_date(local_day(datetime(2024, 6, 1, 23, 30))) == date(2024, 6, 1)
+
+    late_utc = datetime(2024, 6, 1, 22, 30, tzinfo=timezone.utc)
+    assert day_to_date(local_day(late_utc)) == date(2024, 6, 1)
+    # Parsed in the user's zone, the wall date is the user's day
+    assert day_to_date(local_day(parse_russian_date("02.06.24", "Asia/Vladivostok"))) == date(2024, 6, 2)
+
+
+def test_report_periods_follow_user_timezone():
+    # UTC+14: its calendar day differs from Moscow's for half of every day
+    zone = "Pacific/Kiritimati"
+    today = get_today_in_timezone(zone).replace(tzinfo=None)
+
+    start, end = ReportingService.get_year_to_date_period(zone)
+    assert (start, end) == (today.replace(month=1, day=1), today)
+    assert ReportingService.get_recent_months_period(1, zone) == (today.replace(day=1), today)
+    first, last = ReportingService.get_last_month_period(zone)
+    assert last == today.replace(day=1) - timedelta(days=1) and first == last.replace(day=1)
+
+
+@pytest.mark.asyncio
+async def test_user_timezone_and_period_by_local_day(test_session):
+    user_repo = UserRepository(test_session)
+    user = await user_repo.create_user(telegram_id=42)
+    assert await user_repo.get_timezone(42) is None
+    assert await user_repo.set_timezone(42, "Asia/Yekaterinburg")
+    assert await user_repo.get_timezone(42) == "Asia/Yekaterinburg"
+    assert not await user_repo.set_timezone(43, "Asia/Yekaterinburg")
+
+    house = await WorkObjectRepository(test_session).create_object(user_id=user.id, name="Дом")
+    time_repo = TimeEntryRepository(test_session)
+    late = datetime(2024, 6, 1, 22, 0)
+    entry = await time_repo.create_entry(house.id, late, late.replace(hour=23))
+    await time_repo.create_entry(house.id, datetime(2024, 6, 2, 9), datetime(2024, 6, 2, 10))
+    assert day_to_date(entry.local_day) == date(2024, 6, 1)
+
+    found = await time_repo.get_entries_in_period(house.id, datetime(2024, 6, 1), datetime(2024, 6, 1))
+    assert [item.id for item in found] == [entry.id]
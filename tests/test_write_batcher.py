@@ -0,0 +1,65 @@
+import asyncio
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.db.session import Base
+from app.db.write_batcher import WriteCoalescer
+from app.repositories.object_repo import WorkObjectRepository
+from app.repositories.time_repo import TimeEntryRepository
+
+
+@pytest.mark.asyncio
+async def test_concurrent_writes_share_one_commit(tmp_path):
+    path = tmp_path / "batch.db"
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    sessions = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+
+    async with sessions() as session:
+        obj = await WorkObjectRepository(session).create_object(user_id=1, name="Склад")
+        await session.commit()
+
+    # A second connection sees only what is committed on disk
+    reader = sqlite3.connect(path)
+
+    def committed_entries() -> int:
+        return reader.execute("SELECT count(*) FROM time_entries").fetchall()[0][0]
+
+    seen = []
+    coalescer = WriteCoalescer(sessions, window=0.01)
+    start = datetime(2025, 6, 1, 8, 0)
+
+    async def add_entry(session, i):
+        entry = await TimeEntryRepository(session).create_entry(
+            obj.id, start + timedelta(hours=i), start + timedelta(hours=i, minutes=30)
+        )
+        seen.append(committed_entries())
+        if i == 3:
+            # Rolled back to its savepoint, the rest of the batch survives
+            raise ValueError("bad entry")
+        return entry.id
+
+    results = await asyncio.gather(
+        *(coalescer.submit(lambda session, i=i: add_entry(session, i)) for i in range(10)),
+        return_exceptions=True,
+    )
+
+    # The failing writer gets its own error, everyone else their own row id
+    assert isinstance(results[3], ValueError)
+    ids = [r for r in results if not isinstance(r, Exception)]
+    assert len(set(ids)) == 9
+    # Nothing of the batch became durable before the batch commit
+    assert seen == [0] * 10
+    assert committed_entries() == 9
+    assert coalescer.batches == 1
+    reader.close()
+
+    async with sessions() as session:
+        entries = await TimeEntryRepository(session).get_by_object_id(obj.id)
+    assert sorted(entry.id for entry in entries) == sorted(ids)
+
+    await engine.dispose()